@@ -12,6 +12,8 @@ from PyQt6.QtWidgets import QApplication, QMessageBox
 from datetime import datetime
 from PyQt6.QtCore import Qt
 
+from services.audio_library import get_audio_library
+
 
 
 if getattr(sys, 'frozen', False):
@@ -41,21 +43,13 @@ def setup_audio_folder():
     print(f"📁 Pasta AUDIO: {audio_folder}")
     print(f"⚙️ Pasta Config: {config_folder}")
     
-    # Verifica arquivos de áudio existentes
-    audio_extensions = ['*.mp3', '*.wav', '*.aac', '*.ogg', '*.flac', '*.m4a']
-    audio_files = []
-    
-    for pattern in audio_extensions:
-        audio_files.extend(list(audio_folder.glob(pattern)))
-        audio_files.extend(list(audio_folder.glob(pattern.upper())))
-    
-    # Remove duplicatas
-    audio_files = list(set(audio_files))
+    # Verifica arquivos de áudio existentes (uma varredura; a janela reaproveita o índice)
+    audio_files = get_audio_library(audio_folder).files()
     
     if audio_files:
         print(f"🎵 Encontrados {len(audio_files)} arquivo(s) de áudio:")
         for i, file in enumerate(audio_files[:5], 1):
-            print(f"   {i}. {file.name}")
+            print(f"   {i}. {file}")
         if len(audio_files) > 5:
             print(f"   ... e mais {len(audio_files) - 5} arquivo(s)")
     else:
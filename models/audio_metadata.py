@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição da classe AudioMetadata: informações técnicas de um arquivo da
+biblioteca de mensagens (duração, formato, taxa, nível e validade).
+"""
+
+from collections import namedtuple
+
+
+class AudioMetadata(namedtuple('AudioMetadata', [
+        'format', 'duration', 'sample_rate', 'channels', 'rms_db', 'peak_db',
+        'valid', 'error'])):
+    """
+    Resultado da análise de um arquivo de áudio.
+
+    - format: formato detectado pelo conteúdo (MP3, WAV, OGG, FLAC, AAC, M4A)
+    - duration: duração em segundos (None se não foi possível medir)
+    - sample_rate / channels: do arquivo original (None se desconhecidos)
+    - rms_db / peak_db: nível médio (RMS) e de pico em dBFS (None se não medido)
+    - valid: False se o arquivo não pode ser reproduzido
+    - error: motivo da invalidez (None se válido)
+    """
+
+    __slots__ = ()
+
+    def to_dict(self):
+        """Converte para dicionário (cache em disco)."""
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cria a partir de um dicionário do cache."""
+        return cls(**{field: data.get(field) for field in cls._fields})
+
+    @classmethod
+    def invalid(cls, error, format=None):
+        """Metadados de um arquivo que não pode ser reproduzido."""
+        return cls(format, None, None, None, None, None, False, error)
+
+    def describe(self):
+        """
+        Resumo curto para a lista de mensagens (ex: "0:32 · MP3 · 44,1 kHz · -18 dB").
+
+        Returns:
+            str: Resumo legível
+        """
+        if not self.valid:
+            return f"⚠ {self.error or 'arquivo inválido'}"
+        parts = []
+        if self.duration is not None:
+            minutes, seconds = divmod(int(round(self.duration)), 60)
+            parts.append(f"{minutes}:{seconds:02d}")
+        if self.format:
+            parts.append(self.format)
+        if self.sample_rate:
+            parts.append(f"{self.sample_rate / 1000:.1f} kHz".replace('.', ','))
+        if self.rms_db is not None:
+            parts.append(f"{self.rms_db:.0f} dB")
+        return " · ".join(parts)
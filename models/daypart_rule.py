@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição da classe DaypartRule, que restringe uma mensagem a dias da semana
+e faixas de horário (ex: dias úteis das 08h às 12h, ou apenas fins de semana).
+"""
+
+from datetime import time
+
+# Segundos em um dia e em uma semana (segunda 00:00 = 0)
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+
+WEEKDAY_NAMES = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+
+class DaypartRule:
+    """
+    Regra de programação por dia da semana e faixa de horário.
+
+    - days: dias da semana permitidos (0 = segunda ... 6 = domingo)
+    - start/end: faixa de horário; se end <= start a faixa atravessa a meia-noite,
+      e se start == end a regra vale o dia inteiro
+    """
+
+    ALL_DAYS = frozenset(range(7))
+    WEEKDAYS = frozenset(range(5))
+    WEEKEND = frozenset((5, 6))
+
+    def __init__(self, days=None, start=None, end=None):
+        """
+        Inicializa a regra.
+
+        Args:
+            days (iterable, optional): Dias da semana permitidos (padrão: todos)
+            start (datetime.time, optional): Início da faixa (padrão: 00:00)
+            end (datetime.time, optional): Fim da faixa (padrão: igual ao início = dia inteiro)
+        """
+        self.days = frozenset(self.ALL_DAYS if days is None else days)
+        self.start = start or time(0, 0)
+        self.end = end or self.start
+
+    @classmethod
+    def weekdays(cls, start=None, end=None):
+        """Regra para dias úteis (segunda a sexta)."""
+        return cls(cls.WEEKDAYS, start, end)
+
+    @classmethod
+    def weekend(cls, start=None, end=None):
+        """Regra para fins de semana (sábado e domingo)."""
+        return cls(cls.WEEKEND, start, end)
+
+    def intervals(self):
+        """
+        Converte a regra em intervalos [início, fim) em segundos da semana.
+
+        Returns:
+            list: Lista de tuplas (início, fim), sem atravessar o fim da semana
+        """
+        start = self.start.hour * 3600 + self.start.minute * 60 + self.start.second
+        end = self.end.hour * 3600 + self.end.minute * 60 + self.end.second
+        duration = (end - start) % SECONDS_PER_DAY or SECONDS_PER_DAY
+
+        result = []
+        for day in sorted(self.days):
+            begin = day * SECONDS_PER_DAY + start
+            finish = begin + duration
+            if finish <= SECONDS_PER_WEEK:
+                result.append((begin, finish))
+            else:
+                # Domingo atravessando a meia-noite continua na segunda-feira
+                result.append((begin, SECONDS_PER_WEEK))
+                result.append((0, finish - SECONDS_PER_WEEK))
+        return result
+
+    def describe(self):
+        """
+        Retorna uma descrição curta da regra.
+
+        Returns:
+            str: Ex: "Seg–Sex 08:00–12:00"
+        """
+        if self.days == self.ALL_DAYS:
+            days_text = "Todos os dias"
+        elif self.days == self.WEEKDAYS:
+            days_text = "Seg–Sex"
+        elif self.days == self.WEEKEND:
+            days_text = "Sáb–Dom"
+        else:
+            days_text = ",".join(WEEKDAY_NAMES[day] for day in sorted(self.days))
+
+        if self.start == self.end:
+            return days_text
+        return f"{days_text} {self.start.strftime('%H:%M')}–{self.end.strftime('%H:%M')}"
+
+    def to_dict(self):
+        """Converte a regra para um dicionário para serialização"""
+        return {
+            'days': sorted(self.days),
+            'start': self.start.strftime('%H:%M:%S'),
+            'end': self.end.strftime('%H:%M:%S')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cria uma regra a partir de um dicionário (desserialização)"""
+        return cls(
+            days=data.get('days'),
+            start=time.fromisoformat(data.get('start', '00:00:00')),
+            end=time.fromisoformat(data.get('end', data.get('start', '00:00:00')))
+        )
+
+    def __str__(self):
+        """Representação string da regra"""
+        return self.describe()
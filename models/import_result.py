@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição da classe ImportResult, o resultado da importação de um arquivo
+para a biblioteca de mensagens.
+"""
+
+from collections import namedtuple
+
+
+class ImportResult(namedtuple('ImportResult', ['source', 'name', 'status', 'digest',
+                                               'metadata', 'error'])):
+    """
+    Resultado da importação de um arquivo.
+
+    - source: caminho de origem (Path)
+    - name: nome final na pasta de mensagens (None se não foi importado)
+    - status: IMPORTED, DUPLICATE, SKIPPED, FAILED ou CANCELLED
+    - digest: SHA-256 do conteúdo copiado (None se a cópia não terminou)
+    - metadata: AudioMetadata do arquivo importado (None se não foi analisado)
+    - error: motivo da falha ou observação (None se não houver)
+    """
+
+    __slots__ = ()
+
+    IMPORTED = "imported"
+    DUPLICATE = "duplicate"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def imported(self):
+        """True se o arquivo entrou na biblioteca."""
+        return self.status == self.IMPORTED
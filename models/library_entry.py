@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição da classe LibraryEntry, um arquivo de áudio indexado pela
+biblioteca de mensagens (pasta AUDIO).
+"""
+
+from collections import namedtuple
+
+
+class LibraryEntry(namedtuple('LibraryEntry', ['name', 'path', 'size', 'mtime_ns'])):
+    """
+    Arquivo da biblioteca no momento da varredura.
+
+    - name: nome do arquivo (chave do índice e da fila)
+    - path: caminho completo (Path)
+    - size / mtime_ns: tamanho e data de modificação, usados para detectar
+      arquivos alterados entre varreduras
+    """
+
+    __slots__ = ()
+
+    @property
+    def signature(self):
+        """Identidade do conteúdo do arquivo (tamanho, mtime)."""
+        return (self.size, self.mtime_ns)
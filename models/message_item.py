@@ -5,6 +5,7 @@
 Definição da classe MessageQueueItem que representa um item na fila de reprodução.
 """
 
+import uuid
 from datetime import datetime, timedelta
 
 class MessageQueueItem:
@@ -12,14 +13,22 @@ class MessageQueueItem:
     Representa uma mensagem na fila de reprodução.
     
     Armazena informações sobre a mensagem, incluindo:
+    - Identificador único (message_id)
     - Nome do arquivo
     - Prioridade (1-10, onde 1 é mais alta)
     - Intervalo de repetição em minutos (pode ser fracionário para representar segundos)
     - Horário da próxima reprodução
     - Último horário em que foi reproduzida
+    - Regras de dias/horários permitidos (dayparting)
+    - Modo de agendamento: intervalo após o término ou horário fixo
+      (slots alinhados ao relógio, ex: :00, :15, :30, :45)
     """
-    
-    def __init__(self, filename, priority, interval):
+
+    MODE_INTERVAL = "interval"
+    MODE_FIXED = "fixed"
+
+    def __init__(self, filename, priority, interval, message_id=None, slot_minutes=None):
+            self.message_id = message_id or uuid.uuid4().hex
             self.filename = filename
             self.priority = priority
             self.interval = float(interval)  # Intervalo em minutos
@@ -28,6 +37,63 @@ class MessageQueueItem:
             self.end_time = None
             self.is_pending = priority > 1  # Mensagens com prioridade >1 começam pendentes
             self.last_played = None
+            self.daypart_rules = []  # Lista de DaypartRule; vazia = sem restrição
+            # Slots fixos a cada N minutos contados a partir da meia-noite; None = modo intervalo
+            self.slot_minutes = int(slot_minutes) if slot_minutes else None
+
+    @property
+    def schedule_mode(self):
+        """Retorna o modo de agendamento (MODE_INTERVAL ou MODE_FIXED)."""
+        return self.MODE_FIXED if self.slot_minutes else self.MODE_INTERVAL
+
+    def next_slot_after(self, reference):
+        """
+        Retorna o primeiro slot fixo estritamente posterior ao horário de referência.
+        Os slots são contados a partir da meia-noite do dia, então um período que não
+        divide 24h recomeça alinhado no dia seguinte.
+
+        Args:
+            reference (datetime): Horário de referência
+
+        Returns:
+            datetime: Horário do próximo slot
+        """
+        period = self.slot_minutes * 60
+        midnight = reference.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (reference - midnight).total_seconds()
+
+        slot = (int(elapsed // period) + 1) * period
+        if slot >= 24 * 60 * 60:
+            return midnight + timedelta(days=1)
+        return midnight + timedelta(seconds=slot)
+
+    def compute_next_play_time(self, reference):
+        """
+        Calcula o próximo horário de reprodução a partir de uma referência.
+
+        - Modo intervalo: referência + intervalo
+        - Modo fixo: próximo slot alinhado ao relógio após a referência
+
+        Args:
+            reference (datetime): Normalmente o término da última reprodução
+
+        Returns:
+            datetime: Próximo horário de reprodução
+        """
+        if self.slot_minutes:
+            return self.next_slot_after(reference)
+        return reference + timedelta(seconds=self.interval_seconds)
+
+    def get_schedule_description(self):
+        """
+        Retorna uma descrição curta do agendamento.
+
+        Returns:
+            str: Ex: "a cada 15 min (fixo)" ou "5.0 min"
+        """
+        if self.slot_minutes:
+            return f"a cada {self.slot_minutes} min (fixo)"
+        return f"{self.interval} min"
         
     def __lt__(self, other):
         """
@@ -48,15 +114,15 @@ class MessageQueueItem:
         Atualiza o horário da próxima reprodução baseado no intervalo.
         O intervalo começa a contar APÓS o término completo (incluindo fade).
         """
-        if self.interval <= 0:
+        if self.interval <= 0 and not self.slot_minutes:
             return False
         
         # Garante que temos um tempo de término válido
         if not self.end_time:
             self.end_time = datetime.now()
             
-        # Calcula o próximo horário baseado no término + intervalo
-        self.next_play_time = self.end_time + timedelta(seconds=self.interval_seconds)
+        # Calcula o próximo horário baseado no término (intervalo ou slot fixo)
+        self.next_play_time = self.compute_next_play_time(self.end_time)
         
         return True
     
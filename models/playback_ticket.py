@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição da classe PlaybackTicket, o bilhete de reprodução entregue pelo
+agendador ao player.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+
+class PlaybackTicket(namedtuple('PlaybackTicket', [
+        'message_id', 'filename', 'priority', 'interval_seconds',
+        'scheduled_time', 'issued_at'])):
+    """
+    Bilhete imutável e leve que representa uma reprodução agendada.
+    
+    Carrega apenas um instantâneo dos dados necessários para tocar a mensagem:
+    - ID da mensagem na fila (usado para devolver alterações de estado)
+    - Nome do arquivo
+    - Prioridade
+    - Intervalo em segundos no momento da emissão
+    - Horário para o qual estava agendada
+    - Horário em que o bilhete foi emitido
+    
+    Alterações de estado voltam ao QueueService sempre pelo message_id,
+    sem cópias da mensagem a cada despacho.
+    """
+    
+    __slots__ = ()
+    
+    @classmethod
+    def from_message(cls, message, issued_at=None):
+        """
+        Cria um bilhete a partir de uma mensagem da fila.
+        
+        Args:
+            message (MessageQueueItem): Mensagem original
+            issued_at (datetime, optional): Horário de emissão
+            
+        Returns:
+            PlaybackTicket: Bilhete imutável
+        """
+        return cls(
+            message_id=message.message_id,
+            filename=message.filename,
+            priority=message.priority,
+            interval_seconds=message.interval_seconds,
+            scheduled_time=message.next_play_time,
+            issued_at=issued_at or datetime.now()
+        )
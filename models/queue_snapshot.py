@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Definição das classes QueueSnapshot e MessageView: fotografias imutáveis da fila,
+publicadas pelo QueueService a cada alteração para leitura sem locks pela interface.
+"""
+
+from collections import namedtuple
+
+
+class MessageView(namedtuple('MessageView', [
+        'message_id', 'filename', 'priority', 'interval', 'interval_seconds',
+        'slot_minutes', 'next_play_time', 'is_pending', 'last_played', 'end_time',
+        'daypart_rules', 'is_eligible'])):
+    """
+    Visão imutável de uma mensagem da fila no momento da publicação.
+    Possui os mesmos atributos de leitura que MessageQueueItem usados pela interface,
+    além de is_eligible (dentro do horário permitido).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_message(cls, message, is_eligible=True):
+        """
+        Cria a visão a partir de uma mensagem da fila.
+
+        Args:
+            message (MessageQueueItem): Mensagem original
+            is_eligible (bool): Se a mensagem pode tocar no horário atual
+
+        Returns:
+            MessageView: Visão imutável
+        """
+        return cls(
+            message.message_id,
+            message.filename,
+            message.priority,
+            message.interval,
+            message.interval_seconds,
+            message.slot_minutes,
+            message.next_play_time,
+            message.is_pending,
+            message.last_played,
+            message.end_time,
+            tuple(message.daypart_rules),
+            is_eligible,
+        )
+
+
+class QueueSnapshot(namedtuple('QueueSnapshot', [
+        'version', 'created_at', 'items', 'currently_playing', 'rotation_policy'])):
+    """
+    Fotografia imutável da fila.
+
+    - version: incrementada a cada publicação; leitores comparam para evitar trabalho
+    - items: tupla de MessageView ordenada por prioridade (ordem de inserção no empate)
+    - currently_playing: nome do arquivo tocando ou None
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def empty(cls):
+        """Retorna a fotografia inicial (versão 0, fila vazia)."""
+        return cls(0, None, (), None, None)
+
+    def get(self, filename):
+        """
+        Localiza a visão de uma mensagem pelo nome do arquivo.
+
+        Args:
+            filename (str): Nome do arquivo
+
+        Returns:
+            MessageView: Visão da mensagem ou None
+        """
+        for item in self.items:
+            if item.filename == filename:
+                return item
+        return None
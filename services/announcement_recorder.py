@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""
+Gravação de avisos ao vivo direto na pasta de mensagens.
+O callback do microfone apenas entrega cada bloco a uma fila; uma thread grava
+os blocos em disco à medida que chegam (sem acumular a gravação na memória).
+Ao parar, um trabalhador em segundo plano remove o silêncio do início e do fim,
+normaliza o volume e publica o arquivo final na pasta AUDIO.
+"""
+
+import math
+import os
+import queue
+import sys
+import threading
+import wave
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from services.audio_levels import measure_levels
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class AnnouncementRecorder:
+    """
+    Grava um aviso do microfone em um arquivo WAV da pasta de mensagens.
+    """
+
+    # Blocos de análise do pós-processamento (10 ms)
+    ANALYSIS_SECONDS = 0.01
+    # Silêncio mantido antes e depois da voz após o corte
+    PADDING_SECONDS = 0.15
+    # Leitura/escrita do pós-processamento em blocos de ~1 s
+    PROCESS_SECONDS = 1.0
+
+    def __init__(self, messages_path, rate=44100, channels=1, silence_threshold=0.01,
+                 target_peak=0.89, on_complete=None):
+        """
+        Inicializa o gravador.
+
+        Args:
+            messages_path (Path): Pasta das mensagens (AUDIO)
+            rate (int): Taxa de amostragem
+            channels (int): Número de canais
+            silence_threshold (float): Nível RMS (0.0 a 1.0) abaixo do qual é silêncio
+            target_peak (float): Pico após a normalização (0.89 ≈ -1 dBFS)
+            on_complete (callable, optional): Chamado com o Path do arquivo final
+                (ou None se a gravação ficou vazia), na thread do trabalhador
+        """
+        self.messages_path = Path(messages_path)
+        self.rate = rate
+        self.channels = channels
+        self.silence_threshold = silence_threshold
+        self.target_peak = target_peak
+        self.on_complete = on_complete
+
+        self.is_recording = False
+        self._queue = queue.SimpleQueue()
+        self._writer_thread = None
+        self._temp_path = None
+        self._final_path = None
+        self.frames_written = 0
+
+    def start(self, name=None):
+        """
+        Começa uma nova gravação.
+
+        Args:
+            name (str, optional): Nome do arquivo final (padrão: Aviso_AAAAMMDD_HHMMSS.wav)
+
+        Returns:
+            Path: Caminho do arquivo final
+        """
+        if self.is_recording:
+            return self._final_path
+
+        self.messages_path.mkdir(parents=True, exist_ok=True)
+        name = name or f"Aviso_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if not name.lower().endswith('.wav'):
+            name += '.wav'
+        self._final_path = self.messages_path / name
+        # Nome temporário sem extensão de áudio: não aparece na lista de mensagens
+        self._temp_path = self.messages_path / f".{name}.recording"
+
+        wav = wave.open(str(self._temp_path), 'wb')
+        wav.setnchannels(self.channels)
+        wav.setsampwidth(2)
+        wav.setframerate(self.rate)
+
+        self.frames_written = 0
+        self.is_recording = True
+        self._writer_thread = threading.Thread(target=self._write_loop, args=(wav,),
+                                               name="AnnouncementWriter", daemon=True)
+        self._writer_thread.start()
+        print(f"⏺️ Gravando aviso: {self._final_path.name}")
+        return self._final_path
+
+    def feed(self, data):
+        """
+        Entrega um bloco capturado (chamado pelo callback do microfone, não bloqueia).
+
+        Args:
+            data (bytes): Amostras int16
+        """
+        if self.is_recording:
+            self._queue.put_nowait(data)
+
+    def _write_loop(self, wav):
+        """Thread de escrita: grava os blocos em disco conforme chegam."""
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                wav.writeframesraw(data)
+                self.frames_written += len(data) // (2 * self.channels)
+        except Exception as e:
+            print(f"❌ Erro ao gravar aviso: {str(e)}")
+        finally:
+            wav.close()
+
+    def stop(self):
+        """
+        Encerra a gravação e inicia o pós-processamento em segundo plano.
+
+        Returns:
+            Path: Caminho do arquivo final (disponível após on_complete)
+        """
+        if not self.is_recording:
+            return None
+
+        self.is_recording = False
+        self._queue.put(None)
+        self._writer_thread.join(timeout=5.0)
+        print(f"⏹️ Gravação encerrada ({self.frames_written / self.rate:.1f}s), processando...")
+
+        threading.Thread(target=self._finalize, args=(self._temp_path, self._final_path),
+                         name="AnnouncementFinalize", daemon=True).start()
+        return self._final_path
+
+    def _finalize(self, temp_path, final_path):
+        """Trabalhador: corta o silêncio, normaliza e publica o arquivo."""
+        result = None
+        try:
+            result = self.process_file(temp_path, final_path)
+        except Exception as e:
+            print(f"❌ Erro ao processar aviso: {str(e)}")
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        if self.on_complete:
+            try:
+                self.on_complete(result)
+            except Exception as e:
+                print(f"⚠ Erro no callback de gravação: {str(e)}")
+
+    def _analyze(self, source):
+        """
+        Primeira passagem: localiza a voz (início e fim) e o pico, em blocos.
+
+        Returns:
+            tuple: (primeiro frame com voz, frame após o fim da voz, pico 0.0 a 1.0)
+        """
+        block = max(1, int(self.rate * self.ANALYSIS_SECONDS))
+        first = last = None
+        peak = 0.0
+        position = 0
+        with wave.open(str(source), 'rb') as wav:
+            while True:
+                data = wav.readframes(block)
+                if not data:
+                    break
+                frames = len(data) // (2 * self.channels)
+                rms, block_peak = measure_levels(data)
+                if rms >= self.silence_threshold:
+                    if first is None:
+                        first = position
+                    last = position + frames
+                if first is not None:
+                    peak = max(peak, block_peak)
+                position += frames
+        return first, last, peak
+
+    def process_file(self, source, destination):
+        """
+        Corta o silêncio das pontas e normaliza o pico, lendo e escrevendo em
+        blocos (o arquivo nunca é carregado inteiro na memória).
+
+        Args:
+            source (Path): WAV gravado
+            destination (Path): Arquivo final
+
+        Returns:
+            Path: Arquivo final ou None se não havia voz
+        """
+        first, last, peak = self._analyze(source)
+        if first is None:
+            print("⚠ Aviso sem voz detectada, descartado")
+            return None
+
+        padding = int(self.rate * self.PADDING_SECONDS)
+        with wave.open(str(source), 'rb') as wav:
+            total = wav.getnframes()
+        start = max(0, first - padding)
+        end = min(total, last + padding)
+        gain = self.target_peak / peak if peak > 0 else 1.0
+
+        temp_output = destination.with_name(f".{destination.name}.tmp")
+        block = int(self.rate * self.PROCESS_SECONDS)
+        with wave.open(str(source), 'rb') as reader, wave.open(str(temp_output), 'wb') as writer:
+            writer.setnchannels(self.channels)
+            writer.setsampwidth(2)
+            writer.setframerate(self.rate)
+            reader.setpos(start)
+            remaining = end - start
+            while remaining > 0:
+                data = reader.readframes(min(block, remaining))
+                if not data:
+                    break
+                remaining -= len(data) // (2 * self.channels)
+                writer.writeframes(_apply_gain(data, gain))
+        os.replace(temp_output, destination)
+
+        print(f"✅ Aviso pronto: {destination.name} ({(end - start) / self.rate:.1f}s, "
+              f"ganho {20 * math.log10(gain):+.1f} dB)")
+        return destination
+
+
+def _apply_gain(data, gain):
+    """Aplica ganho a um bloco int16 com saturação."""
+    if abs(gain - 1.0) < 1e-3:
+        return data
+    if np is not None:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32)
+        samples *= gain
+        np.clip(samples, -32768, 32767, out=samples)
+        return samples.astype('<i2').tobytes()
+
+    samples = array('h')
+    samples.frombytes(data)
+    if sys.byteorder != 'little':
+        samples.byteswap()
+    scaled = array('h', [max(-32768, min(32767, int(v * gain))) for v in samples])
+    if sys.byteorder != 'little':
+        scaled.byteswap()
+    return scaled.tobytes()
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+
+"""
+Log de veiculação (as-run / comprovação de exibição).
+Cada reprodução registrada pelo QueueService vira uma linha compacta no arquivo
+do dia (asrun-AAAA-MM-DD.log). Na virada do dia o arquivo anterior é compactado
+com gzip e suas contagens por mensagem entram no índice (asrun-index.json), de
+modo que "quantas vezes X tocou entre A e B" lê apenas o índice para os dias
+completos e os arquivos dos dias das pontas do período.
+
+Formato da linha (separado por tabulação, horários em segundos desde a época):
+    início  no_ar  término  agendado  duração  duração_prevista  prioridade  flags  arquivo
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+
+# Flags de veiculação
+FLAG_INTERRUPTED = "interrupted"  # terminou antes da duração prevista
+FLAG_FAILED = "failed"  # o player não conseguiu iniciar a mensagem
+FLAG_UNTERMINATED = "unterminated"  # o programa encerrou/caiu durante a reprodução
+
+# Tolerância (s) para considerar uma mensagem interrompida
+INTERRUPTION_TOLERANCE = 1.0
+
+
+AsRunEntry = namedtuple('AsRunEntry', [
+    'filename', 'priority', 'scheduled_at', 'started_at', 'aired_at', 'ended_at',
+    'duration', 'expected_duration', 'flags'])
+
+
+def _to_epoch(value):
+    return f"{value.timestamp():.1f}" if value else ""
+
+
+def _from_epoch(value):
+    return datetime.fromtimestamp(float(value)) if value else None
+
+
+class AsRunLog:
+    """
+    Registra as reproduções em arquivos diários e responde consultas por período.
+    """
+
+    def __init__(self, log_dir, retention_days=None):
+        """
+        Inicializa o log de veiculação.
+
+        Args:
+            log_dir (str ou Path): Pasta dos arquivos do log
+            retention_days (int, optional): Dias mantidos (None = mantém tudo)
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days
+
+        self.index_path = self.log_dir / "asrun-index.json"
+        self.open_path = self.log_dir / "asrun-open.json"
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_day = None
+        self._open = {}  # message_id -> dados da reprodução em andamento
+        self._index = self._load_index()
+
+        # asrun-open.json é gravado por uma thread própria, fora do caminho do agendador
+        self._open_changed = threading.Condition(self._lock)
+        self._open_dirty = False
+        self._open_write_lock = threading.Lock()  # evita gravações simultâneas (thread x close)
+        self._stopped = False
+
+        self._recover_unterminated()
+        self._close_file()
+        self._rotate_old_files()
+
+        self._open_writer = threading.Thread(target=self._open_writer_loop, name="AsRunOpenWriter",
+                                             daemon=True)
+        self._open_writer.start()
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+
+    def _day_path(self, day, compressed=False):
+        name = f"asrun-{day.isoformat()}.log"
+        return self.log_dir / (name + ".gz" if compressed else name)
+
+    def _load_index(self):
+        """Carrega o índice de contagens por dia (dia -> {arquivo: reproduções})."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        temp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def _save_open(self, pending):
+        """Grava as reproduções em andamento (recuperadas se o programa cair)."""
+        temp_path = self.open_path.with_name(self.open_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(pending, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temp_path, self.open_path)
+
+    def _schedule_open_save(self):
+        """Marca as reproduções em andamento para gravação (chamado com self._lock)."""
+        self._open_dirty = True
+        self._open_changed.notify()
+
+    def _open_writer_loop(self):
+        """Thread de gravação: grava asrun-open.json a cada alteração (agrupando as seguidas)."""
+        while True:
+            with self._open_changed:
+                while not self._open_dirty and not self._stopped:
+                    self._open_changed.wait()
+                if self._stopped:
+                    return  # a gravação final é feita por close()
+            self._flush_open()
+
+    def _flush_open(self):
+        """Grava agora as reproduções em andamento, se alteradas."""
+        with self._open_write_lock:
+            with self._lock:
+                if not self._open_dirty:
+                    return
+                pending = [dict(data) for data in self._open.values()]
+                self._open_dirty = False
+            try:
+                self._save_open(pending)
+            except Exception as e:
+                print(f"❌ Erro ao gravar reproduções em andamento do as-run: {str(e)}")
+
+    def _recover_unterminated(self):
+        """Registra como não terminadas as reproduções abertas na sessão anterior."""
+        if not self.open_path.exists():
+            return
+        try:
+            with open(self.open_path, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except (OSError, ValueError):
+            pending = []
+
+        for data in pending:
+            data['flags'] = FLAG_UNTERMINATED
+            self._write_entry(data)
+        if pending:
+            print(f"⚠ As-run: {len(pending)} reprodução(ões) sem término registradas como não terminadas")
+        self.open_path.unlink()
+
+    def _rotate_old_files(self):
+        """Compacta os arquivos de dias anteriores e aplica a retenção."""
+        today = date.today()
+        for path in sorted(self.log_dir.glob("asrun-*.log")):
+            day = date.fromisoformat(path.name[len("asrun-"):-len(".log")])
+            if day < today:
+                self._close_day(day)
+
+        if self.retention_days:
+            oldest = (today - timedelta(days=self.retention_days)).isoformat()
+            for path in self.log_dir.glob("asrun-*.log.gz"):
+                day = path.name[len("asrun-"):-len(".log.gz")]
+                if day < oldest:
+                    path.unlink()
+                    self._index.pop(day, None)
+            self._save_index()
+
+    def _close_day(self, day):
+        """
+        Compacta o arquivo de um dia encerrado e soma suas contagens no índice.
+        Se o dia já foi compactado (reprodução registrada depois da virada), as
+        linhas entram como um novo membro gzip no fim do arquivo existente.
+        """
+        path = self._day_path(day)
+        counts = {}
+        with open(path, 'rb') as source, gzip.open(self._day_path(day, compressed=True), 'ab') as target:
+            for line in source:
+                target.write(line)
+                fields = line.rstrip(b'\n').split(b'\t')
+                if fields[7] == FLAG_FAILED.encode():
+                    continue  # não foi ao ar
+                filename = fields[8].decode('utf-8')
+                counts[filename] = counts.get(filename, 0) + 1
+        path.unlink()
+
+        day_counts = self._index.setdefault(day.isoformat(), {})
+        for filename, count in counts.items():
+            day_counts[filename] = day_counts.get(filename, 0) + count
+        self._save_index()
+        print(f"🗜️ As-run de {day.isoformat()} compactado ({sum(counts.values())} reproduções)")
+
+    def _write_entry(self, data):
+        """Acrescenta uma reprodução ao arquivo do dia em que começou."""
+        started_at = datetime.fromisoformat(data['started_at'])
+        day = started_at.date()
+
+        if day != self._file_day:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            previous_day = self._file_day
+            self._file_day = day
+            if previous_day is not None and previous_day < day:
+                # Virada do dia: compacta em segundo plano, fora do caminho do agendador
+                threading.Thread(target=self._close_day_safely, args=(previous_day,),
+                                 name="AsRunRotate", daemon=True).start()
+        if self._file is None:
+            self._file = open(self._day_path(day), 'a', encoding='utf-8')
+
+        def parse(key):
+            value = data.get(key)
+            return datetime.fromisoformat(value) if value else None
+
+        fields = (
+            _to_epoch(started_at),
+            _to_epoch(parse('aired_at')),
+            _to_epoch(parse('ended_at')),
+            _to_epoch(parse('scheduled_at')),
+            f"{data['duration']:.1f}" if data.get('duration') is not None else "",
+            f"{data['expected_duration']:.1f}" if data.get('expected_duration') else "",
+            str(data.get('priority') or ""),
+            data.get('flags') or "",
+            data['filename'].replace('\t', ' ').replace('\n', ' '),
+        )
+        self._file.write('\t'.join(fields) + '\n')
+        self._file.flush()
+
+    def _close_day_safely(self, day):
+        with self._lock:
+            try:
+                if self._day_path(day).exists():
+                    self._close_day(day)
+            except Exception as e:
+                print(f"❌ Erro ao compactar as-run de {day.isoformat()}: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Registro (chamado pelo QueueService)
+    # ------------------------------------------------------------------
+
+    def record_start(self, ticket, started_at):
+        """
+        Registra o início da transição para uma mensagem.
+
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem
+            started_at (datetime): Início (começo do fade da rádio)
+        """
+        scheduled_time = getattr(ticket, 'scheduled_time', None)
+        with self._lock:
+            self._open[ticket.message_id] = {
+                'filename': ticket.filename,
+                'priority': ticket.priority,
+                'scheduled_at': scheduled_time.isoformat() if scheduled_time else None,
+                'started_at': started_at.isoformat(),
+            }
+            self._schedule_open_save()
+
+    def record_on_air(self, ticket, aired_at, expected_duration=None):
+        """
+        Registra o momento em que o áudio da mensagem começou.
+
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem
+            aired_at (datetime): Início do áudio
+            expected_duration (float, optional): Duração do arquivo em segundos
+        """
+        with self._lock:
+            data = self._open.get(ticket.message_id)
+            if data is None:
+                return
+            data['aired_at'] = aired_at.isoformat()
+            data['expected_duration'] = expected_duration
+            self._schedule_open_save()
+
+    def record_end(self, ticket, ended_at, failed=False):
+        """
+        Fecha a reprodução e grava a linha no log do dia.
+
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem
+            ended_at (datetime): Fim do áudio (antes do fade de volta)
+            failed (bool): O player não conseguiu iniciar a mensagem
+        """
+        with self._lock:
+            data = self._open.pop(ticket.message_id, None)
+            if data is None:
+                return
+
+            data['ended_at'] = ended_at.isoformat()
+            aired_at = datetime.fromisoformat(data.get('aired_at') or data['started_at'])
+            duration = 0.0 if failed else max(0.0, (ended_at - aired_at).total_seconds())
+            data['duration'] = duration
+
+            expected = data.get('expected_duration')
+            if failed:
+                data['flags'] = FLAG_FAILED
+            elif expected and duration < expected - INTERRUPTION_TOLERANCE:
+                data['flags'] = FLAG_INTERRUPTED
+
+            self._schedule_open_save()
+            try:
+                self._write_entry(data)
+            except Exception as e:
+                print(f"❌ Erro ao gravar as-run: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _read_day(self, day):
+        """Lê as linhas de um dia (arquivo compactado e, depois, o arquivo atual)."""
+        lines = []
+        compressed = self._day_path(day, compressed=True)
+        if compressed.exists():
+            with gzip.open(compressed, 'rt', encoding='utf-8') as f:
+                lines.extend(f.readlines())
+        path = self._day_path(day)
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                lines.extend(f.readlines())
+        return lines
+
+    def _indexed_counts(self, day):
+        """
+        Contagens do índice para um dia, ou None se o índice não cobre o dia
+        inteiro (dia não compactado ou com reproduções registradas depois).
+        """
+        if self._day_path(day).exists():
+            return None
+        return self._index.get(day.isoformat())
+
+    @staticmethod
+    def _parse_line(line):
+        fields = line.rstrip('\n').split('\t')
+        return AsRunEntry(
+            filename=fields[8],
+            priority=int(fields[6]) if fields[6] else None,
+            scheduled_at=_from_epoch(fields[3]),
+            started_at=_from_epoch(fields[0]),
+            aired_at=_from_epoch(fields[1]),
+            ended_at=_from_epoch(fields[2]),
+            duration=float(fields[4]) if fields[4] else None,
+            expected_duration=float(fields[5]) if fields[5] else None,
+            flags=fields[7].split(',') if fields[7] else [],
+        )
+
+    def _days(self, start, end):
+        """Dias com registros no período [start, end)."""
+        first = start.date() if start else min(
+            (date.fromisoformat(day) for day in self._index), default=date.today())
+        last = (end - timedelta(microseconds=1)).date() if end else date.today()
+        day = first
+        while day <= last:
+            yield day
+            day += timedelta(days=1)
+
+    def get_plays(self, filename=None, start=None, end=None):
+        """
+        Lista as reproduções no período.
+
+        Args:
+            filename (str, optional): Apenas este arquivo
+            start (datetime, optional): Início do período (inclusive)
+            end (datetime, optional): Fim do período (exclusive)
+
+        Returns:
+            list: AsRunEntry em ordem cronológica
+        """
+        entries = []
+        with self._lock:
+            for day in self._days(start, end):
+                counts = self._indexed_counts(day)
+                if filename is not None and counts is not None and filename not in counts:
+                    continue
+                for line in self._read_day(day):
+                    entry = self._parse_line(line)
+                    if filename is not None and entry.filename != filename:
+                        continue
+                    if (start and entry.started_at < start) or (end and entry.started_at >= end):
+                        continue
+                    entries.append(entry)
+        return entries
+
+    def count_plays(self, filename, start=None, end=None):
+        """
+        Conta as reproduções (que foram ao ar) de uma mensagem no período. Dias
+        inteiros dentro do período são respondidos pelo índice, sem abrir os arquivos.
+
+        Args:
+            filename (str): Nome do arquivo
+            start (datetime, optional): Início do período (inclusive)
+            end (datetime, optional): Fim do período (exclusive)
+
+        Returns:
+            int: Número de reproduções
+        """
+        total = 0
+        with self._lock:
+            for day in self._days(start, end):
+                day_start = datetime.combine(day, datetime.min.time())
+                whole_day = (start is None or start <= day_start) and \
+                            (end is None or end >= day_start + timedelta(days=1))
+                counts = self._indexed_counts(day)
+
+                if counts is not None and whole_day:
+                    total += counts.get(filename, 0)
+                    continue
+                if counts is not None and filename not in counts:
+                    continue
+
+                for line in self._read_day(day):
+                    fields = line.rstrip('\n').split('\t')
+                    if fields[8] != filename or fields[7] == FLAG_FAILED:
+                        continue
+                    started_at = _from_epoch(fields[0])
+                    if (start and started_at < start) or (end and started_at >= end):
+                        continue
+                    total += 1
+        return total
+
+    def close(self):
+        """
+        Encerra o log: para a thread de gravação, grava as reproduções em andamento
+        (que continuam em asrun-open.json) e fecha o arquivo do dia.
+        """
+        with self._lock:
+            self._stopped = True
+            self._open_changed.notify()
+        self._open_writer.join(timeout=2.0)
+        self._flush_open()
+        self._close_file()
+
+    def _close_file(self):
+        """Fecha o arquivo do dia."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._file_day = None
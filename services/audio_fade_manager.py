@@ -3,7 +3,6 @@ Sistema de Fade Suave para JB FM Player
 Gerencia transições suaves entre rádio e mensagens
 """
 
-import threading
 import time
 import math
 from datetime import datetime
@@ -29,10 +28,6 @@ class AudioFadeManager:
         self.background_volume = 2  # Volume da rádio durante mensagem (%)
         self.normal_volume = 100  # Volume normal da rádio (%)
         
-        # Estado atual
-        self.fade_threads = []
-        self.current_radio_volume = 100
-        
         # Tipos de curva de fade
         self.FADE_LINEAR = "linear"
         self.FADE_EXPONENTIAL = "exponential" 
@@ -82,6 +77,10 @@ class AudioFadeManager:
         """
         Realiza fade suave no volume da rádio - VERSÃO CORRIGIDA.
         NUNCA zera o volume completamente.
+        
+        O fade é feito pelo player (um único fade da rádio por vez): o fade
+        parte do volume atual e cancela o que estiver em andamento, de modo
+        que não se intercala com o ducking do microfone/VOX.
         """
         if duration is None:
             duration = self.fade_duration
@@ -93,131 +92,40 @@ class AudioFadeManager:
         if end_volume < self.background_volume:
             end_volume = self.background_volume
         
-        # Para threads anteriores
-        self._stop_fade_threads()
-        
-        def fade_thread():
-            try:
-                steps = int(duration * self.fade_steps)
-                if steps < 1:
-                    steps = 1
-                    
-                step_delay = duration / steps
-                
-                print(f"🎵 FADE RÁDIO: {start_volume}% → {end_volume}% em {duration:.1f}s")
-                
-                for i in range(steps + 1):
-                    if not hasattr(self, 'fade_threads') or len(self.fade_threads) == 0:
-                        break
-                        
-                    progress = i / steps
-                    fade_value = self.calculate_fade_value(progress, fade_type)
-                    
-                    # Interpola entre volumes
-                    current_volume = int(start_volume + (end_volume - start_volume) * fade_value)
-                    current_volume = max(self.background_volume, min(100, current_volume))  # NUNCA abaixo do mínimo
-                    
-                    # Aplica o volume
-                    if hasattr(self.player_service, 'radio_player') and self.player_service.radio_player:
-                        self.player_service.radio_player.audio_set_volume(current_volume)
-                        self.current_radio_volume = current_volume
-                    
-                    time.sleep(step_delay)
-                
-                # Garante volume final exato (mas nunca zero)
-                final_volume = max(self.background_volume, end_volume)
-                self.player_service.radio_player.audio_set_volume(final_volume)
-                print(f"✅ Fade concluído: volume final {final_volume}%")
-                
-            except Exception as e:
-                print(f"❌ Erro no fade: {str(e)}")
-        
-        # Inicia fade em thread separada
-        thread = threading.Thread(target=fade_thread, daemon=True)
-        self.fade_threads.append(thread)
-        thread.start()
-        
-        def fade_thread():
-            try:
-                steps = int(duration * self.fade_steps)
-                if steps < 1:
-                    steps = 1
-                    
-                step_delay = duration / steps
-                
-                print(f"🎵 FADE RÁDIO: {start_volume}% → {end_volume}% em {duration:.1f}s ({fade_type})")
-                
-                for i in range(steps + 1):
-                    if not hasattr(self, 'fade_threads') or len(self.fade_threads) == 0:
-                        # Thread foi cancelada
-                        break
-                        
-                    progress = i / steps
-                    fade_value = self.calculate_fade_value(progress, fade_type)
-                    
-                    # Interpola entre volumes
-                    current_volume = int(start_volume + (end_volume - start_volume) * fade_value)
-                    current_volume = max(0, min(100, current_volume))
-                    
-                    # Aplica o volume
-                    if hasattr(self.player_service, 'radio_player'):
-                        self.player_service.radio_player.audio_set_volume(current_volume)
-                        self.current_radio_volume = current_volume
-                    
-                    # Debug a cada 20% do progresso
-                    if i % max(1, steps // 5) == 0:
-                        print(f"   Fade: {current_volume}% (progresso: {int(progress * 100)}%)")
-                    
-                    time.sleep(step_delay)
-                
-                print(f"✅ Fade da rádio concluído: volume final {end_volume}%")
-                
-            except Exception as e:
-                print(f"❌ Erro no fade da rádio: {str(e)}")
-        
-        # Inicia fade em thread separada
-        thread = threading.Thread(target=fade_thread, daemon=True)
-        self.fade_threads.append(thread)
-        thread.start()
+        print(f"🎵 FADE RÁDIO: {start_volume}% → {end_volume}% em {duration:.1f}s ({fade_type})")
+        self.player_service.set_radio_volume(end_volume, duration, curve=self._curve(fade_type),
+                                             steps_per_second=self.fade_steps)
+    
+    def _curve(self, fade_type=None):
+        """Curva do fade no formato aceito pelo player (progresso → valor)."""
+        return lambda progress: self.calculate_fade_value(progress, fade_type)
     
     def _stop_fade_threads(self):
-        """Para todas as threads de fade ativas."""
-        # Limpa a lista, o que sinaliza às threads para pararem
-        self.fade_threads.clear()
+        """Para o fade da rádio em andamento."""
+        if hasattr(self.player_service, 'cancel_radio_fade'):
+            self.player_service.cancel_radio_fade()
     
     def start_message_transition(self):
         """
         Inicia transição suave para reprodução de mensagem.
+        A rádio é abaixada por um pedido de duck da origem 'message': se o
+        microfone/VOX já a abaixou mais, prevalece o menor volume.
         
         Returns:
             bool: True se iniciou com sucesso
         """
         try:
             print("🎵 INICIANDO TRANSIÇÃO: Rádio → Mensagem")
-            
-            # Obtém o volume atual da rádio
-            try:
-                current_volume = self.player_service.radio_player.audio_get_volume()
-                if current_volume <= 0:
-                    current_volume = self.normal_volume
-                self.current_radio_volume = current_volume
-            except:
-                current_volume = self.normal_volume
-                self.current_radio_volume = current_volume
-            
-            print(f"   Volume atual da rádio: {current_volume}%")
             print(f"   Reduzindo para: {self.background_volume}%")
             
             # Fade out da rádio de forma suave
-            if current_volume > self.background_volume:
-                self.fade_radio_volume(
-                    start_volume=current_volume,
-                    end_volume=self.background_volume,
-                    duration=self.fade_duration,
-                    fade_type=self.fade_curve
-                )
-            else:
-                print("⚠️ Volume da rádio já está baixo, pulando fade.")
+            self.player_service.duck_radio(
+                'message',
+                self.background_volume / float(self.normal_volume),
+                fade_duration=self.fade_duration,
+                curve=self._curve(),
+                steps_per_second=self.fade_steps
+            )
             
             return True
             
@@ -228,6 +136,7 @@ class AudioFadeManager:
     def end_message_transition(self):
         """
         Finaliza transição suave após reprodução de mensagem.
+        A rádio volta ao volume normal, ou ao do microfone/VOX se ainda ativo.
         
         Returns:
             bool: True se finalizou com sucesso
@@ -238,22 +147,12 @@ class AudioFadeManager:
             # Aguarda um pouco para a mensagem terminar completamente
             time.sleep(0.5)
             
-            # Obtém o volume atual
-            try:
-                current_volume = self.player_service.radio_player.audio_get_volume()
-                self.current_radio_volume = current_volume
-            except:
-                current_volume = self.background_volume
-            
-            print(f"   Volume atual da rádio: {current_volume}%")
-            print(f"   Restaurando para: {self.normal_volume}%")
-            
             # Fade in da rádio de volta ao volume normal
-            self.fade_radio_volume(
-                start_volume=current_volume,
-                end_volume=self.normal_volume,
-                duration=self.fade_duration,
-                fade_type=self.fade_curve
+            self.player_service.unduck_radio(
+                'message',
+                fade_duration=self.fade_duration,
+                curve=self._curve(),
+                steps_per_second=self.fade_steps
             )
             
             return True
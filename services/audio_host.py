@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+Host de áudio (PortAudio) compartilhado pelo processo.
+Uma única instância do PyAudio atende o microfone e as fontes de rádio, e a
+tabela de dispositivos é enumerada uma vez e mantida em cache: os diálogos
+leem a tabela pronta, sem sondar todos os dispositivos a cada abertura.
+O PortAudio só é inicializado quando algum serviço realmente precisa dele.
+"""
+
+import threading
+
+import pyaudio
+
+
+# Correções para nomes de dispositivos com problema de codificação em português
+_NAME_REPLACEMENTS = {
+    'Ã¡': 'á', 'Ã©': 'é', 'Ã­': 'í', 'Ã³': 'ó', 'Ãº': 'ú',
+    'Ã£': 'ã', 'Ãµ': 'õ', 'Ã¢': 'â', 'Ãª': 'ê', 'Ã´': 'ô',
+    'Ã§': 'ç', 'Ã‰': 'É', 'Ãƒ': 'Ã', 'Ã‡': 'Ç',
+    'estÃ©reo': 'estéreo', 'SaÃ­da': 'Saída', 'Ãudio': 'Áudio',
+    'MicrofoneÃ': 'Microfone'
+}
+
+
+def fix_device_name(name):
+    """
+    Corrige problemas comuns de codificação em nomes de dispositivos.
+
+    Args:
+        name (str): Nome reportado pelo PortAudio
+
+    Returns:
+        str: Nome corrigido
+    """
+    for wrong, correct in _NAME_REPLACEMENTS.items():
+        name = name.replace(wrong, correct)
+    return name
+
+
+class AudioHost:
+    """
+    Instância compartilhada do PyAudio com tabela de dispositivos em cache.
+
+    Cada serviço chama acquire() ao começar a usar o host e release() no seu
+    cleanup; o PortAudio é encerrado quando o último usuário libera.
+
+    O PortAudio só enxerga dispositivos conectados/removidos depois de ser
+    reinicializado. refresh_devices() faz essa reinicialização (quando nenhum
+    stream está aberto); uma falha ao abrir um stream marca a tabela como
+    desatualizada, e a próxima consulta é feita após a reinicialização.
+    """
+
+    def __init__(self):
+        self._audio = None
+        self._users = 0
+        self._open_streams = 0
+        self._devices = None  # tabela em cache (None = ainda não enumerada)
+        self._stale = False  # tabela suspeita (ex: dispositivo removido)
+        self._lock = threading.RLock()
+        # Incrementado a cada reenumeração (os índices podem mudar)
+        self.generation = 0
+
+    def acquire(self):
+        """
+        Registra um usuário do host.
+
+        Returns:
+            AudioHost: O próprio host
+        """
+        with self._lock:
+            self._users += 1
+        return self
+
+    def release(self):
+        """Libera um usuário; encerra o PortAudio quando não restar nenhum."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._terminate()
+
+    @property
+    def audio(self):
+        """Instância do PyAudio, inicializada no primeiro uso."""
+        with self._lock:
+            if self._audio is None:
+                self._audio = pyaudio.PyAudio()
+            return self._audio
+
+    def _terminate(self):
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+            self._devices = None
+            print("Host de áudio encerrado")
+
+    def open_stream(self, **kwargs):
+        """
+        Abre um stream do PortAudio (mesmos argumentos de PyAudio.open).
+        Se a abertura falhar, a tabela de dispositivos é marcada como
+        desatualizada (provável dispositivo desconectado).
+
+        Returns:
+            pyaudio.Stream: Stream aberto
+        """
+        with self._lock:
+            try:
+                stream = self.audio.open(**kwargs)
+            except Exception:
+                self._stale = True
+                raise
+            self._open_streams += 1
+            return stream
+
+    def close_stream(self, stream):
+        """
+        Para e fecha um stream aberto por open_stream.
+
+        Args:
+            stream (pyaudio.Stream): Stream a fechar
+        """
+        try:
+            if not stream.is_stopped():
+                stream.stop_stream()
+            stream.close()
+        finally:
+            with self._lock:
+                self._open_streams = max(0, self._open_streams - 1)
+
+    def get_devices(self, refresh=False):
+        """
+        Retorna a tabela de dispositivos (enumerada apenas quando necessário).
+
+        Args:
+            refresh (bool): Força uma nova enumeração (ex: botão "Atualizar")
+
+        Returns:
+            list: Dicionários com index, name, inputs, outputs, default_rate,
+                default_input e default_output
+        """
+        with self._lock:
+            if refresh or self._stale or self._devices is None:
+                self._enumerate(reinitialize=refresh or self._stale)
+            return self._devices
+
+    def refresh_devices(self):
+        """
+        Reenumera os dispositivos, detectando os conectados ou removidos.
+
+        Returns:
+            list: Tabela atualizada
+        """
+        return self.get_devices(refresh=True)
+
+    def _enumerate(self, reinitialize=False):
+        if reinitialize and self._audio is not None:
+            if self._open_streams == 0:
+                # Reinicializa o PortAudio para que ele enxergue mudanças de hardware
+                self._audio.terminate()
+                self._audio = None
+            else:
+                print("⚠ Streams abertos: lista de dispositivos atualizada sem reinicializar o PortAudio")
+
+        audio = self.audio
+        devices = []
+        try:
+            info = audio.get_host_api_info_by_index(0)
+            default_input = self._default_index(audio.get_default_input_device_info)
+            default_output = self._default_index(audio.get_default_output_device_info)
+
+            for i in range(info.get('deviceCount')):
+                device_info = audio.get_device_info_by_index(i)
+                devices.append({
+                    'index': i,
+                    'name': fix_device_name(device_info.get('name')),
+                    'inputs': device_info.get('maxInputChannels'),
+                    'outputs': device_info.get('maxOutputChannels'),
+                    'default_rate': device_info.get('defaultSampleRate'),
+                    'default_input': i == default_input,
+                    'default_output': i == default_output,
+                })
+        except Exception as e:
+            print(f"Erro ao listar dispositivos de áudio: {str(e)}")
+
+        self._devices = devices
+        self._stale = False
+        self.generation += 1
+        print(f"🔌 {len(devices)} dispositivos de áudio encontrados")
+
+    @staticmethod
+    def _default_index(getter):
+        # Sem dispositivo padrão o PortAudio levanta IOError
+        try:
+            return getter().get('index')
+        except IOError:
+            return None
+
+    def get_input_devices(self, refresh=False):
+        """Dispositivos com canais de entrada (microfones, placas de captura)."""
+        return [d for d in self.get_devices(refresh) if d['inputs'] > 0]
+
+    def get_output_devices(self, refresh=False):
+        """Dispositivos com canais de saída."""
+        return [d for d in self.get_devices(refresh) if d['outputs'] > 0]
+
+
+_shared_host = None
+_shared_lock = threading.Lock()
+
+
+def get_audio_host():
+    """
+    Retorna o host de áudio compartilhado do processo (criado no primeiro uso).
+
+    Returns:
+        AudioHost: Host compartilhado
+    """
+    global _shared_host
+    with _shared_lock:
+        if _shared_host is None:
+            _shared_host = AudioHost()
+        return _shared_host
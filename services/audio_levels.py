@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+Medição de níveis de áudio PCM 16 bits (RMS e pico), usada pelos medidores
+do microfone, pelo VOX e pela gravação de avisos.
+"""
+
+import math
+import operator
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Valor máximo de uma amostra de 16 bits (normalização dos medidores)
+_INT16_FULL_SCALE = 32768.0
+
+
+def measure_levels(data):
+    """
+    Calcula os níveis RMS e de pico de um bloco de áudio PCM 16 bits.
+    Com NumPy o buffer é lido por uma visão (sem cópia) e o cálculo é vetorizado;
+    sem NumPy, o array nativo é percorrido em C (map), sem laço em Python.
+    
+    Args:
+        data (bytes): Amostras int16 little-endian
+        
+    Returns:
+        tuple: (rms, pico), ambos normalizados entre 0.0 e 1.0
+    """
+    if not data:
+        return 0.0, 0.0
+    
+    if np is not None:
+        samples = np.frombuffer(data, dtype='<i2')
+        peak = max(int(samples.max()), -int(samples.min()))
+        rms = math.sqrt(float(np.dot(samples, samples.astype(np.float64))) / samples.size)
+    else:
+        samples = array('h')
+        samples.frombytes(data)
+        if sys.byteorder != 'little':
+            samples.byteswap()
+        peak = max(max(samples), -min(samples))
+        rms = math.sqrt(sum(map(operator.mul, samples, samples)) / len(samples))
+    
+    return rms / _INT16_FULL_SCALE, min(1.0, peak / _INT16_FULL_SCALE)
+
+
+def level_to_db(level):
+    """Converte um nível normalizado (0.0 a 1.0) em dBFS."""
+    return 20 * math.log10(level) if level > 0 else float('-inf')
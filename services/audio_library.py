@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""
+Biblioteca de mensagens: índice em memória dos arquivos de áudio da pasta AUDIO.
+Uma única passagem de os.scandir monta (ou confere) o índice, e cada nova
+varredura devolve apenas as diferenças: arquivos adicionados, removidos e
+modificados. A pasta e os arquivos são observados com QFileSystemWatcher (ou,
+sem Qt, por uma thread que confere a data de modificação da pasta e, de tempos
+em tempos, o tamanho e a data de cada arquivo), e as diferenças são entregues
+aos interessados sem recarregar a lista inteira.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from models.library_entry import LibraryEntry
+
+try:
+    from PyQt6.QtCore import QFileSystemWatcher, QTimer
+except ImportError:
+    QFileSystemWatcher = None
+    QTimer = None
+
+
+# Extensões de áudio aceitas (comparadas em minúsculas)
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.aac', '.ogg', '.flac', '.m4a')
+
+
+def is_audio_file(name):
+    """
+    Verifica se um nome de arquivo é de uma mensagem de áudio.
+    Arquivos ocultos (temporários da gravação e da importação) são ignorados.
+
+    Args:
+        name (str): Nome do arquivo
+
+    Returns:
+        bool: True se é um arquivo de áudio da biblioteca
+    """
+    return not name.startswith('.') and os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+
+
+class AudioLibrary:
+    """
+    Índice incremental dos arquivos de áudio de uma pasta.
+
+    Os callbacks registrados com add_listener recebem (added, removed, modified),
+    listas de LibraryEntry, sempre que uma varredura encontra diferenças.
+    """
+
+    # Espera após um aviso de alteração da pasta antes de varrer (agrupa as
+    # alterações de uma cópia de vários arquivos)
+    DEBOUNCE_MS = 300
+    # Intervalo da verificação sem Qt
+    POLL_SECONDS = 2.0
+    # Sem Qt, a data da pasta só muda ao criar/remover/renomear arquivos: a cada
+    # este intervalo a varredura completa confere também os arquivos alterados no lugar
+    FULL_SCAN_SECONDS = 30.0
+
+    def __init__(self, messages_path):
+        """
+        Inicializa a biblioteca (a pasta só é lida na primeira varredura).
+
+        Args:
+            messages_path (Path): Pasta das mensagens (AUDIO)
+        """
+        self.messages_path = Path(messages_path)
+        self._entries = {}  # nome -> LibraryEntry
+        self._scanned = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        self._watcher = None
+        self._debounce = None
+        self._poll_thread = None
+        self._poll_stop = threading.Event()
+
+    # ----- Consulta -----
+
+    def ensure_scanned(self):
+        """Faz a primeira varredura, se ainda não foi feita."""
+        if not self._scanned:
+            self.scan()
+
+    def files(self):
+        """
+        Nomes dos arquivos da biblioteca em ordem alfabética.
+
+        Returns:
+            list: Nomes dos arquivos
+        """
+        self.ensure_scanned()
+        return sorted(self._entries, key=str.lower)
+
+    def entries(self):
+        """Lista de LibraryEntry (sem ordem definida)."""
+        self.ensure_scanned()
+        return list(self._entries.values())
+
+    def get(self, name):
+        """
+        Entrada de um arquivo pelo nome.
+
+        Args:
+            name (str): Nome do arquivo
+
+        Returns:
+            LibraryEntry: Entrada ou None
+        """
+        self.ensure_scanned()
+        return self._entries.get(name)
+
+    def __contains__(self, name):
+        self.ensure_scanned()
+        return name in self._entries
+
+    def __len__(self):
+        self.ensure_scanned()
+        return len(self._entries)
+
+    # ----- Varredura incremental -----
+
+    def _read_directory(self):
+        """Uma passagem de os.scandir: nome -> LibraryEntry."""
+        found = {}
+        with os.scandir(self.messages_path) as iterator:
+            for item in iterator:
+                if not is_audio_file(item.name):
+                    continue
+                try:
+                    if not item.is_file():
+                        continue
+                    stat = item.stat()
+                except OSError:
+                    continue  # removido durante a varredura
+                found[item.name] = LibraryEntry(item.name, Path(item.path),
+                                                stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def scan(self):
+        """
+        Confere a pasta e atualiza o índice.
+
+        Returns:
+            tuple: (added, removed, modified) listas de LibraryEntry
+        """
+        # Leitura e comparação sob o mesmo lock: varreduras simultâneas (thread de
+        # verificação e interface) não publicam um estado antigo por cima de um novo
+        with self._lock:
+            try:
+                found = self._read_directory()
+            except FileNotFoundError:
+                found = {}
+            except OSError as e:
+                print(f"❌ Erro ao ler a pasta de mensagens: {str(e)}")
+                return [], [], []
+
+            old = self._entries
+            added = [entry for name, entry in found.items() if name not in old]
+            removed = [entry for name, entry in old.items() if name not in found]
+            modified = [entry for name, entry in found.items()
+                        if name in old and old[name].signature != entry.signature]
+            self._entries = found
+            first_scan = not self._scanned
+            self._scanned = True
+
+        if first_scan:
+            print(f"🎵 Biblioteca: {len(found)} arquivo(s) de áudio em {self.messages_path}")
+        elif added or removed or modified:
+            print(f"🎵 Biblioteca: +{len(added)} -{len(removed)} ~{len(modified)}")
+
+        if added or removed or modified:
+            self._notify(added, removed, modified)
+        return added, removed, modified
+
+    def add_listener(self, callback):
+        """
+        Registra um callback chamado com (added, removed, modified) a cada alteração.
+        Pode ser chamado fora da thread da interface (verificação sem Qt).
+
+        Args:
+            callback (callable): Função que recebe as três listas
+        """
+        if callback not in self._listeners:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        """Remove um callback registrado com add_listener."""
+        self._listeners = [c for c in self._listeners if c != callback]
+
+    def _notify(self, added, removed, modified):
+        for callback in self._listeners:
+            try:
+                callback(added, removed, modified)
+            except Exception as e:
+                print(f"⚠ Erro no callback da biblioteca: {str(e)}")
+
+    # ----- Observação da pasta -----
+
+    def start_watching(self):
+        """
+        Passa a observar a pasta: alterações disparam uma nova varredura.
+        Usa QFileSystemWatcher quando o Qt está disponível (chamar na thread
+        da interface); caso contrário, uma thread confere a pasta periodicamente.
+        """
+        self.ensure_scanned()
+        if self._watcher is not None or self._poll_thread is not None:
+            return
+
+        if QFileSystemWatcher is not None:
+            self._debounce = QTimer()
+            self._debounce.setSingleShot(True)
+            self._debounce.setInterval(self.DEBOUNCE_MS)
+            self._debounce.timeout.connect(self._scan_watched)
+            self._watcher = QFileSystemWatcher([str(self.messages_path)])
+            # A pasta avisa criação/remoção/renomeação; os arquivos, a regravação no lugar
+            self._watcher.directoryChanged.connect(lambda _path: self._debounce.start())
+            self._watcher.fileChanged.connect(lambda _path: self._debounce.start())
+            self._sync_watched_files()
+            print(f"👁️ Observando a pasta de mensagens: {self.messages_path}")
+            return
+
+        self._poll_stop.clear()
+        self._poll_thread = threading.Thread(target=self._poll_loop, name="AudioLibraryPoll",
+                                             daemon=True)
+        self._poll_thread.start()
+
+    def _scan_watched(self):
+        """Com Qt (thread da interface): varre e atualiza os arquivos observados."""
+        self.scan()
+        if self._watcher is not None:
+            self._sync_watched_files()
+
+    def _sync_watched_files(self):
+        """
+        Observa os arquivos atuais da biblioteca. Arquivos substituídos (gravação
+        em temporário + rename) saem da observação do Qt e voltam aqui.
+        """
+        watched = set(self._watcher.files())
+        current = {str(entry.path) for entry in self._entries.values()}
+        stale = watched - current
+        if stale:
+            self._watcher.removePaths(list(stale))
+        missing = current - watched
+        if missing:
+            self._watcher.addPaths(sorted(missing))
+
+    def _poll_loop(self):
+        """
+        Sem Qt: varre quando a data de modificação da pasta muda e, a cada
+        FULL_SCAN_SECONDS, confere todos os arquivos (alterações no lugar).
+        """
+        last = None
+        last_full_scan = time.monotonic()
+        while not self._poll_stop.wait(self.POLL_SECONDS):
+            try:
+                current = self.messages_path.stat().st_mtime_ns
+            except OSError:
+                current = None
+            now = time.monotonic()
+            if (last is not None and current != last) or now - last_full_scan >= self.FULL_SCAN_SECONDS:
+                self.scan()
+                last_full_scan = now
+            last = current
+
+    def stop_watching(self):
+        """Para a observação da pasta."""
+        if self._watcher is not None:
+            self._debounce.stop()
+            self._watcher.removePaths(self._watcher.directories() + self._watcher.files())
+            self._watcher = None
+            self._debounce = None
+        if self._poll_thread is not None:
+            self._poll_stop.set()
+            self._poll_thread.join(timeout=2.0)
+            self._poll_thread = None
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+def get_audio_library(messages_path):
+    """
+    Retorna a biblioteca compartilhada de uma pasta (criada no primeiro uso),
+    para que a inicialização e a janela usem o mesmo índice.
+
+    Args:
+        messages_path (Path): Pasta das mensagens
+
+    Returns:
+        AudioLibrary: Biblioteca da pasta
+    """
+    key = Path(messages_path).resolve()
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            library = _libraries[key] = AudioLibrary(key)
+        return library
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""
+Análise de arquivos de áudio da biblioteca: formato (pelo conteúdo, não pela
+extensão), duração, taxa de amostragem, canais, nível RMS/pico e validade.
+
+- O cabeçalho de cada formato é lido diretamente (poucos KB do início).
+- WAV PCM é medido com o módulo wave, em blocos.
+- Os demais formatos são decodificados pelo Pygame, o mesmo decodificador
+  usado na reprodução: um arquivo que falha aqui falharia no ar.
+"""
+
+import math
+import wave
+
+from models.audio_metadata import AudioMetadata
+from services.audio_levels import level_to_db, measure_levels
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+# Bytes lidos do início do arquivo para identificar o formato
+HEADER_BYTES = 64 * 1024
+# Bloco de leitura/medição (bytes)
+LEVEL_BLOCK_BYTES = 256 * 1024
+
+_MPEG_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_ADTS_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050,
+               16000, 12000, 11025, 8000, 7350)
+
+
+def _id3_size(data):
+    """Tamanho da tag ID3v2 no início do arquivo (0 se não houver)."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_frame_header(data, start):
+    """
+    Procura o primeiro cabeçalho de quadro MPEG/ADTS válido.
+
+    Returns:
+        tuple: (formato, taxa, canais) ou None
+    """
+    # O primeiro quadro fica logo após a tag ID3 (com pouco preenchimento);
+    # buscar no arquivo inteiro aceitaria bytes 0xFF quaisquer como cabeçalho
+    end = min(len(data) - 4, start + 4096)
+    position = data.find(b'\xff', start)
+    while 0 <= position < end:
+        b1, b2, b3 = data[position + 1], data[position + 2], data[position + 3]
+        if b1 & 0xE0 == 0xE0:
+            layer = (b1 >> 1) & 3
+            if layer == 0 and b1 & 0xF0 == 0xF0:
+                # ADTS (AAC): sincronismo de 12 bits e camada 00
+                rate_index = (b2 >> 2) & 0xF
+                if rate_index < len(_ADTS_RATES):
+                    channels = ((b2 & 1) << 2) | (b3 >> 6)
+                    return "AAC", _ADTS_RATES[rate_index], channels or None
+            elif layer != 0:
+                version = (b1 >> 3) & 3
+                rate_index = (b2 >> 2) & 3
+                bitrate_index = b2 >> 4
+                if version in _MPEG_RATES and rate_index != 3 and bitrate_index not in (0, 15):
+                    channels = 1 if (b3 >> 6) == 3 else 2
+                    return "MP3", _MPEG_RATES[version][rate_index], channels
+        position = data.find(b'\xff', position + 1)
+    return None
+
+
+def sniff_header(data):
+    """
+    Identifica o formato pelo conteúdo do início do arquivo.
+
+    Args:
+        data (bytes): Primeiros bytes do arquivo
+
+    Returns:
+        dict: format, sample_rate, channels e duration (quando o cabeçalho
+            informa) ou None se o formato não foi reconhecido
+    """
+    info = {'format': None, 'sample_rate': None, 'channels': None, 'duration': None}
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        info['format'] = "WAV"
+        return info
+
+    if data[:4] == b'fLaC' and len(data) >= 26:
+        # Bloco STREAMINFO logo após a assinatura
+        rate = (data[18] << 12) | (data[19] << 4) | (data[20] >> 4)
+        total = ((data[21] & 0x0F) << 32) | int.from_bytes(data[22:26], 'big')
+        info.update(format="FLAC", sample_rate=rate or None, channels=((data[20] >> 1) & 7) + 1)
+        if rate and total:
+            info['duration'] = total / rate
+        return info
+
+    if data[:4] == b'OggS':
+        info['format'] = "OGG"
+        vorbis = data.find(b'\x01vorbis')
+        if vorbis >= 0 and len(data) >= vorbis + 16:
+            info['channels'] = data[vorbis + 11]
+            info['sample_rate'] = int.from_bytes(data[vorbis + 12:vorbis + 16], 'little')
+        opus = data.find(b'OpusHead')
+        if opus >= 0 and len(data) >= opus + 16:
+            info['channels'] = data[opus + 9]
+            info['sample_rate'] = 48000  # Opus sempre decodifica a 48 kHz
+        return info
+
+    if data[4:8] == b'ftyp':
+        info['format'] = "M4A"
+        # Entrada de amostra 'mp4a' (presente no início em arquivos "faststart")
+        entry = data.find(b'mp4a')
+        if entry >= 0 and len(data) >= entry + 30:
+            info['channels'] = int.from_bytes(data[entry + 20:entry + 22], 'big') or None
+            info['sample_rate'] = int.from_bytes(data[entry + 28:entry + 30], 'big') or None
+        return info
+
+    frame = _find_frame_header(data, _id3_size(data))
+    if frame is not None:
+        info['format'], info['sample_rate'], info['channels'] = frame
+        return info
+
+    return None
+
+
+def _accumulate(totals, data):
+    """Soma a energia e o pico de um bloco int16 aos totais (energia, amostras, pico)."""
+    rms, peak = measure_levels(data)
+    samples = len(data) // 2
+    totals[0] += rms * rms * samples
+    totals[1] += samples
+    totals[2] = max(totals[2], peak)
+
+
+def _levels_db(totals):
+    """Converte os totais acumulados em (rms_db, peak_db)."""
+    energy, samples, peak = totals
+    if not samples:
+        return None, None
+    rms = math.sqrt(energy / samples)
+    return round(level_to_db(rms), 1) if rms > 0 else None, round(level_to_db(peak), 1) if peak > 0 else None
+
+
+def _probe_wave(path):
+    """WAV PCM pelo módulo wave (sem decodificar o arquivo inteiro na memória)."""
+    with wave.open(str(path), 'rb') as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        frames = wav.getnframes()
+        width = wav.getsampwidth()
+        totals = [0.0, 0, 0.0]
+        if width == 2:
+            block = max(1, LEVEL_BLOCK_BYTES // (2 * channels))
+            while True:
+                data = wav.readframes(block)
+                if not data:
+                    break
+                _accumulate(totals, data)
+
+    if not frames:
+        return AudioMetadata.invalid("arquivo sem áudio", "WAV")
+    rms_db, peak_db = _levels_db(totals)
+    return AudioMetadata("WAV", frames / rate, rate, channels, rms_db, peak_db, True, None)
+
+
+def _probe_decoded(path, info):
+    """Demais formatos: decodifica com o Pygame (o mesmo caminho da reprodução)."""
+    mixer = pygame.mixer.get_init()
+    sound = pygame.mixer.Sound(str(path))
+    duration = sound.get_length()
+    if duration <= 0:
+        return AudioMetadata.invalid("arquivo sem áudio", info['format'])
+
+    rms_db = peak_db = None
+    if mixer and mixer[1] == -16:
+        # Amostras decodificadas (int16 do mixer) lidas sem cópia, em blocos
+        view = memoryview(sound.get_view()).cast('B')
+        totals = [0.0, 0, 0.0]
+        for start in range(0, len(view), LEVEL_BLOCK_BYTES):
+            _accumulate(totals, view[start:start + LEVEL_BLOCK_BYTES])
+        rms_db, peak_db = _levels_db(totals)
+        view.release()
+
+    return AudioMetadata(info['format'], info['duration'] or duration, info['sample_rate'],
+                         info['channels'], rms_db, peak_db, True, None)
+
+
+def probe_file(path):
+    """
+    Analisa um arquivo de áudio.
+
+    Args:
+        path (Path): Caminho do arquivo
+
+    Returns:
+        AudioMetadata: Metadados (valid=False se o arquivo não pode ser reproduzido)
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+    except OSError as e:
+        return AudioMetadata.invalid(f"não foi possível ler ({e.strerror or e})")
+
+    if not header:
+        return AudioMetadata.invalid("arquivo vazio")
+
+    info = sniff_header(header)
+    if info is None:
+        return AudioMetadata.invalid("formato não reconhecido")
+
+    if info['format'] == "WAV":
+        try:
+            return _probe_wave(path)
+        except (wave.Error, EOFError):
+            pass  # WAV não PCM (float, ADPCM...): tenta o decodificador do Pygame
+
+    if pygame is None or not pygame.mixer.get_init():
+        # Sem decodificador disponível: apenas o cabeçalho
+        return AudioMetadata(info['format'], info['duration'], info['sample_rate'],
+                             info['channels'], None, None, True, None)
+
+    try:
+        return _probe_decoded(path, info)
+    except Exception as e:
+        return AudioMetadata.invalid(f"não decodifica ({str(e)})", info['format'])
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+Buffer circular de áudio entre o callback de entrada e o de saída.
+Um único produtor (callback de captura) e um único consumidor (callback de
+reprodução): cada lado só altera a sua própria posição, então não há lock e
+nenhum dos callbacks do PortAudio fica bloqueado esperando o outro.
+"""
+
+
+class AudioRingBuffer:
+    """
+    Buffer circular SPSC (um produtor, um consumidor) de bytes de áudio.
+
+    As posições de escrita e leitura só crescem; a ocupação é a diferença
+    entre elas. Escrita com buffer cheio descarta o excesso (overflow) e
+    leitura sem dados suficientes completa com silêncio (underrun).
+    """
+
+    def __init__(self, capacity, frame_bytes=2):
+        """
+        Inicializa o buffer.
+
+        Args:
+            capacity (int): Capacidade em bytes (arredondada para frames inteiros)
+            frame_bytes (int): Bytes por frame (amostra × canais)
+        """
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity - capacity % frame_bytes
+        self._buffer = bytearray(self.capacity)
+        self._write_pos = 0  # alterada apenas pelo produtor
+        self._read_pos = 0  # alterada apenas pelo consumidor
+
+        # Contadores de falhas (diagnóstico de xruns)
+        self.overflows = 0
+        self.underruns = 0
+
+    def available(self):
+        """Bytes prontos para leitura."""
+        return self._write_pos - self._read_pos
+
+    def write(self, data):
+        """
+        Escreve um bloco (produtor).
+
+        Args:
+            data (bytes): Dados de áudio
+
+        Returns:
+            int: Bytes efetivamente escritos
+        """
+        free = self.capacity - (self._write_pos - self._read_pos)
+        size = len(data)
+        if size > free:
+            self.overflows += 1
+            size = free - free % self.frame_bytes
+            if size <= 0:
+                return 0
+
+        start = self._write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        view = memoryview(data)
+        self._buffer[start:start + first] = view[:first]
+        if first < size:
+            self._buffer[:size - first] = view[first:size]
+
+        # Publica os dados somente depois de copiados
+        self._write_pos += size
+        return size
+
+    def read(self, size):
+        """
+        Lê um bloco (consumidor), completando com silêncio se faltar dado.
+
+        Args:
+            size (int): Bytes desejados
+
+        Returns:
+            bytes: Exatamente `size` bytes
+        """
+        available = self._write_pos - self._read_pos
+        count = min(size, available)
+        count -= count % self.frame_bytes
+
+        start = self._read_pos % self.capacity
+        first = min(count, self.capacity - start)
+        data = bytes(self._buffer[start:start + first])
+        if first < count:
+            data += bytes(self._buffer[:count - first])
+
+        self._read_pos += count
+        if count < size:
+            self.underruns += 1
+            data += bytes(size - count)
+        return data
+
+    def skip_to(self, keep):
+        """
+        Descarta os dados mais antigos, mantendo no máximo `keep` bytes (consumidor).
+        Usado para limitar a latência quando os relógios dos dispositivos divergem.
+
+        Args:
+            keep (int): Bytes a manter
+
+        Returns:
+            int: Bytes descartados
+        """
+        excess = (self._write_pos - self._read_pos) - keep
+        if excess <= 0:
+            return 0
+        excess -= excess % self.frame_bytes
+        self._read_pos += excess
+        return excess
+
+    def clear(self):
+        """Esvazia o buffer (somente com os dois lados parados)."""
+        self._read_pos = self._write_pos = 0
+        self.overflows = 0
+        self.underruns = 0
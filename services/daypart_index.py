@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+Índice de intervalos das regras de programação por horário (dayparting).
+As regras de todas as mensagens são compiladas em segmentos da semana, de modo
+que "quais mensagens podem tocar agora" e "quando isso muda" são respondidas
+com uma busca binária, sem avaliar cada regra a cada ciclo.
+"""
+
+from bisect import bisect_right
+from datetime import timedelta
+from models.daypart_rule import SECONDS_PER_DAY, SECONDS_PER_WEEK
+
+
+class DaypartIndex:
+    """
+    Índice compilado das regras de horário das mensagens.
+
+    Mensagens sem regras não entram no índice e são sempre elegíveis.
+    A semana é dividida em segmentos delimitados pelos inícios/fins de todas
+    as regras; cada segmento guarda o conjunto de mensagens elegíveis nele.
+    """
+
+    def __init__(self):
+        """Inicializa o índice vazio."""
+        self._rules = {}  # message_id -> lista de DaypartRule
+        self._boundaries = [0]  # início de cada segmento (segundos da semana)
+        self._segments = [frozenset()]  # mensagens restritas elegíveis em cada segmento
+        self._dirty = False
+
+    def __len__(self):
+        """Retorna o número de mensagens com restrição de horário."""
+        return len(self._rules)
+
+    def set_rules(self, message_id, rules):
+        """
+        Define (ou remove, se vazio) as regras de uma mensagem.
+
+        Args:
+            message_id (str): ID da mensagem
+            rules (list): Lista de DaypartRule
+        """
+        if rules:
+            self._rules[message_id] = list(rules)
+        else:
+            self._rules.pop(message_id, None)
+        self._dirty = True
+
+    def remove(self, message_id):
+        """Remove as regras de uma mensagem."""
+        if self._rules.pop(message_id, None) is not None:
+            self._dirty = True
+
+    def clear(self):
+        """Remove todas as regras."""
+        self._rules.clear()
+        self._dirty = True
+
+    def restricted_ids(self):
+        """Retorna os IDs das mensagens que possuem regras de horário."""
+        return list(self._rules)
+
+    def is_restricted(self, message_id):
+        """Retorna True se a mensagem possui regras de horário."""
+        return message_id in self._rules
+
+    def allows(self, message_id, when):
+        """
+        Avalia diretamente as regras de uma mensagem, sem compilar o índice
+        (usado enquanto um lote de alterações ainda não foi compilado).
+
+        Args:
+            message_id (str): ID da mensagem
+            when (datetime): Horário de referência
+
+        Returns:
+            bool: True se não há restrição ou se o horário está dentro de uma regra
+        """
+        rules = self._rules.get(message_id)
+        if not rules:
+            return True
+        second = self._week_second(when)
+        return any(begin <= second < finish
+                   for rule in rules for begin, finish in rule.intervals())
+
+    def _compile(self):
+        """Compila as regras em segmentos da semana (varredura de eventos)."""
+        events = {}
+        for message_id, rules in self._rules.items():
+            for rule in rules:
+                for begin, finish in rule.intervals():
+                    events.setdefault(begin, []).append((message_id, 1))
+                    events.setdefault(finish, []).append((message_id, -1))
+
+        boundaries = sorted(set(events) | {0})
+        boundaries = [b for b in boundaries if b < SECONDS_PER_WEEK]
+
+        counts = {}
+        segments = []
+        for boundary in boundaries:
+            for message_id, delta in events.get(boundary, ()):
+                counts[message_id] = counts.get(message_id, 0) + delta
+            segments.append(frozenset(mid for mid, count in counts.items() if count > 0))
+
+        self._boundaries = boundaries
+        self._segments = segments
+        self._dirty = False
+
+    @staticmethod
+    def _week_second(when):
+        """Converte um datetime em segundos desde segunda-feira 00:00."""
+        return (when.weekday() * SECONDS_PER_DAY + when.hour * 3600
+                + when.minute * 60 + when.second)
+
+    def _segment_index(self, when):
+        if self._dirty:
+            self._compile()
+        return bisect_right(self._boundaries, self._week_second(when)) - 1
+
+    def eligible_at(self, when):
+        """
+        Retorna as mensagens restritas que podem tocar no horário informado.
+
+        Args:
+            when (datetime): Horário de referência
+
+        Returns:
+            frozenset: IDs das mensagens restritas elegíveis
+        """
+        index = self._segment_index(when)
+        return self._segments[index]
+
+    def is_eligible(self, message_id, when):
+        """
+        Verifica se uma mensagem pode tocar no horário informado.
+
+        Args:
+            message_id (str): ID da mensagem
+            when (datetime): Horário de referência
+
+        Returns:
+            bool: True se não há restrição ou se o horário está dentro de uma regra
+        """
+        if message_id not in self._rules:
+            return True
+        return message_id in self.eligible_at(when)
+
+    def next_change(self, when):
+        """
+        Retorna o próximo horário em que a elegibilidade de alguma mensagem muda.
+
+        Args:
+            when (datetime): Horário de referência
+
+        Returns:
+            datetime: Horário da próxima mudança ou None se não há regras
+        """
+        if not self._rules:
+            return None
+
+        index = self._segment_index(when)
+        if index + 1 < len(self._boundaries):
+            next_boundary = self._boundaries[index + 1]
+        else:
+            next_boundary = SECONDS_PER_WEEK
+
+        offset = next_boundary - self._week_second(when)
+        base = when.replace(microsecond=0)
+        return base + timedelta(seconds=offset)
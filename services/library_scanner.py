@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""
+Análise em segundo plano dos arquivos da biblioteca de mensagens.
+Cada arquivo é analisado (duração, formato, taxa, nível, validade) por um
+pool de threads, e o resultado fica em um cache em disco identificado pelo
+tamanho e pela data de modificação do arquivo: na próxima abertura só os
+arquivos novos ou alterados são analisados de novo.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from models.audio_metadata import AudioMetadata
+from services.audio_probe import probe_file
+
+
+class LibraryScanner:
+    """
+    Mantém os metadados de todos os arquivos de uma AudioLibrary.
+
+    Os callbacks registrados com add_listener recebem (nome, AudioMetadata)
+    assim que cada análise termina, na thread do pool.
+    """
+
+    CACHE_VERSION = 1
+    # Espera antes de conferir de novo um arquivo que mudou durante a análise
+    # (ainda sendo copiado para a pasta)
+    RECHECK_SECONDS = 1.0
+
+    def __init__(self, library, cache_path, max_workers=2):
+        """
+        Inicializa o analisador.
+
+        Args:
+            library (AudioLibrary): Biblioteca observada
+            cache_path (Path): Arquivo JSON do cache de metadados
+            max_workers (int): Threads de análise
+        """
+        self.library = library
+        self.cache_path = Path(cache_path)
+        self.max_workers = max_workers
+
+        self._cache = {}  # nome -> {'size', 'mtime_ns', 'metadata'}
+        self._metadata = {}  # nome -> AudioMetadata dos arquivos atuais
+        self._pending = {}  # nome -> assinatura (tamanho, mtime) em análise
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._executor = None
+
+    # ----- Ciclo de vida -----
+
+    def start(self):
+        """Carrega o cache e agenda a análise dos arquivos sem metadados válidos."""
+        if self._executor is not None:
+            return
+        self._load_cache()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="LibraryScanner")
+        # Primeira varredura antes de assinar: o índice inicial é tratado abaixo;
+        # as alterações posteriores chegam pelo callback
+        self.library.ensure_scanned()
+        self.library.add_listener(self._on_library_changed)
+
+        entries = self.library.entries()
+        scheduled = sum(1 for entry in entries if self._schedule(entry))
+        print(f"🔎 Metadados: {len(entries) - scheduled} do cache, {scheduled} para analisar")
+
+    def stop(self):
+        """Cancela as análises pendentes e grava o cache."""
+        self.library.remove_listener(self._on_library_changed)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._pending.clear()
+        self.save_cache()
+
+    # ----- Consulta -----
+
+    def get(self, name):
+        """
+        Metadados de um arquivo.
+
+        Args:
+            name (str): Nome do arquivo
+
+        Returns:
+            AudioMetadata: Metadados ou None se ainda não foi analisado
+        """
+        return self._metadata.get(name)
+
+    def is_valid(self, name):
+        """True se o arquivo é reproduzível (ou ainda não foi analisado)."""
+        metadata = self._metadata.get(name)
+        return metadata is None or metadata.valid
+
+    def pending_count(self):
+        """Número de arquivos aguardando análise."""
+        return len(self._pending)
+
+    def add_listener(self, callback):
+        """
+        Registra um callback chamado com (nome, AudioMetadata) a cada análise concluída.
+
+        Args:
+            callback (callable): Função chamada na thread do pool
+        """
+        if callback not in self._listeners:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        """Remove um callback registrado com add_listener."""
+        self._listeners = [c for c in self._listeners if c != callback]
+
+    def remember(self, path, metadata):
+        """
+        Registra metadados já medidos (ex: pela importação), para que o arquivo
+        não seja analisado de novo quando a biblioteca o encontrar.
+
+        Args:
+            path (Path): Arquivo na pasta da biblioteca
+            metadata (AudioMetadata): Metadados do arquivo
+        """
+        if metadata is None:
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        name = Path(path).name
+        with self._lock:
+            self._cache[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                 'metadata': metadata.to_dict()}
+            self._metadata[name] = metadata
+            self._dirty = True
+
+    # ----- Análise -----
+
+    def _schedule(self, entry):
+        """
+        Usa o cache se ainda vale para o arquivo; senão agenda a análise.
+
+        Returns:
+            bool: True se a análise foi agendada
+        """
+        with self._lock:
+            cached = self._cache.get(entry.name)
+            if cached and (cached['size'], cached['mtime_ns']) == entry.signature:
+                self._metadata[entry.name] = AudioMetadata.from_dict(cached['metadata'])
+                return False
+            if self._pending.get(entry.name) == entry.signature:
+                return False  # já em análise
+            self._pending[entry.name] = entry.signature
+            # Os metadados antigos não valem mais para o conteúdo novo
+            self._metadata.pop(entry.name, None)
+
+        executor = self._executor
+        try:
+            executor.submit(self._probe, entry)
+        except (AttributeError, RuntimeError):
+            return False  # analisador parado
+        return True
+
+    def _probe(self, entry):
+        """Thread do pool: analisa um arquivo e publica o resultado."""
+        with self._lock:
+            if self._pending.get(entry.name) != entry.signature:
+                return  # removido ou substituído por uma versão mais nova
+
+        metadata = probe_file(entry.path)
+
+        try:
+            stat = os.stat(entry.path)
+            unchanged = (stat.st_size, stat.st_mtime_ns) == entry.signature
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            # O arquivo mudou durante a análise (cópia em andamento): a biblioteca
+            # confere a pasta de novo e agenda a versão final
+            with self._lock:
+                if self._pending.get(entry.name) == entry.signature:
+                    del self._pending[entry.name]
+            timer = threading.Timer(self.RECHECK_SECONDS, self.library.scan)
+            timer.daemon = True
+            timer.start()
+            return
+
+        with self._lock:
+            if self._pending.get(entry.name) != entry.signature:
+                return
+            del self._pending[entry.name]
+            self._metadata[entry.name] = metadata
+            self._cache[entry.name] = {'size': entry.size, 'mtime_ns': entry.mtime_ns,
+                                       'metadata': metadata.to_dict()}
+            self._dirty = True
+            finished = not self._pending
+
+        if not metadata.valid:
+            print(f"⚠ Arquivo inválido na biblioteca: {entry.name} ({metadata.error})")
+
+        for callback in self._listeners:
+            try:
+                callback(entry.name, metadata)
+            except Exception as e:
+                print(f"⚠ Erro no callback de metadados: {str(e)}")
+
+        if finished:
+            self.save_cache()
+
+    def _on_library_changed(self, added, removed, modified):
+        """Callback da biblioteca: analisa os arquivos novos/alterados e esquece os removidos."""
+        if self._executor is None:
+            return
+        with self._lock:
+            for entry in removed:
+                self._metadata.pop(entry.name, None)
+                self._pending.pop(entry.name, None)
+                if self._cache.pop(entry.name, None) is not None:
+                    self._dirty = True
+        for entry in list(added) + list(modified):
+            self._schedule(entry)
+        if removed and not self._pending:
+            self.save_cache()
+
+    # ----- Cache em disco -----
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.CACHE_VERSION:
+                self._cache = data.get('files', {})
+        except (OSError, ValueError) as e:
+            print(f"⚠ Cache de metadados ignorado: {str(e)}")
+
+    def save_cache(self):
+        """Grava o cache em disco (gravação atômica), se houve alterações."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'version': self.CACHE_VERSION, 'files': dict(self._cache)}
+            self._dirty = False
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠ Erro ao salvar cache de metadados: {str(e)}")
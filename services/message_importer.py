@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+
+"""
+Importação em lote de arquivos para a biblioteca de mensagens.
+Cada arquivo passa, em um pool de threads, por: cópia em blocos (com SHA-256
+calculado durante a cópia), detecção de duplicatas, análise (probe_file) e,
+opcionalmente, conversão para WAV PCM no formato do mixer. As cópias ficam
+como arquivos ocultos na pasta AUDIO (ignorados pela biblioteca) e só
+recebem o nome final todas juntas, no fim do lote, seguidas de uma única
+varredura da biblioteca.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from models.import_result import ImportResult
+from services.audio_library import get_audio_library, is_audio_file
+from services.audio_probe import probe_file
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+# Bloco de cópia/conversão (bytes): o cancelamento é conferido a cada bloco
+COPY_BLOCK_BYTES = 1024 * 1024
+# Formatos reproduzidos sem conversão (os demais podem ser convertidos para WAV)
+PLAYBACK_FORMATS = ("WAV", "MP3", "OGG")
+
+# O que fazer quando já existe um arquivo com o mesmo nome (e conteúdo diferente)
+CONFLICT_RENAME = "rename"
+CONFLICT_REPLACE = "replace"
+CONFLICT_SKIP = "skip"
+
+
+def collect_sources(paths):
+    """
+    Expande a seleção do usuário em arquivos de áudio.
+    Pastas são percorridas recursivamente (pastas ocultas são ignoradas).
+
+    Args:
+        paths (list): Arquivos e/ou pastas selecionados
+
+    Returns:
+        list: Paths dos arquivos de áudio, sem repetições, na ordem da seleção
+    """
+    sources = []
+    seen = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            candidates = []
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                candidates.extend(Path(root) / name for name in sorted(files, key=str.lower)
+                                  if is_audio_file(name))
+        elif is_audio_file(path.name):
+            candidates = [path]
+        else:
+            candidates = []
+
+        for candidate in candidates:
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                sources.append(candidate)
+    return sources
+
+
+def can_transcode():
+    """True se a conversão para WAV está disponível (mixer do Pygame inicializado)."""
+    return pygame is not None and bool(pygame.mixer.get_init())
+
+
+class _Cancelled(Exception):
+    """Importação cancelada durante o processamento de um arquivo."""
+
+
+class MessageImporter:
+    """
+    Executa uma importação em lote.
+
+    Os callbacks de progresso e de conclusão são chamados nas threads do pool.
+    """
+
+    def __init__(self, messages_path, library=None, scanner=None, max_workers=2,
+                 transcode=False, on_conflict=CONFLICT_RENAME):
+        """
+        Inicializa o importador.
+
+        Args:
+            messages_path (Path): Pasta das mensagens (AUDIO)
+            library (AudioLibrary): Biblioteca da pasta (padrão: a compartilhada)
+            scanner (LibraryScanner): Analisador que recebe os metadados já medidos
+            max_workers (int): Arquivos processados em paralelo
+            transcode (bool): Converte formatos fora de PLAYBACK_FORMATS para WAV
+            on_conflict (str): CONFLICT_RENAME, CONFLICT_REPLACE ou CONFLICT_SKIP
+        """
+        self.messages_path = Path(messages_path)
+        self.library = library or get_audio_library(self.messages_path)
+        self.scanner = scanner
+        self.max_workers = max_workers
+        self.transcode = transcode
+        self.on_conflict = on_conflict
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._executor = None
+        self._results = []
+        self._staged = []  # (arquivo temporário, índice do resultado)
+        self._reserved = set()  # nomes finais já tomados por este lote
+        self._digests = {}  # SHA-256 -> nome do arquivo com esse conteúdo
+        self._hashed = set()  # arquivos da biblioteca já incluídos em _digests
+        self._done = 0
+        self._progress_callback = None
+        self._finished_callback = None
+
+    @property
+    def running(self):
+        """True enquanto há arquivos sendo processados."""
+        return self._executor is not None and self._done < len(self._results)
+
+    def start(self, sources, progress_callback=None, finished_callback=None):
+        """
+        Inicia a importação (retorna imediatamente).
+
+        Args:
+            sources (list): Arquivos a importar (ver collect_sources)
+            progress_callback (callable): Recebe (concluídos, total, ImportResult)
+            finished_callback (callable): Recebe a lista de ImportResult, na ordem de sources
+        """
+        if self._executor is not None:
+            raise RuntimeError("Importação já iniciada")
+
+        self.messages_path.mkdir(parents=True, exist_ok=True)
+        self._progress_callback = progress_callback
+        self._finished_callback = finished_callback
+        self._results = [None] * len(sources)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="MessageImport")
+        print(f"📥 Importando {len(sources)} arquivo(s) para {self.messages_path}")
+
+        if not sources:
+            self._finish()
+            return
+        for index, source in enumerate(sources):
+            self._executor.submit(self._run, index, Path(source))
+
+    def cancel(self):
+        """
+        Cancela a importação: os arquivos em andamento são descartados e os
+        já concluídos entram na biblioteca normalmente.
+        """
+        self._cancel.set()
+
+    # ----- Processamento de um arquivo (threads do pool) -----
+
+    def _run(self, index, source):
+        try:
+            result = self._import_one(index, source)
+        except _Cancelled:
+            result = ImportResult(source, None, ImportResult.CANCELLED, None, None, None)
+        except Exception as e:
+            result = ImportResult(source, None, ImportResult.FAILED, None, None, str(e))
+
+        with self._lock:
+            self._results[index] = result
+            self._done += 1
+            done = self._done
+        total = len(self._results)
+
+        if self._progress_callback is not None:
+            try:
+                self._progress_callback(done, total, result)
+            except Exception as e:
+                print(f"⚠ Erro no callback de progresso: {str(e)}")
+
+        if done == total:
+            self._finish()
+
+    def _check_cancel(self):
+        if self._cancel.is_set():
+            raise _Cancelled()
+
+    def _import_one(self, index, source):
+        """Copia, confere, analisa e (opcionalmente) converte um arquivo."""
+        self._check_cancel()
+        temp_path = self.messages_path / f".import-{uuid.uuid4().hex}{source.suffix.lower()}"
+        try:
+            digest, size = self._copy(source, temp_path)
+
+            # Só consulta: o conteúdo é registrado ao entrar no lote (abaixo)
+            duplicate = self._find_duplicate(digest, size)
+            if duplicate is not None:
+                return ImportResult(source, None, ImportResult.DUPLICATE, digest, None,
+                                    f"conteúdo igual a {duplicate}")
+
+            self._check_cancel()
+            metadata = probe_file(temp_path)
+            if not metadata.valid:
+                return ImportResult(source, None, ImportResult.FAILED, digest, metadata,
+                                    metadata.error)
+
+            name = source.name
+            note = None
+            if self.transcode and metadata.format not in PLAYBACK_FORMATS:
+                converted_path = temp_path.with_suffix(".wav")
+                try:
+                    self._transcode(temp_path, converted_path)
+                except _Cancelled:
+                    converted_path.unlink(missing_ok=True)
+                    raise
+                except Exception as e:
+                    converted_path.unlink(missing_ok=True)
+                    note = f"mantido em {metadata.format}: {str(e)}"
+                else:
+                    temp_path.unlink(missing_ok=True)
+                    temp_path = converted_path
+                    name = Path(name).stem + ".wav"
+                    note = f"convertido de {metadata.format}"
+                    metadata = probe_file(temp_path)
+
+            self._check_cancel()
+            final_name = self._reserve_name(name)
+            if final_name is None:
+                return ImportResult(source, None, ImportResult.SKIPPED, digest, metadata,
+                                    "já existe na biblioteca")
+
+            # Registra o conteúdo junto com a entrada no lote: um arquivo igual que
+            # terminou antes (em outra thread) faz deste uma duplicata
+            with self._lock:
+                duplicate = self._digests.get(digest)
+                if duplicate is None:
+                    self._digests[digest] = final_name
+                    self._staged.append((temp_path, index))
+                else:
+                    self._reserved.discard(final_name)
+            if duplicate is not None:
+                return ImportResult(source, None, ImportResult.DUPLICATE, digest, metadata,
+                                    f"conteúdo igual a {duplicate}")
+            temp_path = None  # agora pertence ao lote
+            return ImportResult(source, final_name, ImportResult.IMPORTED, digest, metadata, note)
+        finally:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+    def _copy(self, source, target):
+        """
+        Copia em blocos calculando o SHA-256 do conteúdo.
+
+        Returns:
+            tuple: (SHA-256 em hexadecimal, tamanho em bytes)
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            while True:
+                self._check_cancel()
+                block = src.read(COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                hasher.update(block)
+                dst.write(block)
+                size += len(block)
+        shutil.copystat(source, target)  # preserva a data de modificação, como copy2
+        return hasher.hexdigest(), size
+
+    @staticmethod
+    def _hash_file(path):
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(COPY_BLOCK_BYTES), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _find_duplicate(self, digest, size):
+        """
+        Procura o conteúdo copiado na biblioteca e nos arquivos já aceitos no lote,
+        sem registrá-lo (arquivos que falham, são ignorados ou cancelados não
+        tornam duplicatas os iguais a eles).
+        Só os arquivos da biblioteca com o mesmo tamanho são lidos (uma vez por lote).
+
+        Returns:
+            str: Nome do arquivo com o mesmo conteúdo, ou None se o conteúdo é novo
+        """
+        entries = self.library.entries()
+        with self._lock:
+            candidates = [entry for entry in entries
+                          if entry.size == size and entry.name not in self._hashed]
+            self._hashed.update(entry.name for entry in candidates)
+
+        hashed = {}
+        for entry in candidates:
+            try:
+                hashed[self._hash_file(entry.path)] = entry.name
+            except OSError:
+                pass
+
+        with self._lock:
+            for existing_digest, existing_name in hashed.items():
+                self._digests.setdefault(existing_digest, existing_name)
+            return self._digests.get(digest)
+
+    def _transcode(self, source, target):
+        """Decodifica com o Pygame e grava WAV PCM no formato do mixer (sem decodificação ao tocar)."""
+        mixer = pygame.mixer.get_init() if pygame is not None else None
+        if not mixer or mixer[1] != -16:
+            raise RuntimeError("conversão indisponível (mixer de 16 bits não inicializado)")
+        frequency, _size, channels = mixer
+
+        sound = pygame.mixer.Sound(str(source))
+        view = memoryview(sound.get_view()).cast('B')
+        try:
+            with wave.open(str(target), 'wb') as wav:
+                wav.setnchannels(channels)
+                wav.setsampwidth(2)
+                wav.setframerate(frequency)
+                for start in range(0, len(view), COPY_BLOCK_BYTES):
+                    self._check_cancel()
+                    wav.writeframes(view[start:start + COPY_BLOCK_BYTES])
+        finally:
+            view.release()
+
+    def _reserve_name(self, name):
+        """
+        Escolhe o nome final conforme a política de conflito.
+
+        Returns:
+            str: Nome reservado, ou None se o arquivo deve ser ignorado
+        """
+        with self._lock:
+            exists = (self.messages_path / name).exists()
+            if name in self._reserved or (exists and self.on_conflict == CONFLICT_RENAME):
+                # Dois arquivos do lote com o mesmo nome sempre recebem nomes distintos
+                stem, extension = os.path.splitext(name)
+                number = 2
+                while True:
+                    candidate = f"{stem} ({number}){extension}"
+                    if candidate not in self._reserved and not (self.messages_path / candidate).exists():
+                        break
+                    number += 1
+                name = candidate
+            elif exists and self.on_conflict == CONFLICT_SKIP:
+                return None
+            self._reserved.add(name)
+            return name
+
+    # ----- Conclusão do lote -----
+
+    def _finish(self):
+        """Dá o nome final aos arquivos do lote e atualiza a biblioteca de uma vez."""
+        with self._lock:
+            staged, self._staged = self._staged, []
+
+        published = []
+        for temp_path, index in staged:
+            result = self._results[index]
+            try:
+                os.replace(temp_path, self.messages_path / result.name)
+                published.append(result)
+            except OSError as e:
+                temp_path.unlink(missing_ok=True)
+                with self._lock:
+                    if self._digests.get(result.digest) == result.name:
+                        del self._digests[result.digest]
+                self._results[index] = result._replace(name=None, status=ImportResult.FAILED,
+                                                       error=str(e))
+
+        if self.scanner is not None:
+            for result in published:
+                self.scanner.remember(self.messages_path / result.name, result.metadata)
+        if published:
+            self.library.scan()
+
+        self._executor.shutdown(wait=False)
+        counts = {}
+        for result in self._results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        print(f"📥 Importação concluída: {counts.get(ImportResult.IMPORTED, 0)} importado(s), "
+              f"{counts.get(ImportResult.DUPLICATE, 0)} duplicado(s), "
+              f"{counts.get(ImportResult.SKIPPED, 0)} ignorado(s), "
+              f"{counts.get(ImportResult.FAILED, 0)} com erro, "
+              f"{counts.get(ImportResult.CANCELLED, 0)} cancelado(s)")
+
+        if self._finished_callback is not None:
+            try:
+                self._finished_callback(list(self._results))
+            except Exception as e:
+                print(f"⚠ Erro no callback de importação: {str(e)}")
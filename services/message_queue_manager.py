@@ -7,27 +7,31 @@ CORRIGIDO: Agora respeita a ordem de prioridades corretamente.
 """
 
 import threading
-import time
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pathlib import Path
 from services.audio_fade_manager import AudioFadeManager
 
 class MessageQueueManager:
     """
     Gerenciador principal que coordena a reprodução automática das mensagens.
-    Executa em thread separada e verifica constantemente a fila.
+    Executa em thread separada que dorme até o próximo horário devido,
+    o término da mensagem atual ou uma alteração na fila.
     """
     
-    def __init__(self, queue_service, player_service):
+    def __init__(self, queue_service, player_service, fade_manager=None):
         """
         Inicializa o gerenciador.
         
         Args:
             queue_service: Serviço de gerenciamento da fila
             player_service: Serviço de reprodução de áudio
+            fade_manager (AudioFadeManager, optional): Gerenciador de fades
+                (padrão: AudioFadeManager sobre o player_service)
         """
         self.queue_service = queue_service
         self.player_service = player_service
+        # Mesma base de tempo monotônica usada pela fila
+        self.clock = queue_service.clock
         
         # Thread de controle
         self.manager_thread = None
@@ -35,13 +39,28 @@ class MessageQueueManager:
         
         # Estado atual
         self.current_playing_message = None
-        self.last_check_time = datetime.now()
+        self.last_check_time = self.clock.now()
         
         # Configurações
-        self.check_interval = 1.0  # Verifica a fila a cada 1 segundo
+        self.playback_safety_timeout = 10.0  # Conferência de segurança enquanto uma mensagem toca
+        self.max_idle_wait = 60.0  # Espera máxima sem eventos (protege contra ajustes de relógio)
+        self.fadeout_lead_time = 1.0  # Acorda antes do fim para o fadeout da mensagem
+        self.overdue_check_interval = 0.25  # Espera mínima com o fim previsto já vencido
+        
+        # Sinalização de eventos: horário devido, fim de reprodução ou mudança na fila
+        self._wakeup = threading.Condition()
+        self._wakeup_pending = False
+        self._queue_changed = False
+        
+        self.queue_service.add_change_listener(self._on_queue_changed)
+        if hasattr(self.player_service, 'add_playback_listener'):
+            self.player_service.add_playback_listener(self.notify)
+        # Eventos do player (ex: fim da mídia no VLC) acordam o loop durante a reprodução
+        if hasattr(self.player_service, 'add_state_listener'):
+            self.player_service.add_state_listener(self._on_player_state_changed)
         
         # Sistema de fade suave
-        self.fade_manager = AudioFadeManager(player_service)
+        self.fade_manager = fade_manager or AudioFadeManager(player_service)
         
         print("📋 MessageQueueManager inicializado")
         print("🎵 Sistema de fade suave ativado")
@@ -63,45 +82,131 @@ class MessageQueueManager:
             return
             
         self.running = False
+        if hasattr(self.player_service, 'remove_state_listener'):
+            self.player_service.remove_state_listener(self._on_player_state_changed)
+        self.notify()
         if self.manager_thread and self.manager_thread.is_alive():
             self.manager_thread.join(timeout=2.0)
         print("⏹️ MessageQueueManager parado")
     
+    def notify(self):
+        """
+        Acorda o loop principal imediatamente.
+        Pode ser chamado de qualquer thread (mudança na fila, fim de reprodução etc).
+        """
+        with self._wakeup:
+            self._wakeup_pending = True
+            self._wakeup.notify_all()
+    
+    def _on_queue_changed(self):
+        """Callback do QueueService: a fila foi alterada."""
+        self._queue_changed = True
+        self.notify()
+    
+    def _on_player_state_changed(self):
+        """
+        Callback de estado do player (pode vir da thread de eventos do VLC).
+        Só interessa enquanto uma mensagem toca: o fim da mídia acorda o loop.
+        """
+        if self.current_playing_message:
+            self.notify()
+    
+    def _wait_for_event(self, timeout):
+        """
+        Dorme até o timeout ou até ser notificado.
+        
+        Args:
+            timeout (float): Tempo máximo de espera em segundos
+        """
+        with self._wakeup:
+            if not self._wakeup_pending and self.running:
+                self._wakeup.wait(max(0.0, timeout))
+            self._wakeup_pending = False
+    
+    def _next_wait_timeout(self, current_time):
+        """
+        Calcula quanto tempo o loop pode dormir até o próximo evento conhecido.
+        
+        Args:
+            current_time (datetime): Horário atual
+            
+        Returns:
+            float: Segundos até o próximo evento
+        """
+        if self.current_playing_message:
+            # Enquanto toca, acorda no fadeout/fim previsto; o fim antecipado chega
+            # como evento do player, e a espera longa é só uma conferência de segurança
+            timeout = self.playback_safety_timeout
+            end_time = getattr(self.player_service, 'end_time', None)
+            if end_time:
+                remaining = (end_time - current_time).total_seconds()
+                if remaining > self.fadeout_lead_time:
+                    remaining -= self.fadeout_lead_time
+                if remaining <= 0:
+                    # Fim previsto vencido e a mensagem não terminou (ex: microfone
+                    # ativo): sem piso o loop giraria com espera zero; a liberação do
+                    # microfone acorda o loop pelo listener de estado do player
+                    remaining = self.overdue_check_interval
+                timeout = min(timeout, remaining)
+            return timeout
+        
+        next_due = self.queue_service.get_next_due_time()
+        if next_due is None:
+            return self.max_idle_wait
+        
+        return min(self.max_idle_wait, (next_due - current_time).total_seconds())
+    
     def _main_loop(self):
-        """Loop principal que verifica e processa a fila."""
+        """Loop principal orientado a eventos que processa a fila."""
         print("🔄 Loop principal do MessageQueueManager iniciado")
         
         while self.running:
             try:
-                current_time = datetime.now()
-                
-                # Debug periódico
-                if int(current_time.second) % 5 == 0:
-                    self._show_debug_status(current_time)
-                
-                # VERIFICAÇÃO 1: Mensagem em reprodução
-                if self.current_playing_message:
-                    if self.player_service.is_media_ended():
-                        self._handle_message_end()
-                
-                # VERIFICAÇÃO 2: Nova mensagem para tocar
-                if not self.current_playing_message:
-                    next_message = self._get_next_priority_message()
-                    if next_message:
-                        self._start_message_playback(next_message)
-                
-                time.sleep(self.check_interval)
+                self._wait_for_event(self.run_once())
                 
             except Exception as e:
                 print(f"\n❌ ERRO: {str(e)}")
                 import traceback
                 traceback.print_exc()
-                time.sleep(5.0)
+                self._wait_for_event(5.0)
+    
+    def run_once(self):
+        """
+        Executa um ciclo do agendador: reconcilia o relógio, trata o término da
+        mensagem atual e inicia a próxima mensagem pronta.
+        Usado pelo loop principal e pelo simulador (com relógio virtual).
+        
+        Returns:
+            float: Segundos até o próximo evento conhecido
+        """
+        # Reconcilia o relógio monotônico com o de parede a cada ciclo
+        jump = self.clock.reconcile()
+        if jump:
+            self.queue_service.apply_clock_jump(jump)
+        
+        # Debug quando a fila muda (em vez de a cada 5 segundos)
+        if self._queue_changed:
+            self._queue_changed = False
+            self._show_debug_status(self.clock.now())
+        
+        # VERIFICAÇÃO 1: Mensagem em reprodução
+        if self.current_playing_message:
+            if self.player_service.is_media_ended():
+                self._handle_message_end()
+        
+        # VERIFICAÇÃO 2: Nova mensagem para tocar
+        if not self.current_playing_message:
+            next_message = self._get_next_priority_message()
+            if next_message:
+                self._start_message_playback(next_message)
+        
+        return self._next_wait_timeout(self.clock.now())
     
     def _show_debug_status(self, current_time):
         """Mostra status de debug das mensagens."""
-        active_messages = [m for m in self.queue_service.message_queue if not m.is_pending]
-        pending_messages = [m for m in self.queue_service.message_queue if m.is_pending]
+        items = self.queue_service.snapshot.items
+        active_messages = [m for m in items if not m.is_pending]
+        pending_messages = [m for m in items if m.is_pending]
         
         if active_messages or pending_messages:
             print(f"\n📊 STATUS ({current_time.strftime('%H:%M:%S')}):")
@@ -131,30 +236,23 @@ class MessageQueueManager:
             return (msg.next_play_time - current_time).total_seconds()
     
     def _get_next_priority_message(self):
-        current_time = datetime.now()
+        """
+        Obtém a próxima mensagem pronta pelo índice de prioridade do QueueService,
+        sem reordenar a fila a cada verificação.
+        
+        Returns:
+            PlaybackTicket: Bilhete de reprodução ou None
+        """
+        current_time = self.clock.now()
 
-        # Filtrar mensagens que estão ativas e podem tocar
-        ready_messages = [
-            msg for msg in self.queue_service.message_queue
-            if not msg.is_pending and msg.next_play_time <= current_time
-        ]
+        # Bilhete da mensagem ativa, vencida e de maior prioridade
+        ticket = self.queue_service.issue_next_ticket(current_time)
+        if ticket:
+            return ticket
 
         # Se todas já tocaram uma vez, reinicia o ciclo
-        all_played = all(
-            msg.last_played is not None for msg in self.queue_service.message_queue
-        )
-
-        # Se todas tocaram, podemos reativar a de prioridade 1
-        if all_played and not ready_messages:
-            self.queue_service._activate_next_priority_message()
-            return None
-
-        # Ordena por prioridade (menor número primeiro)
-        ready_messages.sort(key=lambda x: x.priority)
-        if ready_messages:
-            selected_message = ready_messages[0]
-            selected_message.is_pending = True  # Marcar como pendente
-            return selected_message
+        if self.queue_service.get_queue_length() and self.queue_service.all_messages_played():
+            self.queue_service.activate_next_message()
 
         return None
     
@@ -165,7 +263,7 @@ class MessageQueueManager:
         print(f"{'='*60}")
         print(f"Arquivo: '{message.filename}'")
         print(f"Prioridade: {message.priority}")
-        print(f"Horário: {datetime.now().strftime('%H:%M:%S')}")
+        print(f"Horário: {self.clock.now().strftime('%H:%M:%S')}")
         
         # Registra que a mensagem está começando
         self.queue_service.register_message_start(message)
@@ -175,18 +273,20 @@ class MessageQueueManager:
         self.fade_manager.start_message_transition()
 
         # Aguarda a conclusão do fade antes de começar a mensagem
-        time.sleep(self.fade_manager.fade_duration + 0.2)   
+        self.clock.sleep(self.fade_manager.fade_duration + 0.2)
         
         # Reproduz a mensagem
         if self.player_service.play_message(message.filename, message):
             self.current_playing_message = message
+            self.queue_service.register_message_on_air(
+                message, getattr(self.player_service, 'message_duration', None))
             print(f"✅ Mensagem iniciada com sucesso")
         else:
             print(f"❌ Falha ao reproduzir mensagem")
             # Se falhou, volta para a rádio (mas não fecha ela)
             self.player_service.switch_to_radio()
             # Limpa o registro de reprodução
-            self.queue_service.currently_playing = None
+            self.queue_service.register_message_failure(message)
         
         print(f"{'='*60}\n")
     
@@ -196,11 +296,10 @@ class MessageQueueManager:
         print(f"🏁 MENSAGEM TERMINOU!")
         print(f"{'*'*60}")
         print(f"Mensagem: '{self.current_playing_message.filename}'")
-        print(f"Horário: {datetime.now().strftime('%H:%M:%S')}")
+        print(f"Horário: {self.clock.now().strftime('%H:%M:%S')}")
         
         # Define o horário de término (incluindo o fade)
-        fade_end_time = datetime.now() + timedelta(seconds=self.fade_manager.fade_duration)
-        self.current_playing_message.end_time = fade_end_time
+        fade_end_time = self.clock.now() + timedelta(seconds=self.fade_manager.fade_duration)
         
         # Fade de volta para a rádio
         print("🎵 Iniciando fade de volta para rádio...")
@@ -236,11 +335,13 @@ class MessageQueueManager:
             return
             
         print("🔍 Forçando verificação da fila...")
+        self.notify()
         
         # Mostra estado atual da fila
-        current_time = datetime.now()
-        active_messages = [m for m in self.queue_service.message_queue if not m.is_pending]
-        pending_messages = [m for m in self.queue_service.message_queue if m.is_pending]
+        current_time = self.clock.now()
+        items = self.queue_service.snapshot.items
+        active_messages = [m for m in items if not m.is_pending]
+        pending_messages = [m for m in items if m.is_pending]
         
         print(f"\n📋 ESTADO DA FILA ({current_time.strftime('%H:%M:%S')}):")
         
@@ -259,8 +360,8 @@ class MessageQueueManager:
         if not active_messages and not pending_messages:
             print("📭 Fila vazia")
         
-        # Verifica próxima mensagem
-        next_message = self._get_next_priority_message()
+        # Verifica próxima mensagem (sem retirá-la da fila)
+        next_message = self.queue_service.peek_next_due_message(current_time)
         if next_message:
             print(f"\n🎯 PRÓXIMA A TOCAR: P{next_message.priority} - {next_message.filename}")
         else:
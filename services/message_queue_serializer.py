@@ -1,27 +1,43 @@
 import json
 import os
+import threading
 from datetime import datetime, timedelta
-from pathlib import Path
+from services.queue_store import QueueStore
 
-class MessageQueueSerializer:
+class MessageQueueSerializer(QueueStore):
     """
     Classe responsável por serializar e desserializar a fila de mensagens.
     CORRIGIDO: Agora detecta reinicialização do programa de forma mais confiável.
     """
     
-    def __init__(self, queue_file_path):
+    # No modo journal, compacta após este número de eventos
+    COMPACT_EVERY = 500
+    
+    def __init__(self, queue_file_path, fsync=False, journal=False):
         """
         Inicializa o serializador.
         
         Args:
             queue_file_path (str ou Path): Caminho para o arquivo de persistência da fila
+            fsync (bool): Força a gravação em disco (fsync) a cada save; o save de
+                encerramento sempre usa fsync
+            journal (bool): Modo journal: cada alteração é anexada como um evento em
+                <fila>.journal e o arquivo da fila vira uma compactação periódica
         """
-        self.queue_file_path = Path(queue_file_path)
+        super().__init__(queue_file_path, fsync=fsync, journal=journal)
+        
+        # Modo journal (eventos anexados + compactação)
+        self.journal_path = self.queue_file_path.with_suffix('.journal')
+        self._journal_lock = threading.Lock()
+        self._journal_file = None
+        self._journal_lines = []  # (seq, linha) ainda não cobertos pela compactação
         # Arquivo para indicar que o programa está rodando
         self.session_lock_file = self.queue_file_path.parent / "session.lock"
         
-        # Cria o arquivo de sessão ativa
-        self._create_session_lock()
+        # Cria o arquivo de sessão ativa (o modo journal sabe exatamente se houve
+        # encerramento limpo e não precisa da heurística do lock)
+        if not journal:
+            self._create_session_lock()
     
     def _create_session_lock(self):
         """Cria arquivo indicando que o programa está rodando."""
@@ -42,54 +58,43 @@ class MessageQueueSerializer:
         except Exception as e:
             print(f"⚠ Erro ao remover lock de sessão: {e}")
     
-    def save_queue(self, queue_items, is_shutdown=False):
+    def save_queue(self, queue_items, is_shutdown=False, rotation_policy=None, journal_seq=None):
         """
         Salva a fila incluindo informação se é um save de encerramento.
+        No modo journal, esta gravação é a compactação: os eventos até
+        journal_seq passam a ser cobertos pelo arquivo da fila.
         
         Args:
             queue_items: Lista de itens da fila
             is_shutdown (bool): True se está salvando por causa do encerramento
+            rotation_policy (str, optional): Política de rotação em uso
+            journal_seq (int, optional): Último evento refletido em queue_items
         """
         try:
             self.queue_file_path.parent.mkdir(parents=True, exist_ok=True)
             
-            serializable_items = []
-            for item in queue_items:
-                # SEMPRE inclui interval_seconds
-                interval_sec = getattr(item, 'interval_seconds', None)
-                if interval_sec is None:
-                    interval_sec = int(item.interval * 60)
-                
-                serializable_item = {
-                    'filename': item.filename,
-                    'priority': item.priority,
-                    'interval': item.interval,
-                    'interval_seconds': interval_sec,
-                    'next_play_time': item.next_play_time.isoformat(),
-                    'is_pending': getattr(item, 'is_pending', False)
-                }
-                
-                if hasattr(item, 'end_time') and item.end_time:
-                    serializable_item['end_time'] = item.end_time.isoformat()
-                
-                if hasattr(item, 'last_played') and item.last_played:
-                    serializable_item['last_played'] = item.last_played.isoformat()
-                
-                serializable_items.append(serializable_item)
+            serializable_items = [self._serialize_item(item) for item in queue_items]
             
             # Metadata da sessão
             save_data = {
                 'version': '1.2',
                 'save_timestamp': datetime.now().isoformat(),
                 'is_shutdown_save': is_shutdown,
+                'rotation_policy': rotation_policy,
                 'messages': serializable_items
             }
+            if self.journal:
+                save_data['journal_seq'] = journal_seq if journal_seq is not None else self.journal_seq
+            
+            self._write_atomic(save_data, fsync=self.fsync or is_shutdown)
             
-            with open(self.queue_file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2)
+            if self.journal:
+                self._truncate_journal(save_data['journal_seq'])
+                if is_shutdown:
+                    self._close_journal()
             
             # Se é um save de encerramento, remove o lock
-            if is_shutdown:
+            if is_shutdown and not self.journal:
                 self._remove_session_lock()
                 print(f"✅ Fila salva (ENCERRAMENTO) - intervalos serão resetados na próxima inicialização")
             else:
@@ -101,11 +106,179 @@ class MessageQueueSerializer:
             print(f"❌ Erro ao salvar: {str(e)}")
             return False
 
+    def _write_atomic(self, data, fsync=False):
+        """
+        Grava o JSON compacto de forma atômica: arquivo temporário + rename.
+        Uma queda no meio da gravação mantém o arquivo anterior intacto.
+        
+        Args:
+            data (dict): Conteúdo a gravar
+            fsync (bool): Garante que os dados chegaram ao disco antes do rename
+        """
+        temp_path = self.queue_file_path.with_name(self.queue_file_path.name + '.tmp')
+        
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        os.replace(temp_path, self.queue_file_path)
+        
+        # Em sistemas POSIX, sincroniza também o diretório para persistir o rename
+        if fsync and hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.queue_file_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    def append_event(self, event, items=(), removed_ids=(), **extra):
+        """
+        Anexa um evento ao journal (custo proporcional apenas ao que mudou).
+        
+        Args:
+            event (str): Tipo do evento (added, started, ended, removed...)
+            items (iterable): Mensagens cujo estado deve ser regravado
+            removed_ids (iterable): IDs das mensagens removidas
+            **extra: Campos adicionais do evento (ex: rotation_policy)
+            
+        Returns:
+            bool: True se o journal atingiu o tamanho de compactação
+        """
+        record = {'event': event, 'ts': datetime.now().isoformat()}
+        if items:
+            record['items'] = [self._serialize_item(item) for item in items]
+        if removed_ids:
+            record['removed'] = list(removed_ids)
+        record.update(extra)
+        
+        with self._journal_lock:
+            if self._journal_file is None:
+                self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            
+            self.journal_seq += 1
+            record['seq'] = self.journal_seq
+            line = json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n'
+            
+            self._journal_file.write(line)
+            self._journal_file.flush()
+            if self.fsync:
+                os.fsync(self._journal_file.fileno())
+            
+            self._journal_lines.append((self.journal_seq, line))
+            return len(self._journal_lines) >= self.COMPACT_EVERY
+    
+    def _truncate_journal(self, covered_seq):
+        """
+        Remove do journal os eventos já cobertos pela compactação.
+        Eventos anexados durante a compactação são preservados.
+        
+        Args:
+            covered_seq (int): Último evento refletido no arquivo da fila
+        """
+        with self._journal_lock:
+            self._journal_lines = [(seq, line) for seq, line in self._journal_lines if seq > covered_seq]
+            
+            if self._journal_file is not None:
+                self._journal_file.close()
+            
+            temp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(line for _, line in self._journal_lines)
+            os.replace(temp_path, self.journal_path)
+            
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+    
+    def _close_journal(self):
+        """Fecha o arquivo do journal."""
+        with self._journal_lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+    
+    def _replay_journal(self, items_by_id, snapshot_seq):
+        """
+        Reaplica sobre a compactação os eventos posteriores a ela.
+        Uma última linha incompleta (queda durante a escrita) é ignorada.
+        
+        Args:
+            items_by_id (dict): Mensagens serializadas da compactação, por ID (alterado no lugar)
+            snapshot_seq (int): Último evento coberto pela compactação
+            
+        Returns:
+            int: Número de eventos reaplicados
+        """
+        if not self.journal_path.exists():
+            return 0
+        
+        replayed = 0
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print("⚠ Evento incompleto no fim do journal ignorado")
+                    break
+                
+                seq = record.get('seq', 0)
+                self.journal_seq = max(self.journal_seq, seq)
+                if seq <= snapshot_seq:
+                    continue
+                
+                if record.get('event') == 'cleared':
+                    items_by_id.clear()
+                for item_data in record.get('items', ()):
+                    items_by_id[item_data['id']] = item_data
+                for message_id in record.get('removed', ()):
+                    items_by_id.pop(message_id, None)
+                if 'rotation_policy' in record:
+                    self.saved_rotation_policy = record['rotation_policy']
+                replayed += 1
+        
+        return replayed
+    
+    def _load_journal_state(self):
+        """
+        Carrega a compactação e reaplica o journal.
+        
+        Returns:
+            tuple: (lista de mensagens serializadas, True se houve encerramento limpo)
+        """
+        data = {}
+        if self.queue_file_path.exists():
+            with open(self.queue_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        
+        if isinstance(data, list):
+            # Formato antigo: sem metadata, trata como encerramento limpo
+            return data, True
+        
+        snapshot_seq = data.get('journal_seq', 0)
+        self.journal_seq = snapshot_seq
+        self.saved_rotation_policy = data.get('rotation_policy')
+        
+        items_by_id = {}
+        for item_data in data.get('messages', []):
+            items_by_id[item_data.get('id') or item_data['filename']] = item_data
+        
+        replayed = self._replay_journal(items_by_id, snapshot_seq)
+        
+        # Encerramento limpo: a compactação final foi gravada e nada veio depois dela
+        clean_shutdown = bool(data.get('is_shutdown_save')) and replayed == 0
+        print(f"📓 Journal: compactação até #{snapshot_seq}, {replayed} evento(s) reaplicado(s)")
+        print(f"   → {'ENCERRAMENTO LIMPO' if clean_shutdown else 'RECUPERAÇÃO EXATA (sessão anterior não encerrou)'}")
+        
+        return list(items_by_id.values()), clean_shutdown
+    
     def load_queue(self, message_queue_class):
         """
         Carrega a fila detectando se houve reinicialização do programa.
         CORRIGIDO: Método mais confiável de detecção.
         """
+        if self.journal:
+            return self._load_from_journal(message_queue_class)
+        
         if not self.queue_file_path.exists():
             print("📄 Nenhum arquivo de fila encontrado - iniciando fila vazia")
             return []
@@ -122,50 +295,13 @@ class MessageQueueSerializer:
             else:
                 # Formato novo com metadata
                 serialized_items = data.get('messages', [])
+                self.saved_rotation_policy = data.get('rotation_policy')
                 
                 # NOVA LÓGICA: Detecta reinicialização de forma mais confiável
                 is_restart = self._detect_program_restart_v2(data)
             
-            queue_items = []
             now = datetime.now()
-            
-            for item_data in serialized_items:
-                item = message_queue_class(
-                    item_data['filename'],
-                    item_data['priority'],
-                    item_data['interval']
-                )
-                
-                # Restaura interval_seconds
-                item.interval_seconds = item_data.get('interval_seconds', int(item.interval * 60))
-                
-                if is_restart:
-                    # RESETAR TUDO: Programa foi reiniciado
-                    print(f"🔄 RESET: P{item.priority} - {item.filename}")
-                    
-                    # Reset completo dos tempos
-                    item.next_play_time = now + timedelta(seconds=item.interval_seconds)
-                    item.is_pending = item.priority > 1  # Só P1 fica ativa
-                    item.last_played = None
-                    item.end_time = None
-                    
-                    print(f"   ⏰ Novo agendamento: {item.next_play_time.strftime('%H:%M:%S')}")
-                    print(f"   📊 Status: {'ATIVA' if not item.is_pending else 'PENDENTE'}")
-                    
-                else:
-                    # MANTER ESTADO: Carregamento durante execução
-                    item.next_play_time = datetime.fromisoformat(item_data['next_play_time'])
-                    item.is_pending = item_data.get('is_pending', False)
-                    
-                    if 'end_time' in item_data and item_data['end_time']:
-                        item.end_time = datetime.fromisoformat(item_data['end_time'])
-                    
-                    if 'last_played' in item_data and item_data['last_played']:
-                        item.last_played = datetime.fromisoformat(item_data['last_played'])
-                    
-                    print(f"📝 MANTIDO: P{item.priority} - {item.filename}")
-                
-                queue_items.append(item)
+            queue_items = self._build_items(message_queue_class, serialized_items, is_restart, now)
             
             if is_restart:
                 print(f"\n🚀 PROGRAMA REINICIADO - Todos os intervalos foram RESETADOS")
@@ -179,6 +315,32 @@ class MessageQueueSerializer:
             print(f"❌ Erro ao carregar: {str(e)}")
             return []
     
+    def _load_from_journal(self, message_queue_class):
+        """
+        Carrega a fila no modo journal. Em vez da heurística de lock e intervalo de
+        tempo, o journal indica exatamente se a sessão anterior encerrou de forma limpa:
+        - encerramento limpo: reseta os intervalos (mesmo comportamento do modo normal)
+        - queda: restaura exatamente o último estado gravado
+        
+        Returns:
+            list: Mensagens carregadas
+        """
+        try:
+            serialized_items, clean_shutdown = self._load_journal_state()
+        except Exception as e:
+            print(f"❌ Erro ao carregar journal: {str(e)}")
+            return []
+        
+        if not serialized_items:
+            print("📄 Nenhuma mensagem salva - iniciando fila vazia")
+        
+        now = datetime.now()
+        queue_items = self._build_items(message_queue_class, serialized_items, clean_shutdown, now)
+        
+        # Compacta o que foi reaplicado e inicia a nova sessão com o journal vazio
+        self.save_queue(queue_items, rotation_policy=self.saved_rotation_policy)
+        return queue_items
+    
     def _detect_program_restart_v2(self, save_data):
         """
         Nova versão melhorada da detecção de reinicialização.
@@ -236,4 +398,5 @@ class MessageQueueSerializer:
     def cleanup(self):
         """Limpa recursos e remove arquivo de sessão."""
         print("🧹 Limpando recursos do serializador")
+        self._close_journal()
         self._remove_session_lock()
\ No newline at end of file
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cadeia de processamento (DSP) da voz do microfone, por blocos vetorizados:
+filtro passa-altas → noise gate → compressor → limitador.
+
+Cada bloco do callback de captura é convertido uma única vez para float64 em
+buffers pré-alocados; os ganhos do gate, do compressor e do limitador são
+calculados por bloco e aplicados com rampa linear entre o bloco anterior e o
+atual (sem estalos). O tempo de CPU de cada bloco é medido e comparado ao
+tempo real disponível.
+
+Requer NumPy (dependência opcional); sem ele a cadeia fica indisponível.
+"""
+
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _db_to_linear(db):
+    return 10 ** (db / 20.0)
+
+
+def _time_coefficient(seconds, block_seconds):
+    """Coeficiente de suavização por bloco para uma constante de tempo."""
+    if seconds <= 0:
+        return 0.0
+    return math.exp(-block_seconds / seconds)
+
+
+class MicDspChain:
+    """
+    Processa blocos int16 mono do microfone.
+
+    Estágios (cada um pode ser desligado):
+    - highpass: passa-altas de 2ª ordem (dois polos simples) contra ronco de
+      ar-condicionado, vento e batidas no pedestal
+    - gate: silencia o ruído de fundo entre as frases
+    - compressor: reduz a diferença entre voz baixa e alta
+    - limiter: teto absoluto de pico
+    """
+
+    def __init__(self, rate=44100, highpass_hz=100.0, gate_threshold_db=-50.0,
+                 gate_range_db=-30.0, gate_hold=0.2, compressor_threshold_db=-20.0,
+                 compressor_ratio=3.0, compressor_attack=0.01, compressor_release=0.15,
+                 makeup_gain_db=6.0, limiter_ceiling_db=-1.0):
+        """
+        Inicializa a cadeia.
+
+        Args:
+            rate (int): Taxa de amostragem
+            highpass_hz (float): Frequência de corte do passa-altas
+            gate_threshold_db (float): Nível RMS (dBFS) que abre o gate
+            gate_range_db (float): Atenuação com o gate fechado (dB)
+            gate_hold (float): Tempo (s) que o gate fica aberto após a voz
+            compressor_threshold_db (float): Início da compressão (dBFS)
+            compressor_ratio (float): Razão de compressão (3 = 3:1)
+            compressor_attack (float): Ataque do compressor (s)
+            compressor_release (float): Liberação do compressor (s)
+            makeup_gain_db (float): Ganho de compensação após o compressor (dB)
+            limiter_ceiling_db (float): Teto de pico (dBFS)
+        """
+        if np is None:
+            raise RuntimeError("A cadeia de DSP do microfone requer NumPy")
+
+        self.rate = rate
+        self.highpass_hz = highpass_hz
+        self.gate_threshold = _db_to_linear(gate_threshold_db)
+        self.gate_floor = _db_to_linear(gate_range_db)
+        self.gate_hold = gate_hold
+        self.compressor_threshold_db = compressor_threshold_db
+        self.compressor_ratio = compressor_ratio
+        self.compressor_attack = compressor_attack
+        self.compressor_release = compressor_release
+        self.makeup_gain = _db_to_linear(makeup_gain_db)
+        self.limiter_ceiling = _db_to_linear(limiter_ceiling_db)
+
+        self.highpass_enabled = True
+        self.gate_enabled = True
+        self.compressor_enabled = True
+        self.limiter_enabled = True
+
+        # Coeficiente do polo simples: y[n] = a·(y[n-1] + x[n] - x[n-1])
+        rc = 1.0 / (2 * math.pi * highpass_hz)
+        self._hp_a = rc / (rc + 1.0 / rate)
+        self._hp_state = [(0.0, 0.0), (0.0, 0.0)]  # (último x, último y) de cada estágio
+
+        # Estado dos estágios dinâmicos
+        self._gate_open_until = 0.0
+        self._position = 0.0  # segundos processados
+        self._comp_envelope_db = -120.0
+        self._dynamics_gain = 1.0  # ganho (gate × compressor) aplicado no fim do último bloco
+        self._limiter_gain = 1.0
+
+        # Buffers pré-alocados (recriados apenas se o tamanho do bloco mudar)
+        self._block_size = 0
+
+        # Medição de CPU por bloco
+        self.blocks = 0
+        self.last_block_ms = 0.0
+        self.average_block_ms = 0.0
+        self.max_block_ms = 0.0
+        self.overruns = 0  # blocos que levaram mais que o tempo real
+
+    def _allocate(self, size):
+        """Pré-aloca os buffers e as tabelas do tamanho do bloco."""
+        self._block_size = size
+        self._block_seconds = size / float(self.rate)
+        self._buffer = np.empty(size, dtype=np.float64)
+        self._scratch = np.empty(size, dtype=np.float64)
+        self._gain = np.empty(size, dtype=np.float64)
+        self._output = np.empty(size, dtype='<i2')
+        # Rampa 1/n … 1 para interpolar o ganho ao longo do bloco
+        self._ramp = np.arange(1, size + 1, dtype=np.float64) / size
+        # Potências do polo para o passa-altas em forma fechada (ver _highpass)
+        exponents = np.arange(size, dtype=np.float64)
+        self._hp_powers = self._hp_a ** (exponents + 1)
+        self._hp_inverse = self._hp_a ** -exponents
+
+        self._attack_coef = _time_coefficient(self.compressor_attack, self._block_seconds)
+        self._release_coef = _time_coefficient(self.compressor_release, self._block_seconds)
+
+    def process(self, data):
+        """
+        Processa um bloco do microfone.
+
+        Args:
+            data (bytes): Amostras int16 mono
+
+        Returns:
+            bytes: Bloco processado (mesmo tamanho)
+        """
+        started = time.perf_counter()
+
+        samples = np.frombuffer(data, dtype='<i2')
+        if samples.size != self._block_size:
+            self._allocate(samples.size)
+
+        buffer = self._buffer
+        np.multiply(samples, 1.0 / 32768.0, out=buffer)
+
+        if self.highpass_enabled:
+            for stage in range(2):
+                self._highpass(stage, buffer)
+
+        rms = math.sqrt(float(np.dot(buffer, buffer)) / buffer.size)
+
+        target = 1.0
+        if self.gate_enabled:
+            target *= self._gate_target(rms)
+        if self.compressor_enabled:
+            target *= self._compressor_target(rms)
+        self._apply_gain_ramp(buffer, self._dynamics_gain, target)
+        self._dynamics_gain = target
+
+        if self.limiter_enabled:
+            self._limit(buffer)
+
+        np.multiply(buffer, 32767.0, out=buffer)
+        np.clip(buffer, -32768.0, 32767.0, out=buffer)
+        np.copyto(self._output, buffer, casting='unsafe')
+
+        self._position += self._block_seconds
+        self._account(time.perf_counter() - started)
+        return self._output.tobytes()
+
+    def _highpass(self, stage, x):
+        """
+        Passa-altas de um polo, vetorizado em forma fechada:
+        y[n] = a^(n+1) · (y[-1] + Σ_{k≤n} a^(-k) · (x[k] - x[k-1]))
+        """
+        last_x, last_y = self._hp_state[stage]
+        scratch = self._scratch
+        # Diferenças x[k] - x[k-1]
+        scratch[0] = x[0] - last_x
+        np.subtract(x[1:], x[:-1], out=scratch[1:])
+        new_last_x = x[-1]
+
+        np.multiply(scratch, self._hp_inverse, out=scratch)
+        np.cumsum(scratch, out=scratch)
+        scratch += last_y
+        np.multiply(scratch, self._hp_powers, out=x)
+
+        self._hp_state[stage] = (float(new_last_x), float(x[-1]))
+
+    def _gate_target(self, rms):
+        """Ganho alvo do noise gate para o bloco."""
+        if rms >= self.gate_threshold:
+            self._gate_open_until = self._position + self.gate_hold
+        return 1.0 if self._position < self._gate_open_until else self.gate_floor
+
+    def _compressor_target(self, rms):
+        """Ganho alvo do compressor (detector RMS com ataque/liberação por bloco)."""
+        level_db = 20 * math.log10(rms) if rms > 1e-9 else -120.0
+        coef = self._attack_coef if level_db > self._comp_envelope_db else self._release_coef
+        self._comp_envelope_db = coef * self._comp_envelope_db + (1 - coef) * level_db
+
+        over = self._comp_envelope_db - self.compressor_threshold_db
+        reduction_db = over - over / self.compressor_ratio if over > 0 else 0.0
+        return _db_to_linear(-reduction_db) * self.makeup_gain
+
+    def _apply_gain_ramp(self, buffer, start, end):
+        """Multiplica o bloco por um ganho que vai linearmente de start a end."""
+        if start == end:
+            if end != 1.0:
+                buffer *= end
+            return
+        gain = self._gain
+        np.multiply(self._ramp, end - start, out=gain)
+        gain += start
+        buffer *= gain
+
+    def _limit(self, buffer):
+        """Limitador de pico: reduz o ganho do bloco para não passar do teto."""
+        peak = float(np.max(np.abs(buffer, out=self._scratch)))
+        target = min(1.0, self.limiter_ceiling / peak) if peak > 0 else 1.0
+        # Ataque imediato (o bloco inteiro recebe o ganho necessário), liberação gradual
+        start = min(self._limiter_gain, target)
+        if target < self._limiter_gain:
+            buffer *= target
+            self._limiter_gain = target
+        else:
+            release = start + (target - start) * (1 - self._release_coef)
+            self._apply_gain_ramp(buffer, start, release)
+            self._limiter_gain = release
+        # Segurança: nenhuma amostra acima do teto
+        np.clip(buffer, -self.limiter_ceiling, self.limiter_ceiling, out=buffer)
+
+    def _account(self, elapsed):
+        """Registra o tempo de CPU do bloco."""
+        elapsed_ms = elapsed * 1000.0
+        self.blocks += 1
+        self.last_block_ms = elapsed_ms
+        self.max_block_ms = max(self.max_block_ms, elapsed_ms)
+        self.average_block_ms += (elapsed_ms - self.average_block_ms) / min(self.blocks, 100)
+        if elapsed > self._block_seconds:
+            self.overruns += 1
+
+    def get_stats(self):
+        """
+        Retorna o custo de CPU da cadeia.
+
+        Returns:
+            dict: blocks, last_ms, average_ms, max_ms, budget_ms (duração do bloco),
+                load (média / orçamento, 1.0 = no limite do tempo real) e overruns
+        """
+        budget_ms = self._block_size * 1000.0 / self.rate if self._block_size else 0.0
+        return {
+            'blocks': self.blocks,
+            'last_ms': self.last_block_ms,
+            'average_ms': self.average_block_ms,
+            'max_ms': self.max_block_ms,
+            'budget_ms': budget_ms,
+            'load': self.average_block_ms / budget_ms if budget_ms else 0.0,
+            'overruns': self.overruns,
+        }
+
+    def reset(self):
+        """Zera o estado dos filtros e dos detectores (ex: ao reabrir o microfone)."""
+        self._hp_state = [(0.0, 0.0), (0.0, 0.0)]
+        self._gate_open_until = 0.0
+        self._position = 0.0
+        self._comp_envelope_db = -120.0
+        self._dynamics_gain = 1.0
+        self._limiter_gain = 1.0
@@ -4,37 +4,75 @@
 """
 Serviço para gerenciar o microfone.
 Permite capturar áudio do microfone e enviá-lo para a saída.
+A captura e a reprodução usam streams em modo callback ligados por um buffer
+circular, com latência próxima à do hardware.
 """
 
 import pyaudio
-import threading
-import time
+
+from services.announcement_recorder import AnnouncementRecorder
+from services.audio_host import get_audio_host
+from services.audio_levels import level_to_db, measure_levels
+from services.audio_ring_buffer import AudioRingBuffer
+from services.mic_dsp import MicDspChain
+
 
 class MicrophoneService:
     """
     Serviço que gerencia a captura e reprodução do áudio do microfone.
     """
     
-    def __init__(self):
+    def __init__(self, frames_per_buffer=256, buffer_blocks=2, audio_host=None):
         """
         Inicializa o serviço de microfone.
+        
+        Args:
+            frames_per_buffer (int): Frames por callback (menor = menos latência,
+                mais chamadas; 256 a 44,1 kHz ≈ 5,8 ms)
+            buffer_blocks (int): Blocos mantidos no buffer circular antes da saída
+                (folga contra variações de agendamento)
+            audio_host (AudioHost, optional): Host de áudio (padrão: o compartilhado)
         """
-        self.audio = pyaudio.PyAudio()
+        self.audio_host = (audio_host or get_audio_host()).acquire()
         self.input_stream = None
         self.output_stream = None
         self.is_active = False
-        self.stop_event = threading.Event()
-        self.thread = None
         
         # Parâmetros de áudio
         # Essas configurações podem precisar ser ajustadas para o seu hardware
         self.format = pyaudio.paInt16
         self.channels = 1
         self.rate = 44100  # Alguns dispositivos funcionam melhor com 48000 ou 16000
-        self.chunk = 1024
+        self.chunk = frames_per_buffer
+        self.buffer_blocks = buffer_blocks
+        self.frame_bytes = 2 * self.channels  # int16
+        
+        # Buffer circular entre o callback de entrada e o de saída
+        self.ring = None
+        self._output_started = False
+        
+        # Contadores de xrun reportados pelo PortAudio
+        self.input_overflows = 0
+        self.output_underflows = 0
         self.input_device_index = None  # None = dispositivo padrão
         self.output_device_index = None  # None = dispositivo padrão
         
+        # Medidores do último bloco (normalizados entre 0.0 e 1.0)
+        self.level_rms = 0.0
+        self.level_peak = 0.0
+        # Nível RMS a partir do qual há atividade de voz (~ -36 dBFS)
+        self.activity_threshold = 0.015
+        # Callbacks chamados com o nível RMS de cada bloco (ex: VOX)
+        self._level_listeners = []
+        
+        # Envia a voz para a saída (desligado ao gravar um aviso sem ir ao ar)
+        self.monitor = True
+        # Cadeia opcional de DSP da voz (passa-altas, gate, compressor, limitador)
+        self.dsp = None
+        # Gravação de avisos para a pasta de mensagens
+        self.recorder = None
+        self._opened_for_recording = False
+        
         # Tenta encontrar o melhor dispositivo de entrada
         self._find_best_devices()
     
@@ -44,15 +82,12 @@ class MicrophoneService:
         """
         try:
             # Imprime informações de todos os dispositivos para diagnóstico
-            info = self.audio.get_host_api_info_by_index(0)
-            numdevices = info.get('deviceCount')
-            
             print("\nDispositivos de áudio disponíveis:")
-            for i in range(0, numdevices):
-                device_info = self.audio.get_device_info_by_index(i)
-                name = device_info.get('name')
-                max_input_channels = device_info.get('maxInputChannels')
-                max_output_channels = device_info.get('maxOutputChannels')
+            for device in self.audio_host.get_devices():
+                i = device['index']
+                name = device['name']
+                max_input_channels = device['inputs']
+                max_output_channels = device['outputs']
                 
                 print(f"Dispositivo {i}: {name}")
                 print(f"   Canais de entrada: {max_input_channels}")
@@ -72,49 +107,67 @@ class MicrophoneService:
         except Exception as e:
             print(f"Erro ao buscar dispositivos de áudio: {str(e)}")
     
-    def start_microphone(self):
+    def start_microphone(self, monitor=True):
         """
         Inicia a captura do microfone e envia para a saída de áudio.
         
+        Args:
+            monitor (bool): Envia a voz para a saída (False apenas captura)
+        
         Returns:
             bool: True se o microfone foi iniciado com sucesso
         """
         if self.is_active:
+            if monitor and not self.monitor:
+                self.monitor = True
+                self._opened_for_recording = False
             print("Microfone já está ativo")
             return True
+        
+        self.monitor = monitor
             
         try:
-            # Configura o stream de entrada (microfone)
-            self.input_stream = self.audio.open(
+            block_bytes = self.chunk * self.frame_bytes
+            # Capacidade folgada: o excesso acima da latência alvo é descartado pela saída
+            self.ring = AudioRingBuffer(block_bytes * max(8, self.buffer_blocks * 4), self.frame_bytes)
+            self._output_started = False
+            if self.dsp is not None:
+                self.dsp.reset()
+            self.input_overflows = 0
+            self.output_underflows = 0
+            
+            # Stream de saída (alto-falantes) em modo callback: puxa do buffer circular
+            self.output_stream = self.audio_host.open_stream(
                 format=self.format,
                 channels=self.channels,
                 rate=self.rate,
-                input=True,
+                output=True,
                 frames_per_buffer=self.chunk,
-                input_device_index=self.input_device_index,
-                stream_callback=None  # Sem callback para permitir leitura manual
+                output_device_index=self.output_device_index,
+                stream_callback=self._output_callback,
+                start=False
             )
             
-            # Configura o stream de saída (alto-falantes)
-            self.output_stream = self.audio.open(
+            # Stream de entrada (microfone) em modo callback: alimenta o buffer circular
+            self.input_stream = self.audio_host.open_stream(
                 format=self.format,
                 channels=self.channels,
                 rate=self.rate,
-                output=True,
+                input=True,
                 frames_per_buffer=self.chunk,
-                output_device_index=self.output_device_index
+                input_device_index=self.input_device_index,
+                stream_callback=self._input_callback,
+                start=False
             )
             
-            # Reseta o evento de parada
-            self.stop_event.clear()
-            
-            # Inicia a thread de processamento
-            self.thread = threading.Thread(target=self._process_audio)
-            self.thread.daemon = True
-            self.thread.start()
+            self.output_stream.start_stream()
+            self.input_stream.start_stream()
             
             self.is_active = True
-            print("Microfone ativado com sucesso")
+            latency_ms = 1000.0 * (self.output_stream.get_output_latency()
+                                   + self.input_stream.get_input_latency()
+                                   + self.chunk * self.buffer_blocks / self.rate)
+            print(f"Microfone ativado com sucesso (latência estimada: {latency_ms:.1f} ms)")
             return True
             
         except Exception as e:
@@ -129,30 +182,24 @@ class MicrophoneService:
         Returns:
             bool: True se o microfone foi parado com sucesso
         """
-        if not self.is_active:
+        # Também fecha streams abertos por um start_microphone que falhou no meio
+        if not self.is_active and self.input_stream is None and self.output_stream is None:
             return True
             
         try:
-            # Sinaliza para a thread parar
-            self.stop_event.set()
-            
-            # Espera a thread terminar (com timeout)
-            if self.thread and self.thread.is_alive():
-                self.thread.join(timeout=1.0)
-            
-            # Fecha os streams
+            # Fecha os streams (a entrada primeiro, para a saída esvaziar o buffer)
             if self.input_stream:
-                self.input_stream.stop_stream()
-                self.input_stream.close()
+                self.audio_host.close_stream(self.input_stream)
                 self.input_stream = None
                 
             if self.output_stream:
-                self.output_stream.stop_stream()
-                self.output_stream.close()
+                self.audio_host.close_stream(self.output_stream)
                 self.output_stream = None
             
             self.is_active = False
-            print("Microfone desativado")
+            self.level_rms = 0.0
+            self.level_peak = 0.0
+            print(f"Microfone desativado ({self._xrun_summary()})")
             return True
             
         except Exception as e:
@@ -172,37 +219,187 @@ class MicrophoneService:
         else:
             return self.start_microphone()
     
-    def _process_audio(self):
+    def _input_callback(self, in_data, frame_count, time_info, status):
+        """
+        Callback de captura (thread do PortAudio): mede o nível e entrega o
+        bloco ao buffer circular. Não bloqueia nem aloca além do necessário.
+        """
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        
+        dsp = self.dsp
+        if dsp is not None:
+            in_data = dsp.process(in_data)
+        
+        # Medidores vetorizados (sem laço Python por amostra)
+        self.level_rms, self.level_peak = measure_levels(in_data)
+        for listener in self._level_listeners:
+            listener(self.level_rms)
+        
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.feed(in_data)
+        
+        if self.monitor:
+            self.ring.write(in_data)
+        return (None, pyaudio.paContinue)
+    
+    def _output_callback(self, in_data, frame_count, time_info, status):
+        """
+        Callback de reprodução (thread do PortAudio): entrega o próximo bloco do
+        buffer circular, mantendo a ocupação perto da latência alvo.
+        """
+        if status & pyaudio.paOutputUnderflow:
+            self.output_underflows += 1
+        
+        size = frame_count * self.frame_bytes
+        target = self.chunk * self.frame_bytes * self.buffer_blocks
+        
+        if not self._output_started:
+            # Aguarda a folga inicial antes de começar a consumir
+            if self.ring.available() < target:
+                return (bytes(size), pyaudio.paContinue)
+            self._output_started = True
+        
+        # Relógios de entrada e saída divergem: descarta o excesso para a latência não crescer
+        self.ring.skip_to(target + size)
+        return (self.ring.read(size), pyaudio.paContinue)
+    
+    def _xrun_summary(self):
+        stats = self.get_stats()
+        summary = (f"overflows entrada: {stats['input_overflows']}, underflows saída: {stats['output_underflows']}, "
+                   f"buffer cheio: {stats['ring_overflows']}, buffer vazio: {stats['ring_underruns']}")
+        if stats['dsp']:
+            summary += (f", DSP: {stats['dsp']['average_ms']:.2f} ms/bloco "
+                        f"({stats['dsp']['load'] * 100:.0f}% do tempo real)")
+        return summary
+    
+    def get_stats(self):
+        """
+        Retorna os contadores de xrun e a ocupação do buffer circular.
+        
+        Returns:
+            dict: input_overflows, output_underflows, ring_overflows, ring_underruns,
+                buffered_ms, frames_per_buffer e dsp (custo de CPU da cadeia ou None)
+        """
+        ring = self.ring
+        return {
+            'input_overflows': self.input_overflows,
+            'output_underflows': self.output_underflows,
+            'ring_overflows': ring.overflows if ring else 0,
+            'ring_underruns': ring.underruns if ring else 0,
+            'buffered_ms': 1000.0 * ring.available() / (self.frame_bytes * self.rate) if ring else 0.0,
+            'frames_per_buffer': self.chunk,
+            'dsp': self.dsp.get_stats() if self.dsp else None,
+        }
+    
+    def set_dsp_enabled(self, enabled, **settings):
         """
-        Processa o áudio do microfone em tempo real.
-        Esta função executa em uma thread separada.
+        Liga ou desliga a cadeia de DSP da voz (requer NumPy).
+        
+        Args:
+            enabled (bool): True para ligar
+            **settings: Parâmetros de MicDspChain (highpass_hz, gate_threshold_db...)
+            
+        Returns:
+            bool: Novo estado da cadeia
         """
+        if not enabled:
+            self.dsp = None
+            print("DSP do microfone desligado")
+            return False
+        
         try:
-            print("Iniciando processamento de áudio do microfone...")
-            while not self.stop_event.is_set():
-                # Lê dados do microfone
-                try:
-                    data = self.input_stream.read(self.chunk)
-                    # Mostra atividade de áudio (para diagnóstico)
-                    level = sum(abs(int.from_bytes(data[i:i+2], byteorder='little', signed=True)) 
-                               for i in range(0, len(data), 2)) / (self.chunk)
-                    if level > 500:  # Valor arbitrário para detecção de som
-                        print(f"Atividade de áudio detectada: {level:.0f}")
-                        
-                    # Envia para a saída
-                    self.output_stream.write(data)
-                except IOError as e:
-                    # Erro comum quando o buffer está cheio ou vazio - podemos ignorar
-                    pass
-                except Exception as e:
-                    print(f"Erro na leitura/escrita de áudio: {str(e)}")
-                    
-                # Pequena pausa para não sobrecarregar o CPU
-                time.sleep(0.001)
-                
-        except Exception as e:
-            print(f"Erro no processamento de áudio: {str(e)}")
-            self.stop_event.set()
+            self.dsp = MicDspChain(self.rate, **settings)
+        except RuntimeError as e:
+            print(f"⚠ {str(e)}")
+            return False
+        print("DSP do microfone ligado (passa-altas, gate, compressor, limitador)")
+        return True
+    
+    def start_recording(self, messages_path, name=None, on_complete=None):
+        """
+        Grava a voz do microfone como um novo aviso na pasta de mensagens.
+        Se o microfone estiver desligado, ele é aberto apenas para captura
+        (a voz não vai ao ar durante a gravação).
+        
+        Args:
+            messages_path (Path): Pasta das mensagens (AUDIO)
+            name (str, optional): Nome do arquivo
+            on_complete (callable, optional): Chamado com o Path do arquivo pronto
+                (ou None) após o corte e a normalização
+            
+        Returns:
+            Path: Caminho do arquivo final ou None se não foi possível gravar
+        """
+        if self.recorder is not None and self.recorder.is_recording:
+            return None
+        
+        if not self.is_active:
+            if not self.start_microphone(monitor=False):
+                return None
+            self._opened_for_recording = True
+        
+        recorder = AnnouncementRecorder(messages_path, rate=self.rate, channels=self.channels,
+                                        on_complete=on_complete)
+        path = recorder.start(name)
+        self.recorder = recorder
+        return path
+    
+    def stop_recording(self):
+        """
+        Encerra a gravação em andamento (o processamento continua em segundo plano).
+        
+        Returns:
+            Path: Caminho do arquivo final ou None se não havia gravação
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        
+        path = recorder.stop()
+        if self._opened_for_recording:
+            self._opened_for_recording = False
+            self.stop_microphone()
+        return path
+    
+    @property
+    def is_recording(self):
+        """True se há uma gravação de aviso em andamento."""
+        return self.recorder is not None and self.recorder.is_recording
+    
+    def add_level_listener(self, callback):
+        """
+        Registra um callback chamado com o nível RMS de cada bloco capturado.
+        Executa no callback de áudio: deve ser rápido e não bloquear.
+        
+        Args:
+            callback (callable): Função que recebe o nível (0.0 a 1.0)
+        """
+        if callback not in self._level_listeners:
+            # Substitui a lista (o callback de áudio itera sobre a anterior sem lock)
+            self._level_listeners = self._level_listeners + [callback]
+    
+    def remove_level_listener(self, callback):
+        """Remove um callback registrado com add_level_listener."""
+        self._level_listeners = [c for c in self._level_listeners if c is not callback]
+    
+    def get_levels(self):
+        """
+        Retorna os medidores do último bloco capturado.
+        
+        Returns:
+            dict: rms e peak (0.0 a 1.0), rms_db e peak_db (dBFS) e active
+                (True se o nível indica voz)
+        """
+        rms, peak = self.level_rms, self.level_peak
+        return {
+            'rms': rms,
+            'peak': peak,
+            'rms_db': level_to_db(rms),
+            'peak_db': level_to_db(peak),
+            'active': self.is_active and rms >= self.activity_threshold,
+        }
     
     def set_input_device(self, device_index):
         """
@@ -232,33 +429,25 @@ class MicrophoneService:
     
     def cleanup(self):
         """
-        Libera recursos e encerra o PyAudio.
+        Libera recursos e o host de áudio.
         Deve ser chamado quando a aplicação estiver sendo encerrada.
         """
+        self.stop_recording()
         self.stop_microphone()
-        self.audio.terminate()
+        if self.audio_host is not None:
+            self.audio_host.release()
+            self.audio_host = None
         print("Recursos do microfone liberados")
         
-    def get_device_list(self):
+    def get_device_list(self, refresh=False):
         """
-        Retorna uma lista de todos os dispositivos de áudio disponíveis.
+        Retorna uma lista de todos os dispositivos de áudio disponíveis
+        (da tabela em cache do host de áudio).
+        
+        Args:
+            refresh (bool): Reenumera os dispositivos (detecta os conectados/removidos)
         
         Returns:
             list: Lista de dicionários com informações dos dispositivos
         """
-        devices = []
-        info = self.audio.get_host_api_info_by_index(0)
-        numdevices = info.get('deviceCount')
-        
-        for i in range(0, numdevices):
-            device_info = self.audio.get_device_info_by_index(i)
-            devices.append({
-                'index': i,
-                'name': device_info.get('name'),
-                'inputs': device_info.get('maxInputChannels'),
-                'outputs': device_info.get('maxOutputChannels'),
-                'default_input': i == self.audio.get_default_input_device_info().get('index'),
-                'default_output': i == self.audio.get_default_output_device_info().get('index')
-            })
-            
-        return devices
\ No newline at end of file
+        return self.audio_host.get_devices(refresh)
\ No newline at end of file
@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from models.message_item import MessageQueueItem
 from services.microphone_service import MicrophoneService
+from services.vox_controller import VoxController
 from services.radio_source_manager import RadioSourceManager, RadioSource
 
 class PlayerService:
@@ -36,29 +37,70 @@ class PlayerService:
         ERROR = "Erro"
         MIC_ACTIVE = "Microfone Ativo"
     
-    def __init__(self, config_dir, messages_path):
+    def __init__(self, config_dir, messages_path, shared_resources=None,
+                 output_device=None, radio_source_index=None):
         """
         Inicializa o serviço de reprodução.
         
         Args:
             config_dir (Path): Diretório de configuração
             messages_path (Path): Caminho para a pasta de mensagens
+            shared_resources (SharedAudioResources, optional): Recursos compartilhados
+                entre zonas (instância VLC, fontes de rádio, mídias pré-carregadas).
+                Quando informado, as mensagens tocam pelo VLC da zona em vez do Pygame
+            output_device (str, optional): ID do dispositivo de saída de áudio da zona
+            radio_source_index (int, optional): Fonte de rádio própria da zona
         """
-        # Inicializa o gerenciador de fontes de rádio
-        self.source_manager = RadioSourceManager(config_dir)
+        self.shared_resources = shared_resources
+        self.output_device = output_device
+        self.radio_source_index = radio_source_index
+        
+        if shared_resources is not None:
+            # Zona: instância VLC e fontes de rádio são compartilhadas no processo
+            self.source_manager = shared_resources.source_manager
+            self.vlc_instance = shared_resources.vlc_instance
+        else:
+            # Inicializa o gerenciador de fontes de rádio
+            self.source_manager = RadioSourceManager(config_dir)
+            
+            # Inicializa VLC para a rádio
+            self.vlc_instance = vlc.Instance("--no-video")
+        
+        # Callbacks de mudança de estado para a interface (registrados antes
+        # dos eventos do VLC, que podem chegar a qualquer momento)
+        self._state_listeners = []
         
-        # Inicializa VLC para a rádio
-        self.vlc_instance = vlc.Instance("--no-video")
         self.radio_player = self.vlc_instance.media_player_new()
+        if output_device:
+            self.radio_player.audio_output_device_set(None, output_device)
+        self._attach_vlc_events(self.radio_player)
         
         # Para captura de dispositivos de áudio
         self.device_capture = None
         
-        # Inicializa Pygame para mensagens - Modificar para incluir frequência adequada
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
-        pygame.mixer.set_num_channels(8)  # Aumenta o número de canais disponíveis
+        # O mixer do Pygame é global do processo (um único dispositivo de saída);
+        # cada zona usa seu próprio player VLC para as mensagens
+        self.message_player = None
+        if shared_resources is not None:
+            self.message_player = self.vlc_instance.media_player_new()
+            if output_device:
+                self.message_player.audio_output_device_set(None, output_device)
+            self._attach_vlc_events(self.message_player)
+        else:
+            # Inicializa Pygame para mensagens - Modificar para incluir frequência adequada
+            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
+            pygame.mixer.set_num_channels(8)  # Aumenta o número de canais disponíveis
         
+        # Microfone (criado na primeira utilização) e VOX
         self.microphone_service = None
+        self.vox_controller = None
+        self.audio_ducked = False
+        self.duck_level = 1.0
+        
+        # Volume da rádio: pedidos de duck combinados (vale o menor) e um único fade por vez
+        self._duck_requests = {}  # origem ('message', 'microphone') -> fração do volume normal
+        self._fade_lock = threading.RLock()
+        self._fade_generation = 0  # cada fade novo cancela o anterior
         
         # Caminho para mensagens
         self.messages_path = Path(messages_path)
@@ -73,10 +115,11 @@ class PlayerService:
         # Flag para verificar se a mensagem está tocando
         self.message_playing = False
         
-        # Tempo de término da mensagem atual
+        # Tempo de término e duração da mensagem atual
         self.end_time = None
+        self.message_duration = 0
         
-        # Volume original antes de ativar o microfone
+        # Volume normal da rádio (sem duck): o duck é sempre calculado sobre ele
         self.original_volume = 100
         self.mic_active = False
         
@@ -85,12 +128,82 @@ class PlayerService:
         
         # Timer para monitorar o estado do Pygame
         self.last_check_time = datetime.now()
+        
+        # Callbacks de eventos de reprodução (ex: acordar o gerenciador da fila)
+        self._playback_listeners = []
+    
+    def add_playback_listener(self, callback):
+        """
+        Registra um callback chamado quando a reprodução muda de estado
+        (mensagem iniciada, parada, pausada ou retomada).
+        
+        Args:
+            callback (callable): Função sem argumentos
+        """
+        if callback not in self._playback_listeners:
+            self._playback_listeners.append(callback)
+    
+    def _notify_playback_event(self):
+        """Avisa os interessados sobre uma mudança na reprodução."""
+        for callback in list(self._playback_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Erro no callback de reprodução: {str(e)}")
+        self._notify_state_change()
+    
+    def add_state_listener(self, callback):
+        """
+        Registra um callback chamado quando o estado exibido muda (play/pause,
+        modo rádio/mensagem, microfone, fonte, estado do VLC).
+        Pode ser chamado em qualquer thread, inclusive a do VLC: deve ser
+        rápido e não chamar funções do VLC.
+        
+        Args:
+            callback (callable): Função sem argumentos
+        """
+        if callback not in self._state_listeners:
+            self._state_listeners = self._state_listeners + [callback]
+    
+    def remove_state_listener(self, callback):
+        """Remove um callback registrado com add_state_listener."""
+        self._state_listeners = [c for c in self._state_listeners if c != callback]
+    
+    def _notify_state_change(self, event=None):
+        """Avisa a interface de uma mudança de estado (também usado nos eventos do VLC)."""
+        for callback in self._state_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Erro no callback de estado: {str(e)}")
+    
+    def _attach_vlc_events(self, player):
+        """Encaminha as mudanças de estado de um player VLC para _notify_state_change."""
+        events = player.event_manager()
+        for event_type in (vlc.EventType.MediaPlayerOpening, vlc.EventType.MediaPlayerBuffering,
+                           vlc.EventType.MediaPlayerPlaying, vlc.EventType.MediaPlayerPaused,
+                           vlc.EventType.MediaPlayerStopped, vlc.EventType.MediaPlayerEndReached,
+                           vlc.EventType.MediaPlayerEncounteredError):
+            events.event_attach(event_type, self._notify_state_change)
+    
+    def _current_source(self):
+        """
+        Obtém a fonte de rádio deste player: a fonte própria da zona, se definida,
+        ou a fonte atual do gerenciador de fontes.
+        
+        Returns:
+            RadioSource: Fonte de rádio
+        """
+        sources = self.source_manager.sources
+        if self.radio_source_index is not None and 0 <= self.radio_source_index < len(sources):
+            return sources[self.radio_source_index]
+        return self.source_manager.get_current_source()
     
     def init_radio(self):
         """Inicializa o player de rádio com a fonte atual - VERSÃO CORRIGIDA."""
         try:
             # Obtém a fonte atual
-            source = self.source_manager.get_current_source()
+            source = self._current_source()
             
             print(f"Inicializando rádio: {source.name}")
             
@@ -182,7 +295,7 @@ class PlayerService:
         except Exception as e:
             print(f"Erro ao configurar dispositivo de rádio: {str(e)}")
             # Fallback para streaming padrão em caso de erro
-            default_source = self.source_manager.get_current_source()
+            default_source = self._current_source()
             if default_source.source_type == RadioSource.TYPE_STREAM:
                 self._init_radio_stream(default_source.url)
     
@@ -206,8 +319,15 @@ class PlayerService:
             bool: True se mudou com sucesso
         """
         try:
-            # Obtém a nova fonte
-            new_source = self.source_manager.set_current_source(source_index)
+            # Obtém a nova fonte (zonas guardam a própria fonte sem alterar as demais)
+            if self.radio_source_index is not None:
+                if 0 <= source_index < len(self.source_manager.sources):
+                    self.radio_source_index = source_index
+                    new_source = self.source_manager.sources[source_index]
+                else:
+                    new_source = None
+            else:
+                new_source = self.source_manager.set_current_source(source_index)
             
             if new_source:
                 # Se estamos no modo rádio, atualiza imediatamente
@@ -225,6 +345,7 @@ class PlayerService:
                     self.radio_player.play()
                     self.is_playing = True
                 
+                self._notify_state_change()
                 return True
             else:
                 print("Falha ao mudar fonte de rádio: fonte inválida")
@@ -241,7 +362,7 @@ class PlayerService:
         Returns:
             str: Nome da fonte atual
         """
-        source = self.source_manager.get_current_source()
+        source = self._current_source()
         return source.name if source else "Desconhecida"                                                                                                                                                                                    
     
     def play(self):
@@ -260,6 +381,10 @@ class PlayerService:
             if self.is_radio_mode:
                 if not self.radio_player.is_playing():
                     self.radio_player.play()
+            elif self.message_player is not None:
+                # Mensagem da zona pausada no VLC
+                self.message_player.set_pause(0)
+                self.message_playing = True
             else:
                 # Se estiver no modo mensagem e pygame estiver pausado
                 if pygame.mixer.get_busy() == 0 and hasattr(self, 'current_sound'):
@@ -272,6 +397,7 @@ class PlayerService:
                     self.message_playing = True
             
             self.is_playing = True
+            self._notify_playback_event()
             return True
         except Exception as e:
             print(f"Erro ao iniciar reprodução: {str(e)}")
@@ -281,6 +407,9 @@ class PlayerService:
         """Pausa a reprodução atual."""
         if self.is_radio_mode:
             self.radio_player.pause()
+        elif self.message_player is not None:
+            self.message_player.set_pause(1)
+            self.message_playing = False
         else:
             # Pausa o Pygame apenas se estiver tocando
             if pygame.mixer.get_busy():
@@ -288,6 +417,7 @@ class PlayerService:
                 self.message_playing = False
             
         self.is_playing = False
+        self._notify_playback_event()
 
     def toggle_playback(self):
         """
@@ -315,68 +445,109 @@ class PlayerService:
             print(f"Erro ao alternar reprodução: {str(e)}")
             return False
     
-    def toggle_microphone(self):
-        """
-        Versão modificada que desabilita a funcionalidade do microfone.
-        
-        Returns:
-            bool: Sempre False (microfone desativado)
-        """
-        print("Funcionalidade de microfone desativada")
-        return False
-    
     def stop(self):
         """Para a reprodução."""
         self.radio_player.stop()
-        pygame.mixer.stop()
+        self._stop_message_output()
         self.message_playing = False
         self.is_playing = False
+        self._notify_playback_event()
     
-    def set_radio_volume(self, volume, fade_duration=0):
+    def set_radio_volume(self, volume, fade_duration=0, curve=None, steps_per_second=10):
         """
         Define o volume apenas do player de rádio.
         Utilizado para abaixar o volume da rádio durante a reprodução de mensagens.
         Suporta fade gradual se fade_duration > 0.
         
+        Há um único fade da rádio por vez: um novo pedido (ou um volume imediato)
+        cancela o fade em andamento, que continua do volume em que estava.
+        
         Args:
             volume (int): Volume de 0 a 100
             fade_duration (float): Duração do fade em segundos (0 para imediato)
+            curve (callable, optional): Curva do fade (progresso 0.0-1.0 → 0.0-1.0);
+                linear se None
+            steps_per_second (int): Passos de volume por segundo de fade
         """
-        if fade_duration <= 0:
-            # Aplicação imediata de volume
-            print(f"Definindo volume da rádio para {volume}%")
-            self.radio_player.audio_set_volume(volume)
-            return
+        volume = max(0, min(100, int(volume)))
+        with self._fade_lock:
+            self._fade_generation += 1
+            generation = self._fade_generation
             
-        # Aplicação gradual (fade)
-        current_volume = self.radio_player.audio_get_volume()
-        steps = int(fade_duration * 10)  # 10 passos por segundo
-        if steps < 1:
-            steps = 1
+            if fade_duration <= 0:
+                # Aplicação imediata de volume
+                print(f"Definindo volume da rádio para {volume}%")
+                self.radio_player.audio_set_volume(volume)
+                return
             
-        volume_step = (volume - current_volume) / steps
+            current_volume = self.radio_player.audio_get_volume()
+        
+        # Aplicação gradual (fade)
+        steps = max(1, int(fade_duration * steps_per_second))
         
         def fade_thread():
-            temp_volume = current_volume
-            for i in range(steps):
-                temp_volume += volume_step
-                vol = int(round(temp_volume))
-                # Limita o volume entre 0 e 100
-                vol = max(0, min(100, vol))
-                self.radio_player.audio_set_volume(vol)
-                print(f"Fade: ajustando volume para {vol}%")
+            for i in range(1, steps + 1):
                 time.sleep(fade_duration / steps)
+                progress = curve(i / steps) if curve else i / steps
+                vol = int(round(current_volume + (volume - current_volume) * progress))
+                with self._fade_lock:
+                    if generation != self._fade_generation:
+                        return  # substituído por um fade mais novo
+                    # Limita o volume entre 0 e 100
+                    self.radio_player.audio_set_volume(max(0, min(100, vol)))
             
             # Garante que o volume final seja exatamente o solicitado
-            self.radio_player.audio_set_volume(volume)
-            print(f"Fade concluído: volume final {volume}%")
+            with self._fade_lock:
+                if generation == self._fade_generation:
+                    self.radio_player.audio_set_volume(volume)
+                    print(f"Fade concluído: volume final {volume}%")
         
         # Inicia o fade em uma thread separada para não bloquear
-        fade_thread = threading.Thread(target=fade_thread)
-        fade_thread.daemon = True
-        fade_thread.start()
+        threading.Thread(target=fade_thread, name="RadioFade", daemon=True).start()
         print(f"Iniciando fade de volume de {current_volume}% para {volume}% em {fade_duration} segundos")
     
+    def cancel_radio_fade(self):
+        """Interrompe o fade da rádio em andamento, mantendo o volume atual."""
+        with self._fade_lock:
+            self._fade_generation += 1
+    
+    def _radio_target_volume(self):
+        """Volume da rádio com o duck mais forte entre os pedidos ativos."""
+        level = min(self._duck_requests.values(), default=1.0)
+        return int(round(self.original_volume * level))
+    
+    def duck_radio(self, source, level, fade_duration=0.5, curve=None, steps_per_second=10):
+        """
+        Abaixa a rádio para uma fração do volume normal em nome de uma origem.
+        Com várias origens ativas (ex: mensagem e microfone) vale a menor fração.
+        
+        Args:
+            source (str): Origem do pedido (ex: 'message', 'microphone')
+            level (float): Fração do volume normal (ex: 0.05 = 5%)
+            fade_duration (float): Duração do fade em segundos
+            curve (callable, optional): Curva do fade
+            steps_per_second (int): Passos de volume por segundo de fade
+        """
+        with self._fade_lock:
+            self._duck_requests[source] = level
+            self.set_radio_volume(self._radio_target_volume(), fade_duration, curve, steps_per_second)
+    
+    def unduck_radio(self, source, fade_duration=1.0, curve=None, steps_per_second=10):
+        """
+        Retira o pedido de duck de uma origem; a rádio volta ao volume das
+        origens restantes (ou ao volume normal).
+        
+        Args:
+            source (str): Origem do pedido
+            fade_duration (float): Duração do fade em segundos
+            curve (callable, optional): Curva do fade
+            steps_per_second (int): Passos de volume por segundo de fade
+        """
+        with self._fade_lock:
+            if self._duck_requests.pop(source, None) is None:
+                return
+            self.set_radio_volume(self._radio_target_volume(), fade_duration, curve, steps_per_second)
+    
     def switch_to_radio(self):
         """
         Muda a reprodução para a rádio - VERSÃO CORRIGIDA.
@@ -386,7 +557,7 @@ class PlayerService:
             print("📻 Mudando para modo rádio...")
             
             # Para qualquer reprodução de mensagem
-            pygame.mixer.stop()
+            self._stop_message_output()
             self.message_playing = False
             
             # Define modo rádio
@@ -402,6 +573,7 @@ class PlayerService:
                     print(f"📻 Volume atual: {current_volume}%, aguardando fade...")
                 
                 self.is_playing = True
+                self._notify_state_change()
                 print("✅ Modo rádio ativo (rádio continuou tocando em segundo plano)")
                 return True
                 
@@ -411,13 +583,68 @@ class PlayerService:
 
 
 
+    def _stop_message_output(self):
+        """Para a saída de mensagens (VLC da zona ou Pygame)."""
+        if self.message_player is not None:
+            self.message_player.stop()
+        else:
+            pygame.mixer.stop()
+    
+    def _is_message_output_busy(self):
+        """
+        Verifica se a saída de mensagens ainda está reproduzindo.
+        
+        Returns:
+            bool: True se a mensagem ainda está tocando (ou abrindo)
+        """
+        if self.message_player is not None:
+            state = self.message_player.get_state()
+            return state not in (vlc.State.Ended, vlc.State.Stopped,
+                                 vlc.State.Error, vlc.State.NothingSpecial)
+        return bool(pygame.mixer.get_busy())
+    
+    def _play_message_vlc(self, file_path, message):
+        """
+        Reproduz a mensagem pelo player VLC da zona, usando a mídia já
+        carregada (e com duração conhecida) nos recursos compartilhados.
+        
+        Args:
+            file_path (Path): Caminho do arquivo
+            message (PlaybackTicket): Bilhete da mensagem agendada
+            
+        Returns:
+            bool: True se a mensagem começou a tocar
+        """
+        media, duration = self.shared_resources.get_media(file_path)
+        
+        self.message_player.stop()
+        self.message_player.set_media(media)
+        media.release()  # o player mantém a própria referência
+        self.message_player.audio_set_volume(int(100 * self._message_volume()))
+        if self.message_player.play() == -1:
+            print(f"Falha ao iniciar reprodução no VLC: {file_path}")
+            return False
+        
+        self.message_playing = True
+        self.is_playing = True
+        self.is_radio_mode = False
+        self.current_message = message
+        self.message_duration = duration
+        self.end_time = datetime.now() + timedelta(seconds=duration)
+        self.last_check_time = datetime.now()
+        self._fadeout_applied = False
+        
+        print(f"Mensagem '{file_path.name}' com duração de {duration:.1f}s, término estimado: {self.end_time.strftime('%H:%M:%S')}")
+        self._notify_playback_event()
+        return True
+    
     def play_message(self, filename, message=None, fade_in_duration=0.0):
         """
         Reproduz uma mensagem usando Pygame.
         
         Args:
             filename (str): Nome do arquivo da mensagem
-            message (MessageQueueItem, optional): Objeto de mensagem completo
+            message (PlaybackTicket, optional): Bilhete da mensagem agendada
             fade_in_duration (float): Duração do fade in em segundos
                     
         Returns:
@@ -435,6 +662,10 @@ class PlayerService:
                 print(f"Arquivo de mensagem não encontrado: {file_path}")
                 return False
             
+            # Zona: reproduz pelo VLC no dispositivo de saída da zona
+            if self.message_player is not None:
+                return self._play_message_vlc(file_path, message)
+            
             # Caminho absoluto para o arquivo
             abs_path = str(file_path.absolute())
             print(f"Tentando reproduzir mensagem com Pygame: {abs_path}")
@@ -461,8 +692,8 @@ class PlayerService:
                 print(f"Duração do som: {self.current_sound.get_length()} segundos")
                 
                 # MODIFICAÇÃO CRÍTICA: Define o volume para máximo (1.0 = 100%)
-                # e desabilita qualquer fade-in
-                self.current_sound.set_volume(1.0)
+                # e desabilita qualquer fade-in (exceto se o áudio está abaixado pelo microfone)
+                self.current_sound.set_volume(self._message_volume())
                 print("VOLUME DA MENSAGEM DEFINIDO PARA 100%")
                 
             except pygame.error as e:
@@ -499,11 +730,11 @@ class PlayerService:
                 duration = estimated_duration
             
             # Define o tempo de término estimado
+            self.message_duration = duration
             self.end_time = datetime.now() + timedelta(seconds=duration)
             
-            # Se temos uma mensagem atual, atualiza seu tempo de término
+            # O bilhete é imutável: o término estimado fica apenas no player
             if self.current_message is not None:
-                self.current_message.end_time = self.end_time
                 print(f"Mensagem '{filename}' com duração de {duration}s, término estimado: {self.end_time.strftime('%H:%M:%S')}")
             
             # Reinicia o timer de verificação
@@ -511,6 +742,7 @@ class PlayerService:
             # Reset flag de fadeout
             self._fadeout_applied = False
             
+            self._notify_state_change()
             return True
                 
         except Exception as e:
@@ -519,6 +751,61 @@ class PlayerService:
             traceback.print_exc()
             return False
     
+    def get_microphone_service(self):
+        """
+        Retorna o serviço de microfone, criando-o na primeira utilização.
+        
+        Returns:
+            MicrophoneService: Serviço de microfone
+        """
+        if self.microphone_service is None:
+            self.microphone_service = MicrophoneService()
+        return self.microphone_service
+    
+    def _message_volume(self):
+        """Volume (0.0 a 1.0) das mensagens, considerando o ducking do microfone."""
+        return self.duck_level if self.audio_ducked else 1.0
+    
+    def duck_audio(self, level, fade_duration=0.5):
+        """
+        Abaixa a rádio e a mensagem em andamento para uma fração do volume.
+        
+        Args:
+            level (float): Fração do volume (ex: 0.05 = 5%)
+            fade_duration (float): Duração do fade da rádio em segundos
+        """
+        self.audio_ducked = True
+        self.duck_level = level
+        
+        self.duck_radio('microphone', level, fade_duration=fade_duration)
+        
+        # Mensagem em andamento
+        if self.message_player is not None:
+            self.message_player.audio_set_volume(int(100 * level))
+        elif hasattr(self, 'current_sound'):
+            self.current_sound.set_volume(level)
+        print(f"Áudio reduzido para {level * 100:.0f}% (microfone)")
+    
+    def restore_audio(self, fade_duration=1.0):
+        """
+        Restaura o volume anterior ao duck_audio (a rádio continua abaixada
+        se uma mensagem estiver tocando).
+        
+        Args:
+            fade_duration (float): Duração do fade da rádio em segundos
+        """
+        if not self.audio_ducked:
+            return
+        self.audio_ducked = False
+        
+        self.unduck_radio('microphone', fade_duration=fade_duration)
+        
+        if self.message_player is not None:
+            self.message_player.audio_set_volume(100)
+        elif hasattr(self, 'current_sound'):
+            self.current_sound.set_volume(1.0)
+        print("Volume de áudio restaurado")
+    
     def toggle_microphone(self):
         """
         Ativa ou desativa o microfone.
@@ -528,83 +815,85 @@ class PlayerService:
         Returns:
             bool: Novo estado do microfone (True para ativo)
         """
+        LOW_VOLUME = 0.05  # 5% do volume para ainda ser audível em segundo plano
+        
         try:
             # Se estiver desativando o microfone
             if self.mic_active:
-                # Desativa o microfone
-                self.microphone_service.stop_microphone()
-                
-                # Restaura o volume original
-                if self.is_radio_mode:
-                    # Restaura o volume da rádio ao original
-                    self.set_radio_volume(self.original_volume, fade_duration=1.0)
-                else:
-                    # Se estamos no modo mensagem, restauramos o volume da mensagem
-                    if hasattr(self, 'current_sound'):
-                        # Imediatamente restaura o volume para 1.0 (100%)
-                        self.current_sound.set_volume(1.0)
-                        print("Volume da mensagem restaurado para 100% após desativação do microfone")
+                # Com o VOX ligado o microfone continua aberto para a detecção de voz
+                if self.vox_controller is None:
+                    self.microphone_service.stop_microphone()
+                    self.restore_audio(fade_duration=1.0)
                 
                 # Atualiza as flags
                 self.mic_active = False
+                self._notify_state_change()
                 
                 print("Microfone desativado, volume de áudio restaurado")
                 return False
                 
             # Se estiver ativando o microfone
             else:
-                # Salva o estado atual e o modo
-                was_playing = self.is_playing
-                was_radio_mode = self.is_radio_mode
-                
-                # Salva o volume original e reduz o volume para um nível baixo (mas não zero)
-                LOW_VOLUME = 0.05  # 5% do volume para ainda ser audível em segundo plano
-                
-                if self.is_radio_mode:
-                    self.original_volume = self.radio_player.audio_get_volume()
-                    # Baixa o volume da rádio para um nível baixo
-                    self.set_radio_volume(int(self.original_volume * LOW_VOLUME), fade_duration=0.5)
-                else:
-                    # Estamos no modo mensagem
-                    if hasattr(self, 'current_sound'):
-                        # Salvamos o volume original da mensagem (que deve ser 1.0)
-                        self.original_message_volume = 1.0
-                        
-                        # Imediatamente abaixa o volume da mensagem
-                        self.current_sound.set_volume(LOW_VOLUME)
-                        print(f"Volume da mensagem reduzido para {LOW_VOLUME * 100}% devido à ativação do microfone")
+                # Com o VOX ligado o ducking segue a voz
+                if self.vox_controller is None:
+                    self.duck_audio(LOW_VOLUME, fade_duration=0.5)
                 
                 # Ativa o microfone
-                if self.microphone_service.start_microphone():
+                if self.get_microphone_service().start_microphone():
                     self.mic_active = True
-                    # Preservamos o estado de reprodução e o modo atual
-                    self.is_playing = was_playing
-                    self.is_radio_mode = was_radio_mode
+                    self._notify_state_change()
                     print("Microfone ativado, volume de áudio reduzido")
                     return True
                 else:
                     # Se falhar, restaura o áudio original
-                    if self.is_radio_mode:
-                        self.set_radio_volume(self.original_volume, fade_duration=0.5)
-                    else:
-                        # Restaura o volume da mensagem
-                        if hasattr(self, 'current_sound'):
-                            self.current_sound.set_volume(1.0)
+                    self.restore_audio(fade_duration=0.5)
                     print("Falha ao ativar microfone")
                     return False
                     
         except Exception as e:
             print(f"Erro ao alternar microfone: {str(e)}")
             # Em caso de erro, tenta restaurar o estado anterior
-            if hasattr(self, 'is_radio_mode') and not self.is_radio_mode and hasattr(self, 'original_message_volume'):
-                # Tenta restaurar o volume da mensagem
-                if hasattr(self, 'current_sound'):
-                    self.current_sound.set_volume(1.0)
-            elif hasattr(self, 'is_radio_mode') and self.is_radio_mode and hasattr(self, 'original_volume'):
-                # Tenta restaurar o volume da rádio
-                self.set_radio_volume(self.original_volume)
+            self.restore_audio(fade_duration=0)
             return False
     
+    def set_vox_enabled(self, enabled, **settings):
+        """
+        Liga ou desliga o VOX: o microfone fica aberto e a voz abaixa a rádio
+        e as mensagens automaticamente (sem bloquear a reprodução das mensagens).
+        
+        Args:
+            enabled (bool): True para ligar
+            **settings: Parâmetros do VoxController (threshold, attack, hold,
+                release, duck_level)
+            
+        Returns:
+            bool: Novo estado do VOX
+        """
+        try:
+            if enabled:
+                if self.vox_controller is not None:
+                    return True
+                microphone = self.get_microphone_service()
+                if not microphone.start_microphone():
+                    print("Falha ao abrir o microfone para o VOX")
+                    return False
+                self.vox_controller = VoxController(self, **settings)
+                self.vox_controller.start()
+                microphone.add_level_listener(self.vox_controller.process_level)
+                return True
+            
+            if self.vox_controller is not None:
+                self.microphone_service.remove_level_listener(self.vox_controller.process_level)
+                self.vox_controller.stop()
+                self.vox_controller = None
+                if not self.mic_active:
+                    self.microphone_service.stop_microphone()
+            return False
+        
+        except Exception as e:
+            print(f"Erro ao alternar VOX: {str(e)}")
+            return self.vox_controller is not None
+    
     def get_state(self):
         """
         Obtém o estado atual da reprodução de forma amigável.
@@ -632,8 +921,8 @@ class PlayerService:
                 else:
                     return self.PlayerState.STOPPED
             else:
-                # Verifica o estado do Pygame
-                if pygame.mixer.get_busy():
+                # Verifica o estado da saída de mensagens
+                if self._is_message_output_busy():
                     return self.PlayerState.PLAYING
                 else:
                     return self.PlayerState.STOPPED
@@ -661,8 +950,8 @@ class PlayerService:
             # Verificação pelo tempo decorrido
             now = datetime.now()
             
-            # Verifica se o Pygame ainda está reproduzindo
-            is_playing = pygame.mixer.get_busy()
+            # Verifica se a saída de mensagens ainda está reproduzindo
+            is_playing = self._is_message_output_busy()
             
             # Se o Pygame indica que não está tocando, mas a flag message_playing está True
             if not is_playing and self.message_playing:
@@ -695,7 +984,8 @@ class PlayerService:
                 if not hasattr(self, '_fadeout_applied'):
                     self._fadeout_applied = False
                     
-                if not self._fadeout_applied and remaining < 1.0 and is_playing:
+                if (not self._fadeout_applied and remaining < 1.0 and is_playing
+                        and self.message_player is None):
                     print(f"FADEOUT: Aplicando fadeout da mensagem (restam {remaining:.2f}s)")
                     # Fade gradual de 800ms
                     pygame.mixer.fadeout(800)  # fadeout suave de 800ms
@@ -741,8 +1031,8 @@ class PlayerService:
                 return position, duration, percentage
             else:
                 # Para mensagens, calculamos com base no tempo
-                if hasattr(self, 'current_sound') and self.end_time:
-                    duration_ms = int(self.current_sound.get_length() * 1000)
+                if self.message_duration and self.end_time:
+                    duration_ms = int(self.message_duration * 1000)
                     
                     # Calcula a posição com base no tempo
                     if self.message_playing:
@@ -791,7 +1081,9 @@ class PlayerService:
         # Para todas as reproduções
         self.stop()
         
-        # Garante que o microfone está desativado e libera recursos do microfone, se existir
+        # Desliga o VOX e garante que o microfone está desativado
+        if self.vox_controller is not None:
+            self.set_vox_enabled(False)
         if hasattr(self, 'mic_active') and self.mic_active and self.microphone_service is not None:
             self.microphone_service.stop_microphone()
         
@@ -799,6 +1091,10 @@ class PlayerService:
         if hasattr(self, 'microphone_service') and self.microphone_service is not None:
             self.microphone_service.cleanup()
         
-        # Libera recursos do gerenciador de fontes
-        if hasattr(self, 'source_manager'):
-            self.source_manager.cleanup()
\ No newline at end of file
+        # Libera recursos do gerenciador de fontes (compartilhado entre zonas: liberado pelo ZoneManager)
+        if hasattr(self, 'source_manager') and self.shared_resources is None:
+            self.source_manager.cleanup()        
+        # Players VLC da zona (a instância VLC é liberada pelo ZoneManager)
+        if self.shared_resources is not None:
+            self.message_player.release()
+            self.radio_player.release()
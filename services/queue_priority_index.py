@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Índice de prioridade da fila de mensagens.
+Mantém as mensagens ativas em heaps com invalidação preguiçosa, permitindo
+obter a próxima mensagem pronta em O(log n) sem reordenar a fila a cada ciclo.
+"""
+
+import heapq
+import itertools
+
+
+class QueuePriorityIndex:
+    """
+    Índice das mensagens ativas, chaveado por (ativa, prioridade, próximo horário).
+
+    Usa três heaps:
+    - aguardando: mensagens ativas ordenadas por next_play_time
+    - prontas: mensagens cujo horário já chegou, ordenadas por (prioridade, horário)
+    - prioridades: mensagens ativas ordenadas por prioridade
+
+    Cada alteração incrementa a versão da mensagem; entradas com versão antiga
+    ficam no heap e são descartadas quando chegam ao topo (invalidação preguiçosa).
+    """
+
+    # Quando houver mais entradas obsoletas que este fator × entradas válidas,
+    # os heaps são reconstruídos para não crescerem indefinidamente
+    COMPACT_FACTOR = 2
+
+    def __init__(self):
+        """Inicializa o índice vazio."""
+        self._versions = {}  # mensagem ativa -> versão atual
+        self._waiting = []  # (next_play_time, seq, versão, mensagem)
+        self._ready = []  # (prioridade, next_play_time, seq, versão, mensagem)
+        self._by_priority = []  # (prioridade, seq, versão, mensagem)
+        self._counter = itertools.count()
+        self._version_counter = itertools.count(1)
+
+    def __len__(self):
+        """Retorna o número de mensagens ativas no índice."""
+        return len(self._versions)
+
+    def __contains__(self, message):
+        return message in self._versions
+
+    def update(self, message):
+        """
+        Insere ou atualiza uma mensagem ativa no índice.
+        Deve ser chamado sempre que prioridade ou next_play_time mudarem.
+
+        Args:
+            message (MessageQueueItem): Mensagem ativa
+        """
+        version = next(self._version_counter)
+        self._versions[message] = version
+
+        seq = next(self._counter)
+        heapq.heappush(self._waiting, (message.next_play_time, seq, version, message))
+        heapq.heappush(self._by_priority, (message.priority, seq, version, message))
+
+        self._maybe_compact()
+
+    def discard(self, message):
+        """
+        Remove uma mensagem do índice (ficou pendente ou saiu da fila).
+        As entradas antigas são descartadas preguiçosamente.
+
+        Args:
+            message (MessageQueueItem): Mensagem a remover
+        """
+        self._versions.pop(message, None)
+
+    def clear(self):
+        """Remove todas as mensagens do índice."""
+        self._versions.clear()
+        self._waiting.clear()
+        self._ready.clear()
+        self._by_priority.clear()
+
+    def _is_valid(self, message, version):
+        return self._versions.get(message) == version
+
+    def _promote_due(self, now):
+        """Move para o heap de prontas as mensagens cujo horário já chegou."""
+        waiting = self._waiting
+        while waiting and waiting[0][0] <= now:
+            play_time, seq, version, message = heapq.heappop(waiting)
+            if self._is_valid(message, version):
+                heapq.heappush(self._ready, (message.priority, play_time, seq, version, message))
+
+    def peek_due(self, now):
+        """
+        Retorna a mensagem pronta de maior prioridade, sem removê-la.
+
+        Args:
+            now (datetime): Horário de referência
+
+        Returns:
+            MessageQueueItem: Mensagem pronta ou None
+        """
+        self._promote_due(now)
+
+        ready = self._ready
+        while ready:
+            _, _, _, version, message = ready[0]
+            if self._is_valid(message, version):
+                return message
+            heapq.heappop(ready)
+
+        return None
+
+    def pop_due(self, now):
+        """
+        Retira do índice a mensagem pronta de maior prioridade.
+
+        Args:
+            now (datetime): Horário de referência
+
+        Returns:
+            MessageQueueItem: Mensagem pronta ou None
+        """
+        message = self.peek_due(now)
+        if message is not None:
+            heapq.heappop(self._ready)
+            self.discard(message)
+        return message
+
+    def next_due_time(self):
+        """
+        Retorna o horário da próxima mensagem ativa a vencer.
+        Se já existem mensagens vencidas, retorna o horário (passado) de uma delas.
+
+        Returns:
+            datetime: Próximo horário de reprodução ou None se não há ativas
+        """
+        ready = self._ready
+        while ready and not self._is_valid(ready[0][4], ready[0][3]):
+            heapq.heappop(ready)
+
+        waiting = self._waiting
+        while waiting and not self._is_valid(waiting[0][3], waiting[0][2]):
+            heapq.heappop(waiting)
+
+        # Mensagens no heap de prontas já estão vencidas
+        candidates = []
+        if ready:
+            candidates.append(ready[0][1])
+        if waiting:
+            candidates.append(waiting[0][0])
+
+        return min(candidates) if candidates else None
+
+    def min_active_priority(self):
+        """
+        Retorna a maior prioridade (menor número) entre as mensagens ativas.
+
+        Returns:
+            int: Prioridade ou None se não há mensagens ativas
+        """
+        heap = self._by_priority
+        while heap and not self._is_valid(heap[0][3], heap[0][2]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def active_messages(self):
+        """Retorna as mensagens ativas (ordem não definida)."""
+        return list(self._versions)
+
+    def _maybe_compact(self):
+        """Reconstrói os heaps quando as entradas obsoletas dominam."""
+        live = len(self._versions)
+        total = max(len(self._waiting) + len(self._ready), len(self._by_priority))
+        if total <= self.COMPACT_FACTOR * live + 32:
+            return
+
+        self._ready = [entry for entry in self._ready if self._is_valid(entry[4], entry[3])]
+        self._waiting = [entry for entry in self._waiting if self._is_valid(entry[3], entry[2])]
+        self._by_priority = [entry for entry in self._by_priority if self._is_valid(entry[3], entry[2])]
+
+        heapq.heapify(self._ready)
+        heapq.heapify(self._waiting)
+        heapq.heapify(self._by_priority)
@@ -5,11 +5,30 @@ Serviço de gerenciamento da fila de mensagens.
 CORRIGIDO: Agora funciona com o novo sistema de detecção de reinicialização.
 """
 
-import heapq
+import functools
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from models.message_item import MessageQueueItem
+from models.playback_ticket import PlaybackTicket
+from models.queue_snapshot import MessageView, QueueSnapshot
 from services.message_queue_serializer import MessageQueueSerializer
+from services.sqlite_queue_store import SQLiteQueueStore
+from services.queue_priority_index import QueuePriorityIndex
+from services.queue_write_behind import QueueWriteBehind
+from services.daypart_index import DaypartIndex
+from services.scheduler_clock import SchedulerClock
+from services.rotation_engine import create_rotation_policy
+
+
+def _synchronized(method):
+    """Executa o método segurando o lock de escrita da fila (reentrante)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class QueueService:
     """
@@ -17,26 +36,142 @@ class QueueService:
     CORRIGIDO: Sistema de prioridades funciona corretamente com reset confiável.
     """
     
-    def __init__(self, queue_file_path=None):
+    def __init__(self, queue_file_path=None, clock=None, rotation_policy=None,
+                 save_delay=1.0, fsync=False, journal=False, as_run_log=None):
         """
         Inicializa o serviço de fila.
         
         Args:
             queue_file_path (str ou Path, optional): Caminho para o arquivo de persistência
+                (terminado em .db usa o armazenamento SQLite com histórico de reprodução)
+            clock (SchedulerClock, optional): Base de tempo do agendador
+            rotation_policy (str, optional): Política de rotação (padrão: round_robin)
+            save_delay (float): Janela (s) em que alterações são agrupadas em uma gravação
+            fsync (bool): Força fsync a cada gravação do arquivo da fila
+            journal (bool): Persiste cada alteração como um evento anexado ao journal;
+                o arquivo da fila passa a ser apenas a compactação periódica
+            as_run_log (AsRunLog, optional): Log de veiculação (comprovação de exibição)
         """
-        self.message_queue = []  # Lista de mensagens
+        # Base de tempo monotônica reconciliada com o relógio de parede
+        self.clock = clock or SchedulerClock()
+        
+        # Escritas (thread do gerenciador e da interface) são serializadas por este lock;
+        # leitores usam a fotografia imutável publicada a cada alteração, sem lock
+        self._write_lock = threading.RLock()
+        self._version = 0
+        self._snapshot = QueueSnapshot.empty()
+        
+        # Mensagens indexadas por nome de arquivo (dict mantém a ordem de inserção)
+        self._messages = {}
+        # Mesmas mensagens indexadas pelo message_id (usado pelos bilhetes de reprodução)
+        self._by_id = {}
+        # Mesmas mensagens agrupadas por prioridade, na ordem de inserção
+        # (a fotografia é montada nessa ordem, sem reordenar a fila)
+        self._by_priority = {}
         self.currently_playing = None
         
+        # Índice das mensagens ativas: próxima pronta em O(log n)
+        self._index = QueuePriorityIndex()
+        # Política de rotação que escolhe a próxima mensagem após cada término
+        self.rotation = create_rotation_policy(rotation_policy)
+        # Mensagens que ainda não tocaram nenhuma vez
+        self._unplayed = set()
+        # Prioridade e horário da última reprodução (guardados à parte da mensagem:
+        # a âncora do rodízio sobrevive à remoção da mensagem que tocou por último)
+        self._last_played_priority = None
+        self._last_played_at = None
+        self._last_end_time = None
+        
+        # Regras de horário (dayparting) compiladas em índice de intervalos
+        self._dayparts = DaypartIndex()
+        self._eligible_restricted = frozenset()  # mensagens restritas elegíveis agora
+        self._daypart_next_change = None
+        self._dayparts_dirty = False
+        
+        # Log de veiculação: cada reprodução registrada com horários reais
+        self.as_run_log = as_run_log
+        
+        # Callbacks chamados a cada alteração da fila (ex: acordar o MessageQueueManager)
+        self._change_listeners = []
+        
         # Configurar serializador de persistência, se fornecido
         if queue_file_path:
-            self.serializer = MessageQueueSerializer(queue_file_path)
+            if Path(queue_file_path).suffix == '.db':
+                self.serializer = SQLiteQueueStore(queue_file_path, fsync=fsync)
+            else:
+                self.serializer = MessageQueueSerializer(queue_file_path, fsync=fsync, journal=journal)
             # Carrega a fila salva anteriormente
             saved_items = self.serializer.load_queue(MessageQueueItem)
+            if rotation_policy is None and self.serializer.saved_rotation_policy:
+                self.rotation = create_rotation_policy(self.serializer.saved_rotation_policy)
             
             # Processa as mensagens carregadas
             self._process_loaded_messages(saved_items)
+            
+            # Gravação em segundo plano, fora do caminho de transição do agendador
+            self._writer = QueueWriteBehind(self.serializer, self._persistent_state, save_delay)
         else:
             self.serializer = None
+            self._writer = None
+        
+        self._publish_snapshot()
+    
+    @property
+    def snapshot(self):
+        """
+        Última fotografia imutável da fila (leitura sem lock).
+        Compare snapshot.version para saber se algo mudou desde a última leitura.
+        """
+        return self._snapshot
+    
+    def _publish_snapshot(self):
+        """Publica uma nova fotografia da fila (uma vez ao fim de cada alteração)."""
+        self._refresh_dayparts(self.clock.now(), publish=False)
+        items = tuple(
+            MessageView.from_message(message, self._is_eligible(message))
+            for priority in sorted(self._by_priority)
+            for message in self._by_priority[priority].values()
+        )
+        playing = self.currently_playing.filename if self.currently_playing else None
+        self._version += 1
+        # A troca da referência é atômica: leitores veem a fotografia antiga ou a nova
+        self._snapshot = QueueSnapshot(self._version, self.clock.now(), items, playing, self.rotation.name)
+    
+    @property
+    def message_queue(self):
+        """Lista das mensagens da fila, na ordem de inserção (cópia somente leitura)."""
+        return list(self._messages.values())
+    
+    def has_message(self, filename):
+        """Retorna True se o arquivo já está na fila (O(1))."""
+        return filename in self._messages
+    
+    def get_message(self, filename):
+        """Retorna a mensagem da fila com o nome de arquivo informado, ou None."""
+        return self._messages.get(filename)
+    
+    def get_message_by_id(self, message_id):
+        """Retorna a mensagem da fila com o message_id informado, ou None."""
+        return self._by_id.get(message_id)
+    
+    def _resolve(self, ticket):
+        """
+        Localiza a mensagem original a partir de um bilhete (ou de uma mensagem).
+        
+        Args:
+            ticket (PlaybackTicket ou MessageQueueItem): Referência à mensagem
+            
+        Returns:
+            MessageQueueItem: Mensagem da fila ou None se já foi removida
+        """
+        message_id = getattr(ticket, 'message_id', None)
+        if message_id is not None:
+            return self._by_id.get(message_id)
+        
+        msg = self._messages.get(ticket.filename)
+        if msg is not None and msg.priority == ticket.priority:
+            return msg
+        return None
     
     def _process_loaded_messages(self, items):
         """
@@ -53,40 +188,103 @@ class QueueService:
             if key not in unique_items:
                 unique_items[key] = item
         
-        # Adiciona à fila
-        self.message_queue = list(unique_items.values())
-        
-        # Ordena por prioridade
-        self.message_queue.sort(key=lambda x: x.priority)
+        # Adiciona à fila ordenando por prioridade
+        for item in sorted(unique_items.values(), key=lambda x: x.priority):
+            self._messages[item.filename] = item
+            self._track_message(item)
+        self.rotation.seed_history(self._messages.values())
         
         # Mostra o status das mensagens carregadas
         print(f"\n📋 MENSAGENS CARREGADAS:")
-        for msg in self.message_queue:
+        for msg in self._messages.values():
             status = "ATIVA" if not msg.is_pending else "PENDENTE"
             next_time = msg.next_play_time.strftime('%H:%M:%S')
             print(f"   P{msg.priority} - {msg.filename}: {status} (próxima: {next_time})")
     
-    def add_message(self, filename, priority, interval):
+    @_synchronized
+    def add_message(self, filename, priority, interval, daypart_rules=None, slot_minutes=None):
         """
         Adiciona mensagem à fila - VERSÃO CORRIGIDA.
         Não inicia contagem se há mensagem tocando.
+        
+        Args:
+            filename (str): Nome do arquivo
+            priority (int): Prioridade (1 é a mais alta)
+            interval (float): Intervalo em minutos
+            daypart_rules (list, optional): Regras DaypartRule de dias/horários permitidos
+            slot_minutes (int, optional): Se informado, toca em horários fixos a cada
+                N minutos (ex: 15 → :00, :15, :30, :45) em vez de usar o intervalo
+        """
+        changed = []
+        message = self._insert_message(filename, priority, interval, daypart_rules, slot_minutes,
+                                       changed=changed)
+        if message:
+            self._journal('added', items=changed)
+            self._save_queue()
+            self._notify_change()
+        
+        return message
+    
+    @_synchronized
+    def add_messages(self, entries):
+        """
+        Adiciona várias mensagens de uma vez, salvando e notificando uma única vez.
+        
+        Args:
+            entries (iterable): Tuplas (filename, priority, interval), opcionalmente
+                seguidas de daypart_rules e slot_minutes
+            
+        Returns:
+            list: Mensagens adicionadas (duplicatas são ignoradas)
+        """
+        added = []
+        changed = []
+        for entry in entries:
+            message = self._insert_message(*entry, changed=changed)
+            if message:
+                added.append(message)
+        
+        if added:
+            self._journal('added', items=changed)
+            self._save_queue()
+            self._notify_change()
+            print(f"✅ {len(added)} mensagem(ns) adicionada(s) em lote")
+        
+        return added
+    
+    def _insert_message(self, filename, priority, interval, daypart_rules=None, slot_minutes=None,
+                        changed=None):
+        """
+        Cria e insere a mensagem na fila, sem salvar nem notificar.
+        
+        Args:
+            changed (list, optional): Recebe todas as mensagens alteradas (a nova e as
+                desativadas por ela), para o registro no journal
+        
+        Returns:
+            MessageQueueItem: Mensagem criada ou None se já estava na fila
         """
         # Verifica duplicatas
-        for item in self.message_queue:
-            if item.filename == filename:
-                print(f"❌ Mensagem '{filename}' já está na fila.")
-                return None
+        if filename in self._messages:
+            print(f"❌ Mensagem '{filename}' já está na fila.")
+            return None
 
         # Cria mensagem
-        message = MessageQueueItem(filename, priority, interval)
+        message = MessageQueueItem(filename, priority, interval, slot_minutes=slot_minutes)
         message.interval_seconds = int(interval * 60)
+        message.daypart_rules = list(daypart_rules or [])
         
         print(f"\n📌 NOVA MENSAGEM ADICIONADA:")
         print(f"   Arquivo: {filename}")
         print(f"   Prioridade: {priority}")
-        print(f"   Intervalo: {message.interval_seconds} segundos")
+        if message.slot_minutes:
+            print(f"   Horário fixo: a cada {message.slot_minutes} min")
+        else:
+            print(f"   Intervalo: {message.interval_seconds} segundos")
+        if message.daypart_rules:
+            print(f"   Horários: {'; '.join(rule.describe() for rule in message.daypart_rules)}")
         
-        now = datetime.now()
+        now = self.clock.now()
         
         # Verifica se há mensagem tocando atualmente
         is_message_playing = False
@@ -95,11 +293,11 @@ class QueueService:
             print(f"   ⚠️ Mensagem '{self.currently_playing.filename}' está tocando agora")
         
         # Verifica se já existe mensagem ativa
-        active_messages = [m for m in self.message_queue if not m.is_pending]
+        has_active_messages = len(self._index) > 0
         
-        if not active_messages and not is_message_playing:
+        if not has_active_messages and not is_message_playing:
             # Se não há mensagens ativas E não está tocando nada, esta fica ativa
-            message.next_play_time = now + timedelta(seconds=message.interval_seconds)
+            message.next_play_time = message.compute_next_play_time(now)
             message.is_pending = False
             print(f"   ✅ ATIVA - tocará às {message.next_play_time.strftime('%H:%M:%S')}")
         else:
@@ -112,18 +310,20 @@ class QueueService:
             else:
                 # Lógica original para quando não está tocando
                 # Verifica se esta mensagem tem prioridade maior que as ativas
-                min_active_priority = min(msg.priority for msg in active_messages)
+                min_active_priority = self._index.min_active_priority()
                 
                 if priority < min_active_priority:
                     # Esta mensagem tem prioridade maior - desativa as outras
                     print(f"   🔄 PRIORIDADE MAIOR - desativando mensagens de menor prioridade")
-                    for msg in self.message_queue:
-                        if not msg.is_pending:
-                            msg.is_pending = True
-                            print(f"      P{msg.priority} - {msg.filename} → PENDENTE")
+                    for msg in self._index.active_messages():
+                        msg.is_pending = True
+                        self._index.discard(msg)
+                        if changed is not None and msg not in changed:
+                            changed.append(msg)
+                        print(f"      P{msg.priority} - {msg.filename} → PENDENTE")
                     
                     # Ativa esta mensagem
-                    message.next_play_time = now + timedelta(seconds=message.interval_seconds)
+                    message.next_play_time = message.compute_next_play_time(now)
                     message.is_pending = False
                     print(f"   ✅ ATIVA - tocará às {message.next_play_time.strftime('%H:%M:%S')}")
                 else:
@@ -132,204 +332,546 @@ class QueueService:
                     print(f"   ⏸️ PENDENTE - aguardará sua vez")
         
         # Adiciona à fila
-        self.message_queue.append(message)
-        self._save_queue()
+        self._messages[filename] = message
+        self._track_message(message)
+        if changed is not None:
+            changed.append(message)
         
         return message
     
-    def register_message_start(self, message):
+    @_synchronized
+    def register_message_start(self, ticket):
         """
         NOVO MÉTODO: Registra o início de uma mensagem.
+        
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem que começou a tocar
+        """
+        self.currently_playing = ticket
+        if self.as_run_log:
+            self.as_run_log.record_start(ticket, self.clock.now())
+        # Só o ID: numa queda durante a reprodução, a mensagem volta a tocar na recuperação
+        scheduled_time = getattr(ticket, 'scheduled_time', None)
+        self._journal('started', message_id=ticket.message_id, filename=ticket.filename,
+                      priority=ticket.priority,
+                      scheduled_time=scheduled_time.isoformat() if scheduled_time else None)
+        self._publish_snapshot()
+        print(f"🎵 Registrado início de: {ticket.filename}")
+    
+    def register_message_on_air(self, ticket, expected_duration=None):
+        """
+        Registra que o áudio da mensagem começou (após o fade da rádio).
+        
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem
+            expected_duration (float, optional): Duração do arquivo em segundos
         """
-        self.currently_playing = message
-        print(f"🎵 Registrado início de: {message.filename}")
+        if self.as_run_log:
+            self.as_run_log.record_on_air(ticket, self.clock.now(), expected_duration)
     
-    def register_message_end(self, message, fade_end_time=None):
+    @_synchronized
+    def register_message_failure(self, ticket):
+        """
+        Registra que o player não conseguiu iniciar a mensagem.
+        A mensagem continua pendente, como antes, e fica marcada no log de veiculação.
+        
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem
+        """
+        self.currently_playing = None
+        if self.as_run_log:
+            self.as_run_log.record_end(ticket, self.clock.now(), failed=True)
+        # Fecha o registro aberto por 'started' (no SQLite, fora da contagem de reproduções)
+        self._journal('failed', message_id=ticket.message_id)
+        self._publish_snapshot()
+    
+    @_synchronized
+    def register_message_end(self, ticket, fade_end_time=None):
         """
         Registra término de mensagem - VERSÃO CORRIGIDA.
+        O estado é atualizado na mensagem original localizada pelo message_id.
+        
+        Args:
+            ticket (PlaybackTicket): Bilhete da mensagem que terminou
+            fade_end_time (datetime, optional): Término incluindo o fade
         """
         # Usa o tempo final com fade como referência
-        end_time = fade_end_time if fade_end_time else datetime.now()
+        end_time = fade_end_time if fade_end_time else self.clock.now()
+        
+        if self.as_run_log:
+            self.as_run_log.record_end(ticket, self.clock.now())
         
         print(f"\n{'='*60}")
         print(f"⏹️ TÉRMINO DE MENSAGEM")
         print(f"{'='*60}")
-        print(f"Arquivo: '{message.filename}'")
-        print(f"Prioridade: {message.priority}")
-        print(f"Intervalo: {getattr(message, 'interval_seconds', 'NÃO DEFINIDO')} segundos")
+        print(f"Arquivo: '{ticket.filename}'")
+        print(f"Prioridade: {ticket.priority}")
+        print(f"Intervalo: {getattr(ticket, 'interval_seconds', 'NÃO DEFINIDO')} segundos")
         print(f"Tempo de referência (com fade): {end_time.strftime('%H:%M:%S')}")
         
+        # Mensagens alteradas neste término (registradas no journal)
+        changed = []
+        
         # Atualiza a mensagem na fila
-        for msg in self.message_queue:
-            if msg.filename == message.filename and msg.priority == message.priority:
-                msg.last_played = end_time
-                msg.is_pending = True
-                msg.end_time = end_time
-                
-                # Calcula o próximo horário baseado no término + intervalo
-                msg.next_play_time = end_time + timedelta(seconds=msg.interval_seconds)
-                print(f"✅ Reagendada para: {msg.next_play_time.strftime('%H:%M:%S')}")
-                break
+        msg = self._resolve(ticket)
+        if msg is not None:
+            changed.append(msg)
+            msg.last_played = end_time
+            msg.is_pending = True
+            msg.end_time = end_time
+            
+            # Calcula o próximo horário baseado no término (intervalo ou slot fixo)
+            msg.next_play_time = msg.compute_next_play_time(end_time)
+            self._index.discard(msg)
+            self._unplayed.discard(msg)
+            self.rotation.on_played(msg)
+            self._last_played_priority = msg.priority
+            self._last_played_at = end_time
+            if self._last_end_time is None or end_time > self._last_end_time:
+                self._last_end_time = end_time
+            print(f"✅ Reagendada para: {msg.next_play_time.strftime('%H:%M:%S')}")
         
         # Limpa a referência de mensagem tocando
         self.currently_playing = None
         
         # Atualiza horários de mensagens pendentes que foram adicionadas durante reprodução
-        for msg in self.message_queue:
-            if msg.is_pending and msg.next_play_time <= datetime.now():
+        now = self.clock.now()
+        for msg in self._unplayed:
+            if msg.is_pending and msg.next_play_time <= now:
                 # Esta mensagem foi adicionada enquanto outra tocava
                 # Recalcula seu horário baseado no término da atual
                 if not hasattr(msg, 'last_played') or msg.last_played is None:
                     # Nunca tocou - agenda baseado no término atual
-                    msg.next_play_time = end_time + timedelta(seconds=msg.interval_seconds)
+                    msg.next_play_time = msg.compute_next_play_time(end_time)
+                    changed.append(msg)
                     print(f"   📅 Reagendando pendente: P{msg.priority} - {msg.filename} para {msg.next_play_time.strftime('%H:%M:%S')}")
         
         # Ativa a próxima mensagem na sequência
-        self._activate_next_priority_message()
+        activated = self._activate_next_priority_message()
+        if activated is not None and activated not in changed:
+            changed.append(activated)
         
+        self._journal('ended', items=changed, message_id=ticket.message_id)
         self._save_queue()
-        
-        if hasattr(self, 'update_callback'):
-            self.update_callback()
+        self._notify_change()
         
         print(f"{'='*60}\n")
 
-    def _activate_next_priority_message(self):
+    @property
+    def rotation_policy(self):
+        """Nome da política de rotação em uso."""
+        return self.rotation.name
+    
+    @_synchronized
+    def set_rotation_policy(self, name):
         """
-        Ativa a próxima mensagem na sequência: P1 → P2 → P3... → P1
+        Troca a política de rotação, reconstruindo seu estado a partir da fila
+        (incluindo o histórico de reproduções, para não repetir as recentes).
+        
+        Args:
+            name (str): Nome da política (ver services.rotation_engine)
         """
-        print("\n🔍 ATIVANDO PRÓXIMA MENSAGEM NA SEQUÊNCIA:")
+        self.rotation = create_rotation_policy(name)
+        for message in self._messages.values():
+            self.rotation.add(message)
+        self.rotation.seed_history(self._messages.values())
+        print(f"🔀 Política de rotação: {self.rotation.description}")
+        self._journal('policy', rotation_policy=self.rotation.name)
+        self._save_queue()
+        self._notify_change()
+    
+    @_synchronized
+    def activate_next_message(self):
+        """
+        Ativa a próxima mensagem da rotação (ex: reinício do ciclo quando
+        todas as mensagens já tocaram), registrando a alteração.
         
-        now = datetime.now()
+        Returns:
+            MessageQueueItem: Mensagem ativada ou None
+        """
+        message = self._activate_next_priority_message()
+        if message is not None:
+            self._journal('activated', items=[message])
+            self._save_queue()
+            self._publish_snapshot()
+        return message
+    
+    @_synchronized
+    def _activate_next_priority_message(self):
+        """
+        Ativa a próxima mensagem escolhida pela política de rotação
+        (padrão: P1 → P2 → P3... → P1, alternando dentro de cada prioridade).
         
-        # Ordena todas as mensagens por prioridade
-        all_messages = sorted(self.message_queue, key=lambda x: x.priority)
+        Returns:
+            MessageQueueItem: Mensagem ativada ou None
+        """
+        print("\n🔍 ATIVANDO PRÓXIMA MENSAGEM NA SEQUÊNCIA:")
         
-        # Encontra a última mensagem tocada
-        last_played = None
-        for msg in self.message_queue:
-            if hasattr(msg, 'last_played') and msg.last_played:
-                if not last_played or msg.last_played > last_played.last_played:
-                    last_played = msg
+        now = self.clock.now()
         
-        # Se não há histórico ou a última foi P1, tenta P2
-        if not last_played or last_played.priority == 1:
-            next_priority = 2
-        else:
-            # Próxima prioridade na sequência
-            next_priority = last_played.priority + 1
-        
-        # Procura mensagem com a próxima prioridade
-        next_message = None
-        for msg in all_messages:
-            if msg.priority == next_priority:
-                next_message = msg
-                break
-        
-        # Se não encontrou, volta para P1
-        if not next_message:
-            # Reinicia ciclo a partir da prioridade mais alta
-            for msg in all_messages:
-                if msg.priority == 1:
-                    next_message = msg
-                    break
+        # Escolhe a próxima mensagem dentro do horário permitido, a partir da
+        # prioridade tocada por último (mantida incrementalmente em register_message_end)
+        self._refresh_dayparts(now)
+        next_message = self.rotation.select(self._last_played_priority, self._is_eligible)
 
         if next_message:
             next_message.is_pending = False
 
-            # Verifica a última mensagem que tocou (completamente)
-            last_end_time = None
-            for msg in self.message_queue:
-                if msg.end_time:
-                    if not last_end_time or msg.end_time > last_end_time:
-                        last_end_time = msg.end_time
-
-            # Se houver término anterior, agenda a próxima a partir dele + intervalo
-            if last_end_time:
-                next_message.next_play_time = last_end_time + timedelta(seconds=next_message.interval_seconds)
+            # Se houver término anterior, agenda a próxima a partir dele (intervalo ou slot fixo)
+            if self._last_end_time:
+                next_message.next_play_time = next_message.compute_next_play_time(self._last_end_time)
             else:
                 # Nunca tocou nada, pode tocar agora
                 next_message.next_play_time = now
 
+            self._sync_index(next_message)
+
             print(f"   ✅ ATIVADA: P{next_message.priority} - {next_message.filename}")
             print(f"   📅 Tocará às: {next_message.next_play_time.strftime('%H:%M:%S')}")
+        
+        return next_message
     
-    def get_next_message(self):
+    def _is_eligible(self, message):
+        """Verifica pelo índice compilado se a mensagem pode tocar no horário atual."""
+        if not self._dayparts.is_restricted(message.message_id):
+            return True
+        if self._dayparts_dirty:
+            # Regras alteradas nesta operação e ainda não compiladas: avalia só as da mensagem
+            return self._dayparts.allows(message.message_id, self.clock.now())
+        return message.message_id in self._eligible_restricted
+    
+    @_synchronized
+    def is_message_eligible(self, message):
         """
-        Obtém a próxima mensagem a ser reproduzida (apenas mensagens ativas).
+        Verifica se a mensagem está dentro dos dias/horários permitidos agora.
+        
+        Args:
+            message: Mensagem da fila (ou bilhete com message_id)
+            
+        Returns:
+            bool: True se pode tocar agora
         """
-        if not self.message_queue:
-            return None
+        self._refresh_dayparts(self.clock.now())
+        return self._is_eligible(message)
+    
+    def _sync_index(self, message):
+        """Mantém a mensagem no índice de prioridade somente se ativa e elegível."""
+        if not message.is_pending and self._is_eligible(message):
+            self._index.update(message)
+        else:
+            self._index.discard(message)
+    
+    def _refresh_dayparts(self, now, publish=True):
+        """
+        Atualiza a elegibilidade das mensagens restritas quando uma fronteira
+        de horário é cruzada (ou quando as regras mudaram).
+        Apenas as mensagens cuja elegibilidade mudou são reindexadas.
         
-        current_time = datetime.now()
+        Args:
+            now (datetime): Horário de referência
+            publish (bool): Publica a fotografia se a fronteira mudou a elegibilidade
+                (False quando chamado pela própria publicação)
+        """
+        if not self._dayparts_dirty:
+            if self._daypart_next_change is None or now < self._daypart_next_change:
+                return
+        
+        rules_changed = self._dayparts_dirty
+        eligible = self._dayparts.eligible_at(now)
+        if rules_changed:
+            changed = self._dayparts.restricted_ids()
+        else:
+            changed = eligible ^ self._eligible_restricted
         
-        # Filtra apenas mensagens ativas (não pendentes)
-        active_messages = [msg for msg in self.message_queue if not msg.is_pending]
+        self._eligible_restricted = eligible
+        self._daypart_next_change = self._dayparts.next_change(now)
+        self._dayparts_dirty = False
         
-        if not active_messages:
-            return None
+        for message_id in changed:
+            message = self._by_id.get(message_id)
+            if message is not None:
+                self._sync_index(message)
         
-        # Verifica quais estão prontas para tocar
-        ready_messages = [msg for msg in active_messages if msg.next_play_time <= current_time]
+        # Fronteira de horário cruzada: a elegibilidade mudou sem alteração na fila
+        if changed and not rules_changed and publish:
+            self._publish_snapshot()
+    
+    def _track_message(self, message):
+        """Registra uma mensagem nos índices auxiliares da fila."""
+        self._by_id[message.message_id] = message
+        self._by_priority.setdefault(message.priority, {})[message.message_id] = message
+        if message.daypart_rules:
+            # Só marca o índice: a recompilação acontece uma vez por operação
+            # (ao publicar a fotografia), não a cada mensagem de um lote
+            self._dayparts.set_rules(message.message_id, message.daypart_rules)
+            self._dayparts_dirty = True
+        self.rotation.add(message)
+        if message.last_played is None:
+            self._unplayed.add(message)
+        if message.end_time and (self._last_end_time is None or message.end_time > self._last_end_time):
+            self._last_end_time = message.end_time
+        if message.last_played and (self._last_played_at is None
+                                    or message.last_played > self._last_played_at):
+            self._last_played_priority = message.priority
+            self._last_played_at = message.last_played
+        self._sync_index(message)
+    
+    def _untrack_message(self, message):
+        """Remove uma mensagem dos índices auxiliares da fila."""
+        self._by_id.pop(message.message_id, None)
+        level = self._by_priority.get(message.priority)
+        if level is not None:
+            level.pop(message.message_id, None)
+            if not level:
+                del self._by_priority[message.priority]
+        if self._dayparts.is_restricted(message.message_id):
+            self._dayparts.remove(message.message_id)
+            self._dayparts_dirty = True
+        self._index.discard(message)
+        self._unplayed.discard(message)
+        self.rotation.remove(message)
+    
+    @_synchronized
+    def pop_next_due_message(self, now=None):
+        """
+        Retira a próxima mensagem pronta (ativa e com horário vencido),
+        marcando-a como pendente enquanto toca.
+        
+        Args:
+            now (datetime, optional): Horário de referência
+            
+        Returns:
+            MessageQueueItem: Mensagem original da fila ou None
+        """
+        now = now or self.clock.now()
+        self._refresh_dayparts(now)
+        message = self._index.pop_due(now)
+        if message is not None:
+            message.is_pending = True
+        return message
+    
+    @_synchronized
+    def peek_next_due_message(self, now=None):
+        """
+        Retorna a próxima mensagem pronta sem retirá-la do índice.
         
-        if not ready_messages:
+        Args:
+            now (datetime, optional): Horário de referência
+            
+        Returns:
+            MessageQueueItem: Mensagem pronta ou None
+        """
+        now = now or self.clock.now()
+        self._refresh_dayparts(now)
+        return self._index.peek_due(now)
+    
+    @_synchronized
+    def issue_next_ticket(self, now=None):
+        """
+        Retira a próxima mensagem pronta e emite seu bilhete de reprodução.
+        
+        Args:
+            now (datetime, optional): Horário de referência
+            
+        Returns:
+            PlaybackTicket: Bilhete imutável ou None se nada está pronto
+        """
+        now = now or self.clock.now()
+        message = self.pop_next_due_message(now)
+        if message is None:
             return None
+        return PlaybackTicket.from_message(message, now)
+    
+    @_synchronized
+    def get_next_due_time(self):
+        """
+        Retorna o horário do próximo evento de agendamento, sem varrer a fila:
+        a próxima mensagem ativa ou a próxima mudança de horário permitido.
         
-        # Ordena por prioridade (menor número = maior prioridade)
-        ready_messages.sort(key=lambda x: (x.priority, x.next_play_time))
-        selected_message = ready_messages[0]
+        Returns:
+            datetime: Próximo horário ou None se não há mensagens ativas
+        """
+        self._refresh_dayparts(self.clock.now())
+        candidates = [t for t in (self._index.next_due_time(), self._daypart_next_change) if t]
+        return min(candidates) if candidates else None
+
+    @_synchronized
+    def apply_clock_jump(self, delta_seconds):
+        """
+        Reajusta os agendamentos após um salto do relógio de parede
+        (horário de verão, correção do NTP, alteração manual).
+
+        - Modo intervalo: os horários são deslocados pelo salto, preservando
+          o tempo de espera que restava
+        - Modo fixo: o próximo slot é recalculado no novo horário de parede
+
+        Args:
+            delta_seconds (float): Tamanho do salto (positivo = relógio adiantou)
+        """
+        if not delta_seconds:
+            return
+
+        delta = timedelta(seconds=delta_seconds)
+        now = self.clock.now()
+
+        for msg in self._messages.values():
+            if msg.slot_minutes and not msg.is_pending:
+                msg.next_play_time = msg.next_slot_after(now)
+            else:
+                msg.next_play_time += delta
+            if msg.end_time:
+                msg.end_time += delta
+            if msg.last_played:
+                msg.last_played += delta
+
+        if self._last_end_time:
+            self._last_end_time += delta
+        if self._last_played_at:
+            self._last_played_at += delta
+
+        # Reconstrói os índices no novo referencial
+        self._index.clear()
+        self._dayparts_dirty = True
+        for msg in self._messages.values():
+            self._sync_index(msg)
+        self._refresh_dayparts(now)
+
+        print(f"🕐 Agendamentos reajustados após salto de {delta_seconds:+.1f}s")
+        self._journal('rescheduled', items=list(self._messages.values()))
+        self._save_queue()
+        self._notify_change()
+
+    def all_messages_played(self):
+        """Retorna True se todas as mensagens da fila já tocaram ao menos uma vez."""
+        return not self._unplayed
+    
+    @_synchronized
+    def get_next_message(self):
+        """
+        Obtém a próxima mensagem a ser reproduzida (apenas mensagens ativas).
         
-        # Marca como pendente enquanto toca
-        for msg in self.message_queue:
-            if msg.filename == selected_message.filename and msg.priority == selected_message.priority:
-                msg.is_pending = True
-                break
+        Returns:
+            PlaybackTicket: Bilhete de reprodução ou None
+        """
+        if not self._messages:
+            return None
+        
+        # Próxima mensagem pronta pelo índice: (prioridade, horário) em O(log n)
+        ticket = self.issue_next_ticket(self.clock.now())
         
-        # Cria cópia para reprodução
-        import copy
-        message_copy = copy.deepcopy(selected_message)
-        if hasattr(selected_message, 'interval_seconds'):
-            message_copy.interval_seconds = selected_message.interval_seconds
+        if not ticket:
+            return None
         
-        print(f"🎵 SELECIONADA: P{message_copy.priority} - {message_copy.filename}")
-        return message_copy
+        print(f"🎵 SELECIONADA: P{ticket.priority} - {ticket.filename}")
+        return ticket
     
+    @_synchronized
     def remove_message(self, filename):
         """Remove uma mensagem específica da fila."""
-        for index, item in enumerate(self.message_queue):
-            if item.filename == filename:
-                del self.message_queue[index]
-                self._save_queue()
-                print(f"✅ Mensagem '{filename}' removida da fila")
-                return True
-        return False
+        item = self._messages.pop(filename, None)
+        if item is None:
+            return False
+        
+        self._untrack_message(item)
+        self._journal('removed', removed_ids=[item.message_id])
+        self._save_queue()
+        self._notify_change()
+        print(f"✅ Mensagem '{filename}' removida da fila")
+        return True
+    
+    @_synchronized
+    def remove_messages(self, filenames):
+        """
+        Remove várias mensagens de uma vez, salvando e notificando uma única vez.
+        
+        Args:
+            filenames (iterable): Nomes de arquivo a remover
+            
+        Returns:
+            int: Quantidade de mensagens removidas
+        """
+        removed_ids = []
+        for filename in filenames:
+            item = self._messages.pop(filename, None)
+            if item is not None:
+                self._untrack_message(item)
+                removed_ids.append(item.message_id)
+        
+        removed = len(removed_ids)
+        if removed:
+            self._journal('removed', removed_ids=removed_ids)
+            self._save_queue()
+            self._notify_change()
+            print(f"✅ {removed} mensagem(ns) removida(s) da fila")
+        
+        return removed
     
+    @_synchronized
     def clear_queue(self):
         """Limpa toda a fila de mensagens."""
-        self.message_queue = []
+        self._messages.clear()
+        self._by_id.clear()
+        self._by_priority.clear()
         self.currently_playing = None
-        
-        if self.serializer:
+        self._index.clear()
+        self.rotation = create_rotation_policy(self.rotation.name)
+        self._unplayed.clear()
+        self._last_played_priority = None
+        self._last_played_at = None
+        self._last_end_time = None
+        self._dayparts.clear()
+        self._eligible_restricted = frozenset()
+        self._daypart_next_change = None
+        self._dayparts_dirty = False
+        
+        if self.serializer and self.serializer.journal:
+            self._journal('cleared')
+        elif self.serializer:
             self.serializer.save_queue([])
         
+        self._notify_change()
         print("✅ Fila completamente limpa")
     
+    def add_change_listener(self, callback):
+        """
+        Registra um callback chamado sempre que a fila for alterada.
+        
+        Args:
+            callback (callable): Função sem argumentos
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback):
+        """Remove um callback registrado com add_change_listener."""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change(self):
+        """Publica a nova fotografia e avisa os interessados que a fila mudou."""
+        self._publish_snapshot()
+        for callback in list(self._change_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠ Erro no callback de alteração da fila: {e}")
+    
     def debug_queue_state(self):
         """Mostra o estado atual da fila para debug."""
-        if not self.message_queue:
+        if not self._messages:
             print("📭 Fila vazia")
             return
         
-        print(f"\n📋 ESTADO DA FILA ({datetime.now().strftime('%H:%M:%S')}):")
+        print(f"\n📋 ESTADO DA FILA ({self.clock.now().strftime('%H:%M:%S')}):")
         
         # Separa mensagens por estado
-        active_messages = [msg for msg in self.message_queue if not msg.is_pending]
-        pending_messages = [msg for msg in self.message_queue if msg.is_pending]
+        active_messages = [msg for msg in self._messages.values() if not msg.is_pending]
+        pending_messages = [msg for msg in self._messages.values() if msg.is_pending]
         
         if active_messages:
             print("🟢 MENSAGENS ATIVAS:")
             for msg in sorted(active_messages, key=lambda x: x.priority):
-                remaining = (msg.next_play_time - datetime.now()).total_seconds()
+                remaining = (msg.next_play_time - self.clock.now()).total_seconds()
                 status = "PRONTA!" if remaining <= 0 else f"em {int(remaining)}s"
                 print(f"   P{msg.priority} - {msg.filename}: {status}")
         
@@ -341,16 +883,57 @@ class QueueService:
         print()
     
     def get_queue_items(self):
-        """Retorna todos os itens da fila ordenados por prioridade."""
-        return sorted(self.message_queue, key=lambda x: x.priority)
+        """Retorna as visões imutáveis da fila ordenadas por prioridade (da última fotografia)."""
+        return self._snapshot.items
     
     def get_queue_length(self):
         """Retorna o número de mensagens na fila."""
-        return len(self.message_queue)
+        return len(self._messages)
+    
+    def _persistent_state(self):
+        """
+        Estado a gravar, lido pela thread de gravação.
+        O lock garante que a alteração em andamento já publicou sua fotografia
+        (e que o número do último evento do journal corresponde a ela).
+        
+        Returns:
+            dict: Argumentos de MessageQueueSerializer.save_queue
+        """
+        with self._write_lock:
+            snapshot = self._snapshot
+            journal_seq = self.serializer.journal_seq
+        return {
+            'queue_items': snapshot.items,
+            'rotation_policy': snapshot.rotation_policy,
+            'journal_seq': journal_seq,
+            'version': snapshot.version,
+        }
+    
+    def _journal(self, event, items=(), removed_ids=(), **extra):
+        """
+        Registra uma alteração no journal (apenas no modo journal) e agenda
+        a compactação quando o journal cresceu o suficiente.
+        """
+        if not self.serializer or not self.serializer.journal:
+            return
+        
+        try:
+            needs_compaction = self.serializer.append_event(event, items, removed_ids, **extra)
+        except Exception as e:
+            print(f"❌ Erro ao gravar evento no journal: {str(e)}")
+            # Sem o journal, garante ao menos a gravação completa
+            self._writer.schedule()
+            return
+        
+        if needs_compaction:
+            self._writer.schedule()
     
     def _save_queue(self, is_shutdown=False):
         """
-        Salva a fila no arquivo de persistência.
+        Agenda a gravação da fila (agrupada em segundo plano).
+        No modo journal a alteração já foi registrada como evento e a gravação
+        completa (compactação) é agendada por _journal.
+        No encerramento grava imediatamente e para o gravador.
         
         Args:
             is_shutdown (bool): True se está salvando por causa do encerramento
@@ -358,12 +941,19 @@ class QueueService:
         if not self.serializer:
             return False
         
-        return self.serializer.save_queue(self.message_queue, is_shutdown)
+        if is_shutdown:
+            self._writer.stop(flush=False)
+            self._writer.flush(is_shutdown=True)
+        elif not self.serializer.journal:
+            self._writer.schedule()
+        return True
     
     def shutdown_save(self):
         """
         Salva a fila marcando como save de encerramento.
         Garante que na próxima inicialização os intervalos sejam resetados.
+        Não segura o lock da fila: a gravação lê o estado com ele, e a thread de
+        gravação (que pode estar esperando esse lock) é aguardada aqui.
         """
         print("💾 Salvando estado final com flag de encerramento...")
         return self._save_queue(is_shutdown=True)
@@ -371,5 +961,9 @@ class QueueService:
     def cleanup(self):
         """Limpa recursos do serviço."""
         print("🧹 Limpando recursos do QueueService")
+        if self._writer is not None:
+            self._writer.stop(flush=True)
         if hasattr(self, 'serializer') and self.serializer:
-            self.serializer.cleanup()
\ No newline at end of file
+            self.serializer.cleanup()
+        if self.as_run_log:
+            self.as_run_log.close()
\ No newline at end of file
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Interface comum dos armazenamentos da fila de mensagens.
+O QueueService e o gravador em segundo plano usam apenas esta interface, de
+modo que o arquivo JSON (MessageQueueSerializer) e o banco SQLite
+(SQLiteQueueStore) são intercambiáveis.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+from models.daypart_rule import DaypartRule
+
+
+class QueueStore:
+    """
+    Interface comum dos armazenamentos da fila.
+
+    Atributos usados pelo QueueService:
+        queue_file_path (Path): Arquivo (ou banco) da fila
+        journal (bool): True se cada alteração é gravada como evento (append_event)
+        journal_seq (int): Número do último evento gravado
+        saved_rotation_policy (str): Política de rotação lida no carregamento
+    """
+
+    def __init__(self, queue_file_path, fsync=False, journal=False):
+        """
+        Inicializa o estado comum dos armazenamentos.
+
+        Args:
+            queue_file_path (str ou Path): Caminho do arquivo (ou banco) da fila
+            fsync (bool): Força a gravação em disco a cada alteração
+            journal (bool): Grava cada alteração como um evento
+        """
+        self.queue_file_path = Path(queue_file_path)
+        self.fsync = fsync
+        self.journal = journal
+        self.journal_seq = 0  # número do último evento gravado
+        # Política de rotação lida do armazenamento (None se não salva)
+        self.saved_rotation_policy = None
+
+    def load_queue(self, message_queue_class):
+        """
+        Carrega a fila.
+
+        Args:
+            message_queue_class: Classe das mensagens (MessageQueueItem)
+
+        Returns:
+            list: Mensagens carregadas
+        """
+        raise NotImplementedError
+
+    def save_queue(self, queue_items, is_shutdown=False, rotation_policy=None, journal_seq=None):
+        """
+        Grava a fila inteira (no modo de eventos, é a compactação).
+
+        Args:
+            queue_items: Lista de itens da fila
+            is_shutdown (bool): True se está salvando por causa do encerramento
+            rotation_policy (str, optional): Política de rotação em uso
+            journal_seq (int, optional): Último evento refletido em queue_items
+        """
+        raise NotImplementedError
+
+    def append_event(self, event, items=(), removed_ids=(), **extra):
+        """
+        Grava uma alteração da fila como evento (apenas quando journal é True).
+
+        Eventos: added, removed, activated, rescheduled, policy, started,
+        ended, failed e cleared.
+
+        Args:
+            event (str): Tipo do evento
+            items (iterable): Mensagens cujo estado deve ser regravado
+            removed_ids (iterable): IDs das mensagens removidas
+            **extra: Campos adicionais do evento (ex: message_id, rotation_policy)
+
+        Returns:
+            bool: True se a fila inteira deve ser regravada (compactação)
+        """
+        raise NotImplementedError
+
+    def cleanup(self):
+        """Libera os recursos do armazenamento."""
+        raise NotImplementedError
+
+    def _serialize_item(self, item):
+        """
+        Converte uma mensagem (ou sua visão imutável) em dicionário.
+        
+        Args:
+            item: MessageQueueItem ou MessageView
+            
+        Returns:
+            dict: Dados serializáveis da mensagem
+        """
+        # SEMPRE inclui interval_seconds
+        interval_sec = getattr(item, 'interval_seconds', None)
+        if interval_sec is None:
+            interval_sec = int(item.interval * 60)
+        
+        serializable_item = {
+            'id': getattr(item, 'message_id', None),
+            'filename': item.filename,
+            'priority': item.priority,
+            'interval': item.interval,
+            'interval_seconds': interval_sec,
+            'next_play_time': item.next_play_time.isoformat(),
+            'is_pending': getattr(item, 'is_pending', False)
+        }
+        
+        if hasattr(item, 'end_time') and item.end_time:
+            serializable_item['end_time'] = item.end_time.isoformat()
+        
+        if hasattr(item, 'last_played') and item.last_played:
+            serializable_item['last_played'] = item.last_played.isoformat()
+        
+        rules = getattr(item, 'daypart_rules', None)
+        if rules:
+            serializable_item['daypart_rules'] = [rule.to_dict() for rule in rules]
+        
+        slot_minutes = getattr(item, 'slot_minutes', None)
+        if slot_minutes:
+            serializable_item['slot_minutes'] = slot_minutes
+        
+        return serializable_item
+
+    def _build_items(self, message_queue_class, serialized_items, is_restart, now):
+        """
+        Cria as mensagens a partir dos dados serializados.
+        
+        Args:
+            message_queue_class: Classe das mensagens (MessageQueueItem)
+            serialized_items (list): Dados serializados
+            is_restart (bool): Reseta os horários (programa reiniciado)
+            now (datetime): Horário de referência para o reset
+            
+        Returns:
+            list: Mensagens criadas
+        """
+        queue_items = []
+        
+        for item_data in serialized_items:
+            item = message_queue_class(
+                item_data['filename'],
+                item_data['priority'],
+                item_data['interval'],
+                message_id=item_data.get('id'),
+                slot_minutes=item_data.get('slot_minutes')
+            )
+
+            # Restaura interval_seconds
+            item.interval_seconds = item_data.get('interval_seconds', int(item.interval * 60))
+
+            # Restaura regras de horário (dayparting)
+            item.daypart_rules = [DaypartRule.from_dict(rule) for rule in item_data.get('daypart_rules', [])]
+
+            if is_restart:
+                # RESETAR TUDO: Programa foi reiniciado
+                print(f"🔄 RESET: P{item.priority} - {item.filename}")
+
+                # Reset completo dos tempos
+                item.next_play_time = item.compute_next_play_time(now)
+                item.is_pending = item.priority > 1  # Só P1 fica ativa
+                item.last_played = None
+                item.end_time = None
+
+                print(f"   ⏰ Novo agendamento: {item.next_play_time.strftime('%H:%M:%S')}")
+                print(f"   📊 Status: {'ATIVA' if not item.is_pending else 'PENDENTE'}")
+
+            else:
+                # MANTER ESTADO: Carregamento durante execução
+                item.next_play_time = datetime.fromisoformat(item_data['next_play_time'])
+                item.is_pending = item_data.get('is_pending', False)
+
+                if 'end_time' in item_data and item_data['end_time']:
+                    item.end_time = datetime.fromisoformat(item_data['end_time'])
+
+                if 'last_played' in item_data and item_data['last_played']:
+                    item.last_played = datetime.fromisoformat(item_data['last_played'])
+
+                print(f"📝 MANTIDO: P{item.priority} - {item.filename}")
+
+            queue_items.append(item)
+        
+        return queue_items
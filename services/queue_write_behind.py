@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+Persistência "write-behind" da fila de mensagens.
+As alterações da fila apenas marcam o estado como sujo; uma thread em segundo
+plano agrupa as alterações ocorridas dentro de uma janela e grava o arquivo
+uma única vez, fora do caminho de transição do agendador.
+"""
+
+import threading
+import time
+
+
+class QueueWriteBehind:
+    """
+    Gravador em segundo plano que agrupa (coalesce) os saves da fila.
+
+    A primeira alteração abre uma janela de `delay` segundos; todas as
+    alterações dentro dela resultam em uma única gravação ao final da janela,
+    com o estado mais recente obtido de `state_provider`.
+    """
+
+    def __init__(self, serializer, state_provider, delay=1.0):
+        """
+        Inicializa o gravador.
+
+        Args:
+            serializer (MessageQueueSerializer): Serializador que grava o arquivo
+            state_provider (callable): Retorna os argumentos de save_queue (dict) no momento da
+                gravação, mais a chave opcional 'version' (versão crescente do estado)
+            delay (float): Janela de agrupamento em segundos
+        """
+        self.serializer = serializer
+        self.state_provider = state_provider
+        self.delay = delay
+
+        self._condition = threading.Condition()
+        self._dirty_since = None  # time.monotonic() da primeira alteração não gravada
+        self._running = True
+        self._write_lock = threading.Lock()  # evita gravações simultâneas (thread x flush)
+        self._written_version = None  # versão do último estado gravado
+        self.writes = 0  # número de gravações efetivas (diagnóstico)
+
+        self._thread = threading.Thread(target=self._run, name="QueueWriteBehind", daemon=True)
+        self._thread.start()
+
+    def schedule(self):
+        """Marca a fila como alterada; a gravação acontece ao fim da janela."""
+        with self._condition:
+            # Após o encerramento nada mais é gravado (preserva o save de encerramento)
+            if not self._running:
+                return
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+                self._condition.notify()
+
+    def _run(self):
+        """Loop da thread: espera uma alteração, aguarda a janela e grava."""
+        while True:
+            with self._condition:
+                while self._running and self._dirty_since is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+                # Aguarda o fim da janela (alterações nesse meio-tempo são agrupadas)
+                deadline = self._dirty_since + self.delay
+                remaining = deadline - time.monotonic()
+                while self._running and remaining > 0:
+                    self._condition.wait(remaining)
+                    remaining = deadline - time.monotonic()
+                if not self._running:
+                    return
+
+                self._dirty_since = None
+
+            self._write(is_shutdown=False)
+
+    def _write(self, is_shutdown):
+        """Grava o estado atual pelo serializador."""
+        # O estado é lido antes do lock de gravação: o provedor usa o lock da fila,
+        # e quem segura o lock da fila não pode ficar esperando uma gravação presa nele
+        try:
+            state = dict(self.state_provider())
+        except Exception as e:
+            print(f"❌ Erro ao ler o estado da fila: {str(e)}")
+            return
+        version = state.pop('version', None)
+
+        with self._write_lock:
+            # Uma gravação que leu um estado mais antigo não sobrescreve uma mais nova
+            # (nem o save de encerramento)
+            if (not is_shutdown and version is not None and self._written_version is not None
+                    and version <= self._written_version):
+                return
+            try:
+                self.serializer.save_queue(is_shutdown=is_shutdown, **state)
+                self.writes += 1
+                if version is not None:
+                    self._written_version = version
+            except Exception as e:
+                print(f"❌ Erro na gravação em segundo plano: {str(e)}")
+
+    def flush(self, is_shutdown=False):
+        """
+        Grava imediatamente (na thread chamadora) o estado atual,
+        descartando qualquer gravação pendente.
+
+        Args:
+            is_shutdown (bool): True se é o save de encerramento
+        """
+        with self._condition:
+            self._dirty_since = None
+        self._write(is_shutdown)
+
+    def stop(self, flush=True):
+        """
+        Encerra a thread de gravação.
+
+        Args:
+            flush (bool): Grava alterações pendentes antes de encerrar
+        """
+        with self._condition:
+            pending = self._dirty_since is not None
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+
+        if flush and pending:
+            self.flush()
@@ -8,10 +8,11 @@ Suporta fontes de streaming online e dispositivos físicos.
 
 import json
 from pathlib import Path
-import pyaudio
 import time
 import threading
 
+from services.audio_host import get_audio_host
+
 class RadioSource:
     """Representa uma fonte de rádio (streaming ou dispositivo)"""
     
@@ -66,12 +67,13 @@ class RadioSourceManager:
     Suporta salvar/carregar as configurações.
     """
     
-    def __init__(self, config_dir):
+    def __init__(self, config_dir, audio_host=None):
         """
         Inicializa o gerenciador de fontes.
         
         Args:
             config_dir (str ou Path): Diretório de configuração
+            audio_host (AudioHost, optional): Host de áudio (padrão: o compartilhado)
         """
         self.config_dir = Path(config_dir)
         self.sources_file = self.config_dir / "radio_sources.json"
@@ -81,8 +83,9 @@ class RadioSourceManager:
         # Carrega fontes salvas ou cria padrões
         self.load_sources()
         
-        # Inicializa pyaudio para listar dispositivos
-        self.audio = pyaudio.PyAudio()
+        # Host de áudio compartilhado para listar dispositivos (o PortAudio só
+        # é inicializado quando a lista for pedida)
+        self.audio_host = (audio_host or get_audio_host()).acquire()
     
     def load_sources(self):
         """Carrega as fontes do arquivo de configuração"""
@@ -253,57 +256,26 @@ class RadioSourceManager:
             self._create_default_sources()
             return self.sources[0]
     
-    def get_audio_devices(self):
+    def get_audio_devices(self, refresh=False):
         """
         Obtém a lista de dispositivos de áudio disponíveis.
         
+        Args:
+            refresh (bool): Reenumera os dispositivos (detecta os conectados/removidos)
+        
         Returns:
             list: Lista de dispositivos de áudio de entrada
         """
-        devices = []
         try:
-            info = self.audio.get_host_api_info_by_index(0)
-            numdevices = info.get('deviceCount')
-            
-            for i in range(0, numdevices):
-                device_info = self.audio.get_device_info_by_index(i)
-                # Filtra apenas dispositivos de entrada que podem ser tuners de rádio
-                if device_info.get('maxInputChannels') > 0:
-                    # Corrigir nome do dispositivo com problema de codificação
-                    device_name = device_info.get('name')
-                    
-                    # Função específica para corrigir problemas de codificação em português
-                    def fix_portuguese_encoding(text):
-                        # Correções específicas para caracteres problemáticos comuns
-                        replacements = {
-                            'Ã¡': 'á', 'Ã©': 'é', 'Ã­': 'í', 'Ã³': 'ó', 'Ãº': 'ú',
-                            'Ã£': 'ã', 'Ãµ': 'õ', 'Ã¢': 'â', 'Ãª': 'ê', 'Ã´': 'ô',
-                            'Ã§': 'ç', 'Ã‰': 'É', 'Ãƒ': 'Ã', 'Ã‡': 'Ç',
-                            'estÃ©reo': 'estéreo', 'SaÃ­da': 'Saída', 'Ãudio': 'Áudio',
-                            'MicrofoneÃ': 'Microfone'
-                        }
-                        
-                        result = text
-                        for wrong, correct in replacements.items():
-                            result = result.replace(wrong, correct)
-                        
-                        return result
-                    
-                    # Aplica a correção
-                    device_name = fix_portuguese_encoding(device_name)
-                    
-                    devices.append({
-                        'index': i,
-                        'name': device_name,
-                        'channels': device_info.get('maxInputChannels')
-                    })
-            
-            return devices
+            # Dispositivos de entrada que podem ser tuners de rádio
+            return [{'index': device['index'], 'name': device['name'], 'channels': device['inputs']}
+                    for device in self.audio_host.get_input_devices(refresh)]
         except Exception as e:
             print(f"Erro ao listar dispositivos: {str(e)}")
             return []
     
     def cleanup(self):
         """Libera recursos"""
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
\ No newline at end of file
+        if self.audio_host is not None:
+            self.audio_host.release()
+            self.audio_host = None
\ No newline at end of file
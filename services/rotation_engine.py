@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""
+Motor de rotação da fila de mensagens.
+Decide qual mensagem é ativada depois de cada término. O estado de cada política
+é mantido incrementalmente (heaps com invalidação preguiçosa), de modo que cada
+decisão custa O(log n) mesmo com centenas de mensagens por prioridade.
+
+Políticas disponíveis:
+- round_robin: P1 → P2 → P3 … → P1, alternando as mensagens dentro de cada prioridade
+- strict_priority: sempre a prioridade mais alta disponível, alternando dentro dela
+- weighted_fair: cada prioridade recebe uma fatia proporcional ao seu peso
+- edf: a mensagem cujo intervalo vence primeiro (earliest deadline first)
+"""
+
+import heapq
+import itertools
+from bisect import bisect_right, insort
+from datetime import datetime
+
+
+class _LazyHeap:
+    """
+    Heap de mensagens com chave atualizável.
+    Atualizar ou remover apenas invalida a entrada antiga, descartada quando
+    chega ao topo.
+    """
+
+    def __init__(self):
+        self._heap = []  # (chave, seq, mensagem)
+        self._entries = {}  # mensagem -> (chave, seq) válidos
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, message):
+        return message in self._entries
+
+    def key_of(self, message):
+        """Retorna a chave atual da mensagem."""
+        return self._entries[message][0]
+
+    def push(self, message, key):
+        """Insere ou atualiza a mensagem com a nova chave."""
+        entry = (key, next(self._counter))
+        self._entries[message] = entry
+        heapq.heappush(self._heap, (entry[0], entry[1], message))
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [item for item in self._heap
+                          if self._entries.get(item[2]) == (item[0], item[1])]
+            heapq.heapify(self._heap)
+
+    def discard(self, message):
+        """Remove a mensagem (a entrada no heap é descartada depois)."""
+        self._entries.pop(message, None)
+
+    def first(self, accept):
+        """
+        Retorna a mensagem de menor chave aceita pelo filtro, sem removê-la.
+        Mensagens recusadas (ex: fora do horário) voltam ao heap.
+
+        Args:
+            accept (callable): Filtro de elegibilidade
+
+        Returns:
+            MessageQueueItem: Mensagem ou None
+        """
+        heap = self._heap
+        skipped = []
+        result = None
+        while heap:
+            key, seq, message = heap[0]
+            if self._entries.get(message) != (key, seq):
+                heapq.heappop(heap)
+                continue
+            if accept(message):
+                result = message
+                break
+            skipped.append(heapq.heappop(heap))
+
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return result
+
+
+class RotationPolicy:
+    """Interface comum das políticas de rotação."""
+
+    name = None
+    description = None
+
+    def add(self, message):
+        """Registra uma mensagem na rotação."""
+        raise NotImplementedError
+
+    def remove(self, message):
+        """Remove uma mensagem da rotação."""
+        raise NotImplementedError
+
+    def on_played(self, message):
+        """Atualiza o estado após a mensagem ter tocado."""
+        raise NotImplementedError
+
+    def seed_history(self, messages):
+        """
+        Reconstrói o histórico da política (carimbos, tempo virtual, prazos)
+        reaplicando as reproduções anteriores em ordem cronológica, pelo
+        last_played de cada mensagem. As mensagens já devem ter sido adicionadas.
+
+        Args:
+            messages (iterable): Mensagens da fila
+        """
+        played = sorted((m for m in messages if m.last_played), key=lambda m: m.last_played)
+        for message in played:
+            self.on_played(message)
+
+    def select(self, last_priority, accept):
+        """
+        Escolhe a próxima mensagem a ser ativada.
+
+        Args:
+            last_priority (int): Prioridade da última mensagem tocada (ou None)
+            accept (callable): Filtro de elegibilidade (ex: horário permitido)
+
+        Returns:
+            MessageQueueItem: Mensagem escolhida ou None
+        """
+        raise NotImplementedError
+
+
+class RoundRobinPolicy(RotationPolicy):
+    """
+    P1 → P2 → P3 … → P1, percorrendo apenas as prioridades existentes.
+    Dentro de cada prioridade, a mensagem que tocou há mais tempo (ou que
+    nunca tocou, na ordem de inserção) vai primeiro.
+    """
+
+    name = "round_robin"
+    description = "Rodízio por prioridade"
+
+    def __init__(self):
+        self._levels = {}  # prioridade -> _LazyHeap(chave = carimbo da última reprodução)
+        self._priorities = []  # prioridades existentes, ordenadas
+        self._stamp = itertools.count(1)
+
+    def add(self, message):
+        level = self._levels.get(message.priority)
+        if level is None:
+            level = self._levels[message.priority] = _LazyHeap()
+            insort(self._priorities, message.priority)
+        level.push(message, 0)
+
+    def remove(self, message):
+        level = self._levels.get(message.priority)
+        if level is None:
+            return
+        level.discard(message)
+        if not level:
+            del self._levels[message.priority]
+            self._priorities.remove(message.priority)
+
+    def on_played(self, message):
+        level = self._levels.get(message.priority)
+        if level is not None and message in level:
+            level.push(message, next(self._stamp))
+
+    def _level_order(self, last_priority):
+        """Prioridades na ordem de visita a partir da última tocada."""
+        priorities = self._priorities
+        if not priorities:
+            return []
+        # Sem histórico, a primeira prioridade já foi ativada: começa pela seguinte
+        if last_priority is None:
+            last_priority = priorities[0]
+        start = bisect_right(priorities, last_priority)
+        return priorities[start:] + priorities[:start]
+
+    def select(self, last_priority, accept):
+        for priority in self._level_order(last_priority):
+            message = self._levels[priority].first(accept)
+            if message is not None:
+                return message
+        return None
+
+
+class StrictPriorityPolicy(RoundRobinPolicy):
+    """
+    Sempre a prioridade mais alta com mensagem disponível; prioridades menores
+    só tocam quando as maiores estão vazias ou fora do horário.
+    """
+
+    name = "strict_priority"
+    description = "Prioridade estrita"
+
+    def _level_order(self, last_priority):
+        return list(self._priorities)
+
+
+class WeightedFairPolicy(RotationPolicy):
+    """
+    Rotação justa ponderada (stride scheduling): cada mensagem avança um
+    "passo" inversamente proporcional ao peso da sua prioridade a cada vez que
+    toca, e a de menor passo acumulado toca a seguir. Mensagens novas entram no
+    tempo virtual atual, sem acumular crédito.
+    """
+
+    name = "weighted_fair"
+    description = "Justa ponderada"
+
+    def __init__(self, weights=None):
+        """
+        Args:
+            weights (dict, optional): {prioridade: peso}; padrão P1=10 … P10=1
+        """
+        self.weights = weights or {}
+        self._heap = _LazyHeap()  # chave = passo acumulado
+        self._virtual_time = 0.0
+
+    def weight_for(self, priority):
+        """Peso de uma prioridade (maior = toca mais vezes)."""
+        return float(self.weights.get(priority, max(1, 11 - priority)))
+
+    def add(self, message):
+        self._heap.push(message, self._virtual_time)
+
+    def remove(self, message):
+        self._heap.discard(message)
+
+    def on_played(self, message):
+        if message not in self._heap:
+            return
+        start = max(self._heap.key_of(message), self._virtual_time)
+        self._virtual_time = start
+        self._heap.push(message, start + 1.0 / self.weight_for(message.priority))
+
+    def select(self, last_priority, accept):
+        return self._heap.first(accept)
+
+
+class EarliestDeadlinePolicy(RotationPolicy):
+    """
+    Earliest deadline first: o prazo de cada mensagem é o horário em que seu
+    intervalo (ou slot fixo) vence após a última reprodução; mensagens que
+    nunca tocaram têm prazo imediato, na ordem de inserção.
+    """
+
+    name = "edf"
+    description = "Prazo mais próximo"
+
+    def __init__(self):
+        self._heap = _LazyHeap()  # chave = prazo
+
+    def add(self, message):
+        reference = message.end_time or message.last_played
+        deadline = message.compute_next_play_time(reference) if reference else datetime.min
+        self._heap.push(message, deadline)
+
+    def remove(self, message):
+        self._heap.discard(message)
+
+    def on_played(self, message):
+        if message in self._heap:
+            reference = message.end_time or message.last_played
+            self._heap.push(message, message.compute_next_play_time(reference))
+
+    def select(self, last_priority, accept):
+        return self._heap.first(accept)
+
+
+ROTATION_POLICIES = {
+    policy.name: policy
+    for policy in (RoundRobinPolicy, StrictPriorityPolicy, WeightedFairPolicy, EarliestDeadlinePolicy)
+}
+
+DEFAULT_ROTATION_POLICY = RoundRobinPolicy.name
+
+
+def create_rotation_policy(name=None):
+    """
+    Cria uma política de rotação pelo nome.
+
+    Args:
+        name (str, optional): Nome da política (padrão: round_robin)
+
+    Returns:
+        RotationPolicy: Nova instância da política
+    """
+    policy_class = ROTATION_POLICIES.get(name or DEFAULT_ROTATION_POLICY)
+    if policy_class is None:
+        print(f"⚠️ Política de rotação desconhecida '{name}', usando {DEFAULT_ROTATION_POLICY}")
+        policy_class = ROTATION_POLICIES[DEFAULT_ROTATION_POLICY]
+    return policy_class()
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simulador acelerado da programação de mensagens.
+Executa o QueueService e o ciclo do MessageQueueManager sobre um relógio virtual,
+com as durações reais dos arquivos de áudio, gerando em poucos segundos o log
+"como iria ao ar" de um dia inteiro.
+
+Uso:
+    python -m services.schedule_simulator --hours 24 --start "2026-10-19 06:00"
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import wave
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from models.daypart_rule import DaypartRule
+from services.audio_fade_manager import AudioFadeManager
+from services.message_queue_manager import MessageQueueManager
+from services.queue_service import QueueService
+from services.rotation_engine import ROTATION_POLICIES
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+AirLogEntry = namedtuple("AirLogEntry", "filename priority scheduled_time start_time end_time")
+
+
+class VirtualClock:
+    """
+    Relógio virtual com a mesma interface do SchedulerClock.
+    O tempo só avança quando o simulador (ou sleep) o avança.
+    """
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start (datetime, optional): Horário inicial (padrão: agora)
+        """
+        self._now = start or datetime.now()
+        self._elapsed = 0.0
+
+    def now(self):
+        """Retorna o horário virtual atual."""
+        return self._now
+
+    def monotonic(self):
+        """Retorna os segundos virtuais decorridos desde o início."""
+        return self._elapsed
+
+    def reconcile(self):
+        """O relógio virtual nunca sofre saltos."""
+        return 0.0
+
+    def advance(self, seconds):
+        """Avança o relógio virtual."""
+        if seconds > 0:
+            self._now += timedelta(seconds=seconds)
+            self._elapsed += seconds
+
+    def sleep(self, seconds):
+        """Dormir no relógio virtual apenas avança o tempo."""
+        self.advance(seconds)
+
+
+def get_audio_duration(file_path):
+    """
+    Obtém a duração de um arquivo de áudio em segundos.
+    Usa o módulo wave para WAV, o Pygame se disponível, e por último a mesma
+    estimativa por tamanho de arquivo usada pelo PlayerService.
+
+    Args:
+        file_path (Path): Caminho do arquivo
+
+    Returns:
+        float: Duração em segundos ou None se o arquivo não existe
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return None
+
+    if file_path.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(file_path), "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (wave.Error, EOFError):
+            pass
+
+    if pygame is not None:
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            duration = pygame.mixer.Sound(str(file_path)).get_length()
+            if duration > 0:
+                return duration
+        except pygame.error:
+            pass
+
+    # Estima aproximadamente 1 segundo por 10KB (mesmo critério do player)
+    return max(10, os.path.getsize(file_path) / 10000)
+
+
+class SimulatedPlayer:
+    """
+    Player simulado: não reproduz áudio, apenas calcula o término de cada
+    mensagem no relógio virtual e registra o log do que iria ao ar.
+    """
+
+    def __init__(self, clock, messages_path, default_duration=30.0):
+        """
+        Args:
+            clock (VirtualClock): Relógio virtual
+            messages_path (Path): Pasta dos arquivos de mensagem
+            default_duration (float): Duração usada quando o arquivo não existe
+        """
+        self.clock = clock
+        self.messages_path = Path(messages_path)
+        self.default_duration = default_duration
+        self._durations = {}
+
+        self.is_radio_mode = True
+        self.radio_player = None
+        self.end_time = None
+        self.current_message = None
+        self._current_start = None
+        self.air_log = []
+
+    def get_duration(self, filename):
+        """Retorna (com cache) a duração da mensagem em segundos."""
+        if filename not in self._durations:
+            duration = get_audio_duration(self.messages_path / filename)
+            self._durations[filename] = duration if duration else self.default_duration
+        return self._durations[filename]
+
+    def play_message(self, filename, message=None, fade_in_duration=0.0):
+        """Inicia a mensagem no relógio virtual."""
+        self.current_message = message
+        self._current_start = self.clock.now()
+        self.end_time = self._current_start + timedelta(seconds=self.get_duration(filename))
+        self.is_radio_mode = False
+        return True
+
+    def is_media_ended(self):
+        """Retorna True quando o relógio virtual alcança o término da mensagem."""
+        return self.end_time is not None and self.clock.now() >= self.end_time
+
+    def switch_to_radio(self):
+        """Volta para a rádio, fechando a entrada do log."""
+        message = self.current_message
+        if message is not None:
+            self.air_log.append(AirLogEntry(
+                message.filename, message.priority, message.scheduled_time,
+                self._current_start, self.end_time
+            ))
+        self.current_message = None
+        self.end_time = None
+        self.is_radio_mode = True
+        return True
+
+    def get_state(self):
+        """Estado resumido do player simulado."""
+        return "radio" if self.is_radio_mode else "message"
+
+
+class SimulatedFadeManager(AudioFadeManager):
+    """
+    Fades simulados: em vez de alterar o volume, registra os períodos em que
+    a rádio fica abaixada (do início do fade-out ao fim do fade-in).
+    """
+
+    def __init__(self, player_service, clock):
+        super().__init__(player_service)
+        self.clock = clock
+        self._duck_start = None
+        self.duck_periods = []
+
+    def start_message_transition(self):
+        """Rádio começa a abaixar para a mensagem."""
+        self._duck_start = self.clock.now()
+
+    def end_message_transition(self):
+        """Rádio volta ao volume normal após o fade."""
+        if self._duck_start is not None:
+            duck_end = self.clock.now() + timedelta(seconds=self.fade_duration)
+            self.duck_periods.append((self._duck_start, duck_end))
+            self._duck_start = None
+
+
+class SimulationReport:
+    """Métricas calculadas a partir do log simulado."""
+
+    def __init__(self, start, end, air_log, duck_periods, filenames=()):
+        self.start = start
+        self.end = end
+        self.air_log = air_log
+        self.duck_periods = duck_periods
+        self.filenames = list(filenames)  # Mensagens da fila, inclusive as que nunca tocaram
+
+    @property
+    def hours(self):
+        """Número de horas simuladas (arredondado para cima)."""
+        return max(1, -(-int((self.end - self.start).total_seconds()) // 3600))
+
+    def plays_per_hour(self):
+        """
+        Conta as reproduções de cada mensagem por hora simulada.
+
+        Returns:
+            dict: {filename: [contagem da hora 0, hora 1, ...]}
+        """
+        counts = {filename: [0] * self.hours for filename in self.filenames}
+        for entry in self.air_log:
+            hour = int((entry.start_time - self.start).total_seconds() // 3600)
+            row = counts.setdefault(entry.filename, [0] * self.hours)
+            if 0 <= hour < len(row):
+                row[hour] += 1
+        return counts
+
+    def average_lateness(self):
+        """
+        Atraso médio (início real - horário agendado) por mensagem, em segundos.
+        Inclui o fade-out da rádio que precede cada mensagem.
+
+        Returns:
+            dict: {filename: segundos}
+        """
+        totals = {}
+        for entry in self.air_log:
+            lateness = max(0.0, (entry.start_time - entry.scheduled_time).total_seconds())
+            total, count = totals.get(entry.filename, (0.0, 0))
+            totals[entry.filename] = (total + lateness, count + 1)
+        return {name: total / count for name, (total, count) in totals.items()}
+
+    def ducked_seconds(self):
+        """Tempo total (s) em que a rádio ficou abaixada, limitado à janela simulada."""
+        total = 0.0
+        for begin, finish in self.duck_periods:
+            begin = max(begin, self.start)
+            finish = min(finish, self.end)
+            if finish > begin:
+                total += (finish - begin).total_seconds()
+        return total
+
+    def format_text(self):
+        """
+        Gera o relatório em texto.
+
+        Returns:
+            str: Relatório formatado
+        """
+        lines = []
+        span = (self.end - self.start).total_seconds()
+        lines.append(f"📊 SIMULAÇÃO {self.start.strftime('%d/%m %H:%M')} → {self.end.strftime('%d/%m %H:%M')}")
+        lines.append(f"   Reproduções: {len(self.air_log)}")
+
+        ducked = self.ducked_seconds()
+        percent = 100.0 * ducked / span if span else 0.0
+        lines.append(f"   Rádio abaixada: {timedelta(seconds=int(ducked))} ({percent:.1f}% do tempo)")
+
+        lateness = self.average_lateness()
+        plays = self.plays_per_hour()
+        hour_labels = [(self.start + timedelta(hours=h)).strftime('%H') for h in range(self.hours)]
+
+        lines.append("")
+        lines.append("🕐 Reproduções por hora:")
+        lines.append(f"   {'Mensagem':<30} " + " ".join(f"{label:>3}" for label in hour_labels) + "  Total  Atraso médio")
+        for filename in sorted(plays):
+            row = plays[filename]
+            cells = " ".join(f"{count:>3}" for count in row)
+            lines.append(f"   {filename[:30]:<30} {cells}  {sum(row):>5}  {lateness.get(filename, 0.0):>10.1f}s")
+
+        return "\n".join(lines)
+
+
+class ScheduleSimulator:
+    """
+    Executa a programação sobre um relógio virtual.
+    A rotação é a mesma do aplicativo: QueueService + MessageQueueManager.run_once().
+    """
+
+    # Passo mínimo do relógio virtual (evita laço sem avanço de tempo)
+    MIN_STEP = 0.05
+
+    def __init__(self, messages_path, start=None, default_duration=30.0, rotation_policy=None):
+        """
+        Args:
+            messages_path (str ou Path): Pasta dos arquivos de mensagem
+            start (datetime, optional): Início da simulação (padrão: agora)
+            default_duration (float): Duração para arquivos inexistentes
+            rotation_policy (str, optional): Política de rotação a simular
+        """
+        self.clock = VirtualClock(start)
+        self.start = self.clock.now()
+        self.queue_service = QueueService(clock=self.clock, rotation_policy=rotation_policy)
+        self.player = SimulatedPlayer(self.clock, messages_path, default_duration)
+
+        # Os construtores imprimem diagnósticos; na simulação ficam silenciosos
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            self.fade_manager = SimulatedFadeManager(self.player, self.clock)
+            self.manager = MessageQueueManager(self.queue_service, self.player, self.fade_manager)
+
+    def load_queue_file(self, queue_file_path):
+        """
+        Carrega as mensagens de um arquivo de fila salvo (config/queue_state.json).
+        Os horários são recalculados a partir do início da simulação.
+
+        Args:
+            queue_file_path (str ou Path): Caminho do arquivo
+
+        Returns:
+            int: Número de mensagens carregadas
+        """
+        with open(queue_file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        items = data if isinstance(data, list) else data.get("messages", [])
+        entries = [
+            (
+                item["filename"],
+                item["priority"],
+                item["interval"],
+                [DaypartRule.from_dict(rule) for rule in item.get("daypart_rules", [])],
+                item.get("slot_minutes"),
+            )
+            for item in items
+        ]
+        return len(self.add_messages(entries))
+
+    def add_messages(self, entries):
+        """Adiciona mensagens (mesmo formato de QueueService.add_messages)."""
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return self.queue_service.add_messages(entries)
+
+    def run(self, hours=24, verbose=False):
+        """
+        Executa a simulação.
+
+        Args:
+            hours (float): Duração simulada em horas
+            verbose (bool): Mostra os logs do agendador
+
+        Returns:
+            SimulationReport: Log simulado e métricas
+        """
+        end = self.start + timedelta(hours=hours)
+
+        with open(os.devnull, "w") as devnull:
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull)
+            with output:
+                while self.clock.now() < end:
+                    wait = self.manager.run_once()
+
+                    # Sem player real não há o que consultar: pula direto para o término
+                    if self.manager.current_playing_message and self.player.end_time:
+                        wait = max(wait, (self.player.end_time - self.clock.now()).total_seconds())
+
+                    remaining = (end - self.clock.now()).total_seconds()
+                    self.clock.advance(min(max(wait, self.MIN_STEP), remaining))
+
+        return SimulationReport(self.start, end, list(self.player.air_log),
+                                list(self.fade_manager.duck_periods),
+                                [message.filename for message in self.queue_service.message_queue])
+
+
+def write_air_log_csv(report, csv_path):
+    """
+    Grava o log "como iria ao ar" em CSV.
+
+    Args:
+        report (SimulationReport): Resultado da simulação
+        csv_path (str ou Path): Arquivo de saída
+    """
+    import csv
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["inicio", "fim", "arquivo", "prioridade", "agendado", "atraso_s"])
+        for entry in report.air_log:
+            writer.writerow([
+                entry.start_time.isoformat(timespec="seconds"),
+                entry.end_time.isoformat(timespec="seconds"),
+                entry.filename,
+                entry.priority,
+                entry.scheduled_time.isoformat(timespec="seconds"),
+                f"{(entry.start_time - entry.scheduled_time).total_seconds():.1f}",
+            ])
+
+
+def main():
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Simula a programação de mensagens")
+    parser.add_argument("--queue", default=str(PROJECT_DIR / "config" / "queue_state.json"),
+                        help="Arquivo da fila salva")
+    parser.add_argument("--audio", default=str(PROJECT_DIR / "AUDIO"), help="Pasta das mensagens")
+    parser.add_argument("--hours", type=float, default=24.0, help="Horas a simular")
+    parser.add_argument("--start", help="Início (AAAA-MM-DD HH:MM); padrão: agora")
+    parser.add_argument("--default-duration", type=float, default=30.0,
+                        help="Duração (s) para arquivos não encontrados")
+    parser.add_argument("--policy", choices=sorted(ROTATION_POLICIES), help="Política de rotação")
+    parser.add_argument("--csv", help="Grava o log simulado em CSV")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs do agendador")
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start) if args.start else None
+    simulator = ScheduleSimulator(args.audio, start, args.default_duration, args.policy)
+    count = simulator.load_queue_file(args.queue)
+    print(f"📋 {count} mensagem(ns) carregada(s) de {args.queue}")
+
+    report = simulator.run(args.hours, verbose=args.verbose)
+    print(report.format_text())
+
+    if args.csv:
+        write_air_log_csv(report, args.csv)
+        print(f"💾 Log gravado em {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Relógio do agendador.
+Mede a passagem do tempo com time.monotonic() e só reconcilia com o relógio
+de parede (datetime.now) em pontos controlados, de modo que ajustes de relógio
+(NTP, horário de verão, alteração manual) não desloquem os agendamentos
+de forma imprevisível.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SchedulerClock:
+    """
+    Relógio monotônico ancorado no relógio de parede.
+
+    now() = âncora de parede + tempo monotônico decorrido desde a âncora.
+    reconcile() compara com datetime.now(): desvios pequenos são absorvidos
+    reancorando silenciosamente; desvios grandes são tratados como salto de
+    relógio e informados para que o agendador reajuste as mensagens.
+    """
+
+    def __init__(self, max_drift=0.1, jump_threshold=2.0):
+        """
+        Inicializa o relógio.
+
+        Args:
+            max_drift (float): Desvio (s) acima do qual o relógio é reancorado
+            jump_threshold (float): Desvio (s) considerado salto de relógio
+        """
+        self.max_drift = max_drift
+        self.jump_threshold = jump_threshold
+        self._anchor()
+
+    def _anchor(self):
+        """Ancora o relógio monotônico no horário de parede atual."""
+        self._wall_anchor = datetime.now()
+        self._mono_anchor = time.monotonic()
+
+    def now(self):
+        """
+        Retorna o horário atual na base de tempo do agendador.
+
+        Returns:
+            datetime: Horário atual (sem saltos entre reconciliações)
+        """
+        return self._wall_anchor + timedelta(seconds=time.monotonic() - self._mono_anchor)
+
+    def monotonic(self):
+        """Retorna o tempo monotônico em segundos."""
+        return time.monotonic()
+
+    def reconcile(self):
+        """
+        Reconcilia com o relógio de parede.
+
+        Returns:
+            float: Tamanho do salto em segundos (positivo = relógio adiantou),
+                   ou 0.0 se não houve salto
+        """
+        drift = (datetime.now() - self.now()).total_seconds()
+
+        if abs(drift) >= self.jump_threshold:
+            print(f"🕐 Salto de relógio detectado: {drift:+.1f}s")
+            self._anchor()
+            return drift
+
+        if abs(drift) > self.max_drift:
+            # Pequeno desvio (deriva do oscilador ou ajuste fino do NTP)
+            self._anchor()
+
+        return 0.0
+
+    def sleep(self, seconds):
+        """Dorme pelo tempo informado (em segundos)."""
+        if seconds > 0:
+            time.sleep(seconds)
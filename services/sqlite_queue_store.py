@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+"""
+Armazenamento da fila e do histórico de reprodução em SQLite (modo WAL).
+Alternativa ao queue_state.json para filas grandes e histórico de meses:
+cada alteração atualiza apenas as linhas envolvidas, em uma transação, e o
+histórico de reproduções é consultado por índices de arquivo e horário.
+
+Selecionado automaticamente pelo QueueService quando o arquivo da fila
+termina em .db (ex: config/queue_state.db).
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from services.queue_store import QueueStore
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS queue_items (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_items_position ON queue_items (position);
+CREATE TABLE IF NOT EXISTS play_history (
+    id INTEGER PRIMARY KEY,
+    message_id TEXT,
+    filename TEXT NOT NULL,
+    priority INTEGER,
+    scheduled_at REAL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_play_history_filename ON play_history (filename, started_at);
+CREATE INDEX IF NOT EXISTS idx_play_history_started ON play_history (started_at);
+"""
+
+# Instruções fixas com parâmetros: o sqlite3 mantém as instruções preparadas em cache
+_UPSERT_ITEM = (
+    "INSERT INTO queue_items (id, position, filename, priority, data) "
+    "VALUES (?, COALESCE((SELECT position FROM queue_items WHERE id = ?), "
+    "(SELECT COALESCE(MAX(position), 0) + 1 FROM queue_items)), ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET filename = excluded.filename, "
+    "priority = excluded.priority, data = excluded.data"
+)
+_INSERT_ITEM = "INSERT INTO queue_items (id, position, filename, priority, data) VALUES (?, ?, ?, ?, ?)"
+_DELETE_ITEM = "DELETE FROM queue_items WHERE id = ?"
+_SET_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+_INSERT_PLAY = (
+    "INSERT INTO play_history (message_id, filename, priority, scheduled_at, started_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_END_PLAY = "UPDATE play_history SET ended_at = ?, failed = ? WHERE id = ?"
+
+
+def _timestamp(value):
+    """Converte datetime (ou texto ISO) em segundos desde a época."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class SQLiteQueueStore(QueueStore):
+    """
+    Armazenamento da fila em SQLite com a mesma interface (QueueStore) do serializador.
+
+    Funciona sempre em modo de eventos (como o modo journal): cada alteração é
+    gravada em sua própria transação, sem regravar a fila inteira, e o
+    encerramento limpo é registrado na tabela meta.
+    """
+
+    def __init__(self, db_path, fsync=False):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            db_path (str ou Path): Caminho do banco de dados
+            fsync (bool): Sincroniza o disco a cada transação (synchronous=FULL)
+        """
+        super().__init__(db_path, fsync=fsync, journal=True)
+
+        self._lock = threading.Lock()  # a conexão é usada por várias threads
+        self._open_plays = {}  # message_id -> linha do histórico em reprodução
+        self._clean_flag = False  # True após o save de encerramento
+
+        self.queue_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.queue_file_path), check_same_thread=False,
+                                     isolation_level=None, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+        print(f"🗄️ Armazenamento SQLite: {self.queue_file_path}")
+
+    def _migrate(self):
+        """Atualiza bancos criados antes da coluna failed do histórico."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(play_history)")]
+        if 'failed' not in columns:
+            self._conn.execute(
+                "ALTER TABLE play_history ADD COLUMN failed INTEGER NOT NULL DEFAULT 0")
+
+    def _transaction(self):
+        """Abre uma transação explícita (BEGIN ... COMMIT/ROLLBACK)."""
+        return _Transaction(self._conn)
+
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _item_row(self, item):
+        """Parâmetros de _UPSERT_ITEM para uma mensagem."""
+        data = self._serialize_item(item)
+        return (data['id'], data['id'], data['filename'], data['priority'],
+                json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+
+    def load_queue(self, message_queue_class):
+        """
+        Carrega a fila do banco. Após um encerramento limpo os intervalos são
+        resetados; após uma queda, o último estado gravado é restaurado.
+
+        Args:
+            message_queue_class: Classe das mensagens (MessageQueueItem)
+
+        Returns:
+            list: Mensagens carregadas
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM queue_items ORDER BY position").fetchall()
+            clean_shutdown = self._get_meta('clean_shutdown', '1') == '1'
+            self.saved_rotation_policy = self._get_meta('rotation_policy')
+            self.journal_seq = int(self._get_meta('event_seq', '0'))
+
+            # A partir daqui a sessão está ativa até o próximo save de encerramento
+            with self._transaction():
+                self._conn.execute(_SET_META, ('clean_shutdown', '0'))
+                # Reproduções sem término pertencem à sessão que caiu
+                self._conn.execute(
+                    "UPDATE play_history SET ended_at = started_at WHERE ended_at IS NULL")
+
+        serialized_items = [json.loads(row[0]) for row in rows]
+        print(f"🗄️ {len(serialized_items)} mensagem(ns) no banco - "
+              f"{'ENCERRAMENTO LIMPO' if clean_shutdown else 'RECUPERAÇÃO EXATA (sessão anterior não encerrou)'}")
+
+        return self._build_items(message_queue_class, serialized_items, clean_shutdown, datetime.now())
+
+    def save_queue(self, queue_items, is_shutdown=False, rotation_policy=None, journal_seq=None):
+        """
+        Regrava a fila inteira em uma única transação (carga inicial e encerramento).
+
+        Args:
+            queue_items: Lista de itens da fila
+            is_shutdown (bool): True se está salvando por causa do encerramento
+            rotation_policy (str, optional): Política de rotação em uso
+            journal_seq (int, optional): Último evento refletido em queue_items
+        """
+        try:
+            rows = []
+            for position, item in enumerate(queue_items, 1):
+                message_id, _, filename, priority, data = self._item_row(item)
+                rows.append((message_id, position, filename, priority, data))
+
+            with self._lock, self._transaction():
+                self._conn.execute("DELETE FROM queue_items")
+                self._conn.executemany(_INSERT_ITEM, rows)
+                self._conn.executemany(_SET_META, [
+                    ('rotation_policy', rotation_policy),
+                    ('event_seq', str(self.journal_seq)),
+                    ('clean_shutdown', '1' if is_shutdown else '0'),
+                ])
+                self._clean_flag = is_shutdown
+
+            if is_shutdown:
+                print(f"💾 Fila salva no banco COM FLAG DE ENCERRAMENTO ({len(rows)} mensagens)")
+        except Exception as e:
+            print(f"❌ Erro ao salvar fila no banco: {str(e)}")
+
+    def append_event(self, event, items=(), removed_ids=(), **extra):
+        """
+        Grava uma alteração da fila atualizando apenas as linhas envolvidas.
+        Os eventos de início, término e falha alimentam o histórico de reprodução.
+
+        Returns:
+            bool: Sempre False (não há compactação no banco)
+        """
+        with self._lock, self._transaction():
+            self.journal_seq += 1
+            if event == 'cleared':
+                self._conn.execute("DELETE FROM queue_items")
+            if items:
+                self._conn.executemany(_UPSERT_ITEM, [self._item_row(item) for item in items])
+            if removed_ids:
+                self._conn.executemany(_DELETE_ITEM, [(message_id,) for message_id in removed_ids])
+            if 'rotation_policy' in extra:
+                self._conn.execute(_SET_META, ('rotation_policy', extra['rotation_policy']))
+
+            if event == 'started':
+                cursor = self._conn.execute(_INSERT_PLAY, (
+                    extra.get('message_id'), extra.get('filename'), extra.get('priority'),
+                    _timestamp(extra.get('scheduled_time')), datetime.now().timestamp()))
+                self._open_plays[extra.get('message_id')] = cursor.lastrowid
+            elif event in ('ended', 'failed'):
+                # Uma falha ao iniciar fecha a linha marcada, fora da contagem de reproduções
+                row_id = self._open_plays.pop(extra.get('message_id'), None)
+                if row_id is not None:
+                    self._conn.execute(_END_PLAY, (datetime.now().timestamp(),
+                                                   1 if event == 'failed' else 0, row_id))
+
+            self._conn.execute(_SET_META, ('event_seq', str(self.journal_seq)))
+            # Alteração após o save de encerramento: a sessão não terminou limpa
+            if self._clean_flag:
+                self._conn.execute(_SET_META, ('clean_shutdown', '0'))
+                self._clean_flag = False
+        return False
+
+    def get_play_history(self, filename=None, start=None, end=None, limit=None):
+        """
+        Consulta o histórico de reprodução pelos índices de arquivo e horário.
+
+        Args:
+            filename (str, optional): Apenas este arquivo
+            start (datetime, optional): Início do período (inclusive)
+            end (datetime, optional): Fim do período (exclusive)
+            limit (int, optional): Número máximo de registros (mais recentes primeiro)
+
+        Returns:
+            list: Dicionários com filename, priority, scheduled_at, started_at, ended_at
+                e failed (True se o player não conseguiu iniciar a mensagem)
+        """
+        sql, params = self._history_filter(
+            "SELECT filename, priority, scheduled_at, started_at, ended_at, failed FROM play_history",
+            filename, start, end)
+        sql += " ORDER BY started_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        to_datetime = lambda value: datetime.fromtimestamp(value) if value is not None else None
+        return [{
+            'filename': row[0],
+            'priority': row[1],
+            'scheduled_at': to_datetime(row[2]),
+            'started_at': to_datetime(row[3]),
+            'ended_at': to_datetime(row[4]),
+            'failed': bool(row[5]),
+        } for row in rows]
+
+    def count_plays(self, filename=None, start=None, end=None):
+        """
+        Conta as reproduções no período (as falhas ao iniciar não contam).
+
+        Args:
+            filename (str, optional): Apenas este arquivo
+            start (datetime, optional): Início do período (inclusive)
+            end (datetime, optional): Fim do período (exclusive)
+
+        Returns:
+            int: Número de reproduções
+        """
+        sql, params = self._history_filter("SELECT COUNT(*) FROM play_history", filename, start, end,
+                                           include_failed=False)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    @staticmethod
+    def _history_filter(sql, filename, start, end, include_failed=True):
+        """Acrescenta os filtros do histórico à consulta."""
+        conditions = [] if include_failed else ["failed = 0"]
+        params = []
+        if filename is not None:
+            conditions.append("filename = ?")
+            params.append(filename)
+        if start is not None:
+            conditions.append("started_at >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            conditions.append("started_at < ?")
+            params.append(_timestamp(end))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    def prune_history(self, before):
+        """
+        Remove o histórico anterior a uma data.
+
+        Args:
+            before (datetime): Registros iniciados antes desta data são removidos
+
+        Returns:
+            int: Número de registros removidos
+        """
+        with self._lock, self._transaction():
+            cursor = self._conn.execute("DELETE FROM play_history WHERE started_at < ?",
+                                        (_timestamp(before),))
+        print(f"🧹 {cursor.rowcount} registro(s) de histórico removido(s)")
+        return cursor.rowcount
+
+    def cleanup(self):
+        """Fecha a conexão com o banco."""
+        print("🧹 Fechando armazenamento SQLite")
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                self._conn.close()
+            except sqlite3.Error as e:
+                print(f"⚠ Erro ao fechar banco: {str(e)}")
+
+
+class _Transaction:
+    """Gerenciador de contexto de transação para conexões em modo autocommit."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN")
+        return self._conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""
+VOX: abaixamento automático (ducking) da rádio e das mensagens pela voz.
+O nível medido pelo MicrophoneService a cada bloco alimenta uma máquina de
+estados com tempos de ataque, retenção e liberação; basta falar no microfone
+para o áudio abaixar e, após o silêncio, voltar ao normal.
+"""
+
+import threading
+import time
+
+
+class VoxController:
+    """
+    Controla o ducking a partir do nível do microfone.
+
+    - Ataque: a voz precisa ficar acima do limiar por `attack` segundos para
+      abaixar o áudio (evita disparos com estalos e batidas)
+    - Retenção: o áudio continua abaixado por `hold` segundos após a última
+      voz (pausas entre frases não fazem o áudio subir)
+    - Liberação: duração do fade de volta ao volume normal
+
+    O cálculo acontece no callback do microfone e é barato; as alterações de
+    volume são aplicadas por uma thread própria, fora do callback de áudio.
+    """
+
+    IDLE = "idle"
+    DUCKED = "ducked"
+
+    def __init__(self, player_service, threshold=0.03, attack=0.05, hold=1.5,
+                 release=1.0, duck_level=0.15):
+        """
+        Inicializa o controlador.
+
+        Args:
+            player_service (PlayerService): Player cujo áudio é abaixado
+            threshold (float): Nível RMS (0.0 a 1.0) que indica voz (0.03 ≈ -30 dBFS)
+            attack (float): Tempo de voz (s) antes de abaixar; também é a duração do fade
+            hold (float): Tempo (s) mantido abaixado após a última voz
+            release (float): Duração (s) do fade de volta ao volume normal
+            duck_level (float): Fração do volume durante a fala (0.15 = 15%)
+        """
+        self.player_service = player_service
+        self.threshold = threshold
+        self.attack = attack
+        self.hold = hold
+        self.release = release
+        self.duck_level = duck_level
+
+        self.state = self.IDLE
+        self._above_since = None
+        self._last_voice = 0.0
+
+        self._condition = threading.Condition()
+        self._pending = None  # ação a aplicar: DUCKED ou IDLE
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Inicia a thread que aplica as alterações de volume."""
+        if self._running:
+            return
+        self._running = True
+        self.state = self.IDLE
+        self._above_since = None
+        self._thread = threading.Thread(target=self._run, name="VoxController", daemon=True)
+        self._thread.start()
+        print(f"🎙️ VOX ativado (limiar {self.threshold:.3f}, ataque {self.attack}s, "
+              f"retenção {self.hold}s, liberação {self.release}s)")
+
+    def stop(self):
+        """Para o controlador, devolvendo o volume normal se estava abaixado."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+        if self.state == self.DUCKED:
+            self.state = self.IDLE
+            self.player_service.restore_audio(self.release)
+        print("🎙️ VOX desativado")
+
+    def process_level(self, rms, now=None):
+        """
+        Atualiza a máquina de estados com o nível do último bloco.
+        Chamado pelo callback do microfone: não bloqueia.
+
+        Args:
+            rms (float): Nível RMS normalizado (0.0 a 1.0)
+            now (float, optional): Tempo monotônico em segundos
+        """
+        if not self._running:
+            return
+        now = time.monotonic() if now is None else now
+
+        if self.state == self.IDLE:
+            if rms >= self.threshold:
+                if self._above_since is None:
+                    self._above_since = now
+                if now - self._above_since >= self.attack:
+                    self.state = self.DUCKED
+                    self._last_voice = now
+                    self._signal(self.DUCKED)
+            else:
+                self._above_since = None
+        else:
+            # Histerese: metade do limiar já conta como voz (fim de palavras)
+            if rms >= self.threshold * 0.5:
+                self._last_voice = now
+            elif now - self._last_voice >= self.hold:
+                self.state = self.IDLE
+                self._above_since = None
+                self._signal(self.IDLE)
+
+    def _signal(self, action):
+        # Sem bloquear o callback: se a thread estiver ocupada, tenta de novo no próximo bloco
+        if self._condition.acquire(blocking=False):
+            try:
+                self._pending = action
+                self._condition.notify()
+            finally:
+                self._condition.release()
+        else:
+            self.state = self.IDLE if action == self.DUCKED else self.DUCKED
+
+    def _run(self):
+        """Loop da thread: aplica a última transição de estado."""
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                action, self._pending = self._pending, None
+
+            try:
+                if action == self.DUCKED:
+                    print("🎙️ VOX: voz detectada, abaixando áudio")
+                    self.player_service.duck_audio(self.duck_level, self.attack)
+                else:
+                    print("🎙️ VOX: silêncio, restaurando áudio")
+                    self.player_service.restore_audio(self.release)
+            except Exception as e:
+                print(f"❌ Erro ao aplicar VOX: {str(e)}")
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+
+"""
+Gerenciador de zonas.
+Executa várias pilhas independentes (player + fila + agendador), cada uma em
+seu próprio dispositivo de saída, dentro de um único processo. A instância do
+VLC, a configuração das fontes de rádio e as mídias de mensagem já analisadas
+são compartilhadas entre as zonas, de modo que N zonas custam bem menos que N
+processos. O áudio da rádio, porém, é decodificado por zona: cada zona tem seu
+próprio player VLC (e dispositivo de saída), mesmo quando várias tocam a mesma
+fonte.
+
+Uso (sem interface gráfica):
+    python -m services.zone_manager
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import vlc
+
+from services.as_run_log import AsRunLog
+from services.message_queue_manager import MessageQueueManager
+from services.player_service import PlayerService
+from services.queue_service import QueueService
+from services.radio_source_manager import RadioSourceManager
+
+
+class SharedAudioResources:
+    """
+    Recursos de áudio compartilhados por todas as zonas do processo:
+    - Uma única instância do VLC (módulos e cache de plugins carregados uma vez)
+    - Um único gerenciador de fontes de rádio (a lista de fontes; o stream de
+      cada zona é aberto e decodificado pelo player da própria zona)
+    - Cache de mídias: cada arquivo de mensagem é analisado uma vez e a mesma
+      mídia (com a duração já conhecida) é reutilizada por todas as zonas
+    """
+
+    def __init__(self, config_dir, messages_path):
+        """
+        Inicializa os recursos compartilhados.
+
+        Args:
+            config_dir (Path): Diretório de configuração
+            messages_path (Path): Pasta das mensagens
+        """
+        self.config_dir = Path(config_dir)
+        self.messages_path = Path(messages_path)
+
+        self.vlc_instance = vlc.Instance("--no-video")
+        self.source_manager = RadioSourceManager(self.config_dir)
+
+        self._media_cache = {}  # caminho -> (mtime, mídia, duração em segundos)
+        self._lock = threading.Lock()
+
+    def get_media(self, file_path):
+        """
+        Obtém a mídia VLC de um arquivo, analisando-o apenas na primeira vez
+        (ou quando o arquivo foi alterado).
+
+        A mídia devolvida tem uma referência própria do chamador, que deve
+        chamar media.release() quando não precisar mais dela (o player retém
+        a sua ao receber set_media). Assim, trocar a mídia no cache não libera
+        a que outra zona ainda está tocando: ela é liberada pelo último dono.
+
+        Args:
+            file_path (Path): Caminho do arquivo
+
+        Returns:
+            tuple: (vlc.Media, duração em segundos)
+        """
+        file_path = Path(file_path).resolve()
+        mtime = file_path.stat().st_mtime
+
+        with self._lock:
+            cached = self._media_cache.get(file_path)
+            if cached and cached[0] == mtime:
+                cached[1].retain()
+                return cached[1], cached[2]
+
+        # A análise bloqueia (lê o arquivo): fica fora do lock para não
+        # atrasar o agendador das outras zonas
+        media = self.vlc_instance.media_new(str(file_path))
+        media.parse()
+        duration = media.get_duration() / 1000.0
+        if duration <= 0:
+            # Estima aproximadamente 1 segundo por 10KB (mesmo critério do player)
+            duration = max(10, os.path.getsize(file_path) / 10000)
+
+        with self._lock:
+            cached = self._media_cache.get(file_path)
+            if cached and cached[0] == mtime:
+                # Outra zona analisou o mesmo arquivo enquanto isso: usa a dela
+                media.release()
+                cached[1].retain()
+                return cached[1], cached[2]
+
+            if cached:
+                cached[1].release()  # só a referência do cache
+            self._media_cache[file_path] = (mtime, media, duration)
+            media.retain()
+        print(f"🎞️ Mídia carregada: {file_path.name} ({duration:.1f}s)")
+        return media, duration
+
+    def list_output_devices(self):
+        """
+        Lista os dispositivos de saída de áudio disponíveis no VLC.
+
+        Returns:
+            list: Tuplas (id do dispositivo, descrição)
+        """
+        devices = []
+        player = self.vlc_instance.media_player_new()
+        try:
+            device_list = player.audio_output_device_enum()
+            node = device_list
+            while node:
+                device = node.contents
+                devices.append((device.device.decode('utf-8', 'replace'),
+                                device.description.decode('utf-8', 'replace')))
+                node = device.next
+            if device_list:
+                vlc.libvlc_audio_output_device_list_release(device_list)
+        finally:
+            player.release()
+        return devices
+
+    def cleanup(self):
+        """Libera os recursos compartilhados."""
+        with self._lock:
+            for _, media, _ in self._media_cache.values():
+                media.release()
+            self._media_cache.clear()
+
+        self.source_manager.cleanup()
+        self.vlc_instance.release()
+
+
+class Zone:
+    """
+    Uma zona de áudio: player, fila e agendador próprios em um dispositivo de saída.
+    """
+
+    def __init__(self, name, shared_resources, queue_file_path, output_device=None,
+                 radio_source_index=None):
+        """
+        Inicializa a zona.
+
+        Args:
+            name (str): Nome da zona (ex: "Salão de vendas")
+            shared_resources (SharedAudioResources): Recursos compartilhados
+            queue_file_path (Path): Arquivo de persistência da fila da zona
+            output_device (str, optional): ID do dispositivo de saída (padrão do sistema se None)
+            radio_source_index (int, optional): Fonte de rádio da zona (padrão: fonte atual)
+        """
+        self.name = name
+        self.output_device = output_device
+        self.radio_source_index = radio_source_index
+
+        self.player_service = PlayerService(
+            shared_resources.config_dir,
+            shared_resources.messages_path,
+            shared_resources=shared_resources,
+            output_device=output_device,
+            radio_source_index=radio_source_index,
+        )
+        self.queue_service = QueueService(queue_file_path,
+                                          as_run_log=AsRunLog(Path(queue_file_path).parent / "as_run"))
+        self.queue_manager = MessageQueueManager(self.queue_service, self.player_service)
+
+    def start(self):
+        """Inicia o agendador da zona."""
+        self.queue_manager.start()
+        print(f"🔊 Zona '{self.name}' iniciada")
+
+    def stop(self):
+        """Para o agendador da zona."""
+        self.queue_manager.stop()
+
+    def cleanup(self):
+        """Encerra a zona salvando a fila."""
+        self.stop()
+        self.queue_service.shutdown_save()
+        self.queue_service.cleanup()
+        self.player_service.cleanup()
+
+    def to_dict(self):
+        """Converte a configuração da zona para um dicionário para serialização"""
+        return {
+            'name': self.name,
+            'output_device': self.output_device,
+            'radio_source_index': self.radio_source_index
+        }
+
+
+class ZoneManager:
+    """
+    Gerencia as zonas configuradas em config/zones.json.
+    Cada zona guarda sua fila em config/zones/<zona>/queue_state.json
+    e seu log de veiculação em config/zones/<zona>/as_run/.
+    """
+
+    def __init__(self, config_dir, messages_path):
+        """
+        Inicializa o gerenciador de zonas.
+
+        Args:
+            config_dir (Path): Diretório de configuração
+            messages_path (Path): Pasta das mensagens
+        """
+        self.config_dir = Path(config_dir)
+        self.zones_file = self.config_dir / "zones.json"
+        self.shared_resources = SharedAudioResources(self.config_dir, messages_path)
+        self.zones = {}  # nome -> Zone
+
+    @staticmethod
+    def _slug(name):
+        """Converte o nome da zona em um nome de pasta seguro."""
+        return re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_').lower() or "zona"
+
+    def _queue_file_for(self, name):
+        return self.config_dir / "zones" / self._slug(name) / "queue_state.json"
+
+    def load_zones(self):
+        """
+        Carrega e cria as zonas do arquivo de configuração.
+
+        Returns:
+            int: Número de zonas carregadas
+        """
+        if not self.zones_file.exists():
+            print("📄 Nenhuma zona configurada")
+            return 0
+
+        try:
+            with open(self.zones_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"❌ Erro ao carregar zonas: {str(e)}")
+            return 0
+
+        for zone_data in data.get('zones', []):
+            self._create_zone(
+                zone_data['name'],
+                zone_data.get('output_device'),
+                zone_data.get('radio_source_index')
+            )
+
+        print(f"✅ {len(self.zones)} zona(s) carregada(s)")
+        return len(self.zones)
+
+    def save_zones(self):
+        """Salva a configuração das zonas."""
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.zones_file, 'w', encoding='utf-8') as f:
+                json.dump({'zones': [zone.to_dict() for zone in self.zones.values()]},
+                          f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao salvar zonas: {str(e)}")
+            return False
+
+    def _create_zone(self, name, output_device=None, radio_source_index=None):
+        zone = Zone(name, self.shared_resources, self._queue_file_for(name),
+                    output_device, radio_source_index)
+        self.zones[name] = zone
+        return zone
+
+    def add_zone(self, name, output_device=None, radio_source_index=None):
+        """
+        Cria uma nova zona e salva a configuração.
+
+        Args:
+            name (str): Nome da zona
+            output_device (str, optional): ID do dispositivo de saída
+            radio_source_index (int, optional): Fonte de rádio da zona
+
+        Returns:
+            Zone: Zona criada ou None se o nome já existe
+        """
+        if name in self.zones:
+            print(f"❌ Zona '{name}' já existe")
+            return None
+
+        zone = self._create_zone(name, output_device, radio_source_index)
+        self.save_zones()
+        return zone
+
+    def remove_zone(self, name):
+        """
+        Encerra e remove uma zona.
+
+        Args:
+            name (str): Nome da zona
+
+        Returns:
+            bool: True se removida
+        """
+        zone = self.zones.pop(name, None)
+        if zone is None:
+            return False
+
+        zone.cleanup()
+        self.save_zones()
+        return True
+
+    def get_zone(self, name):
+        """Retorna a zona pelo nome (ou None)."""
+        return self.zones.get(name)
+
+    def start_all(self):
+        """Inicia o agendador de todas as zonas."""
+        for zone in self.zones.values():
+            zone.start()
+
+    def stop_all(self):
+        """Para o agendador de todas as zonas."""
+        for zone in self.zones.values():
+            zone.stop()
+
+    def cleanup(self):
+        """Encerra todas as zonas e libera os recursos compartilhados."""
+        for zone in self.zones.values():
+            zone.cleanup()
+        self.zones.clear()
+        self.shared_resources.cleanup()
+
+
+def main():
+    """Executa as zonas configuradas sem interface gráfica."""
+    project_dir = Path(__file__).resolve().parent.parent
+    manager = ZoneManager(project_dir / "config", project_dir / "AUDIO")
+
+    print("🔊 Dispositivos de saída disponíveis:")
+    for device_id, description in manager.shared_resources.list_output_devices():
+        print(f"   {device_id}: {description}")
+
+    if not manager.load_zones():
+        print(f"Configure as zonas em {manager.zones_file}")
+        manager.cleanup()
+        return
+
+    manager.start_all()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n⏹️ Encerrando zonas...")
+    finally:
+        manager.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+Testes do log de veiculação: encerramento da thread de gravação e
+reproduções registradas depois da compactação do dia.
+"""
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from services.as_run_log import AsRunLog
+
+
+Ticket = namedtuple('Ticket', ['message_id', 'filename', 'priority', 'scheduled_time'])
+
+
+class AsRunLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log_dir = Path(tempfile.mkdtemp())
+        self.log = AsRunLog(self.log_dir)
+        self.yesterday = datetime.combine(date.today() - timedelta(days=1),
+                                          datetime.min.time()) + timedelta(hours=10)
+
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _play(self, message_id, started_at, seconds=30):
+        ticket = Ticket(message_id, "a.mp3", 1, None)
+        self.log.record_start(ticket, started_at)
+        self.log.record_end(ticket, started_at + timedelta(seconds=seconds))
+
+    def test_close_stops_writer_and_saves_open_plays(self):
+        self.log.record_start(Ticket("m1", "a.mp3", 1, None), datetime.now())
+        self.log.close()
+
+        self.assertFalse(self.log._open_writer.is_alive())
+        with open(self.log.open_path, 'r', encoding='utf-8') as f:
+            self.assertEqual([data['filename'] for data in json.load(f)], ["a.mp3"])
+
+    def test_late_entry_is_appended_to_compacted_day(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(3):
+                self._play(f"m{i}", self.yesterday + timedelta(minutes=i))
+            self.log._close_file()
+            self.log._close_day(self.yesterday.date())
+
+            self._play("late", self.yesterday + timedelta(hours=5))
+            self.assertEqual(self.log.count_plays("a.mp3"), 4)
+
+            self.log._close_file()
+            self.log._close_day(self.yesterday.date())
+
+        self.assertEqual(self.log.count_plays("a.mp3"), 4)
+        self.assertEqual(len(self.log.get_plays("a.mp3")), 4)
+        self.assertEqual(self.log._index[self.yesterday.date().isoformat()], {"a.mp3": 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
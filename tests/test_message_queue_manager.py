@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+Testes da espera do loop do MessageQueueManager durante a reprodução.
+"""
+
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from services.message_queue_manager import MessageQueueManager
+from services.queue_service import QueueService
+
+
+class _MicPlayer:
+    """Player mínimo: com o microfone ativo a mensagem nunca termina (como o PlayerService)."""
+
+    def __init__(self):
+        self.end_time = None
+        self.mic_active = False
+        self.radio_player = None
+
+    def is_media_ended(self):
+        # Os testes só usam o microfone ativo ou o fim ainda não alcançado
+        return False
+
+
+class PlaybackWaitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.queue_service = QueueService(self.temp_dir / "queue_state.json")
+            self.player = _MicPlayer()
+            self.manager = MessageQueueManager(self.queue_service, self.player)
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.queue_service.cleanup()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_overdue_message_with_mic_active_does_not_spin(self):
+        self.manager.current_playing_message = object()
+        self.player.mic_active = True
+        self.player.end_time = self.manager.clock.now() - timedelta(seconds=5)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            timeout = self.manager.run_once()
+
+        self.assertIsNotNone(self.manager.current_playing_message)
+        self.assertGreaterEqual(timeout, self.manager.overdue_check_interval)
+
+    def test_wakes_before_predicted_end_for_fadeout(self):
+        self.manager.current_playing_message = object()
+        self.player.end_time = self.manager.clock.now() + timedelta(seconds=5)
+
+        timeout = self.manager._next_wait_timeout(self.manager.clock.now())
+
+        self.assertLessEqual(timeout, 5 - self.manager.fadeout_lead_time)
+        self.assertGreater(timeout, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
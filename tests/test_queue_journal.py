@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+Testes do journal da fila: o estado reconstruído na recuperação (compactação
++ eventos reaplicados) deve ser igual ao estado em memória no momento da queda.
+"""
+
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.queue_service import QueueService
+
+
+class QueueJournalReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.queue_file = self.temp_dir / "queue_state.json"
+        self.services = []
+
+    def tearDown(self):
+        for service in self.services:
+            with contextlib.redirect_stdout(io.StringIO()):
+                service.cleanup()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _open(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = QueueService(self.queue_file, journal=True, save_delay=60.0)
+        self.services.append(service)
+        return service
+
+    def _crash(self, service):
+        """Simula a queda do processo: nada de compactação nem save de encerramento."""
+        service._writer.stop(flush=False)
+        service.serializer._close_journal()
+        self.services.remove(service)
+
+    @staticmethod
+    def _state(service):
+        return {message.filename: (message.priority, message.is_pending,
+                                   message.next_play_time.replace(microsecond=0))
+                for message in service.message_queue}
+
+    def _assert_replay_matches(self, service):
+        expected = self._state(service)
+        self._crash(service)
+        recovered = self._open()
+        self.assertEqual(self._state(recovered), expected)
+
+    def test_higher_priority_add_deactivates_others_after_replay(self):
+        service = self._open()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.add_message("b.mp3", 2, 1)
+            service.add_message("a.mp3", 1, 1)
+        self.assertTrue(service.get_message("b.mp3").is_pending)
+        self.assertFalse(service.get_message("a.mp3").is_pending)
+        self._assert_replay_matches(service)
+
+    def test_bulk_add_and_remove_replay(self):
+        service = self._open()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.add_messages([("c.mp3", 3, 5), ("b.mp3", 2, 5)])
+            service.add_messages([("a.mp3", 1, 5), ("d.mp3", 4, 5)])
+            service.remove_message("d.mp3")
+        self._assert_replay_matches(service)
+
+    def test_message_end_replay(self):
+        service = self._open()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.add_messages([("a.mp3", 1, 1), ("b.mp3", 2, 1)])
+            message = service.get_message("a.mp3")
+            message.next_play_time = service.clock.now()
+            service._sync_index(message)
+            ticket = service.issue_next_ticket()
+            service.register_message_start(ticket)
+            service.register_message_end(ticket)
+        self._assert_replay_matches(service)
+
+
+if __name__ == "__main__":
+    unittest.main()
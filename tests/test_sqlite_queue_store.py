@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Testes do histórico de reprodução do armazenamento SQLite.
+"""
+
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.queue_service import QueueService
+
+
+class SQLitePlayHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_file = self.temp_dir / "queue_state.db"
+        self.services = []
+
+    def tearDown(self):
+        for service in self.services:
+            with contextlib.redirect_stdout(io.StringIO()):
+                service.cleanup()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _open(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = QueueService(self.db_file, save_delay=60.0)
+        self.services.append(service)
+        return service
+
+    def _play(self, service, filename, fail=False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            message = service.get_message(filename)
+            message.next_play_time = service.clock.now()
+            message.is_pending = False
+            service._sync_index(message)
+            ticket = service.issue_next_ticket()
+            service.register_message_start(ticket)
+            if fail:
+                service.register_message_failure(ticket)
+            else:
+                service.register_message_end(ticket)
+
+    def test_failed_start_is_not_counted_as_play(self):
+        service = self._open()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.add_message("a.mp3", 1, 1)
+        self._play(service, "a.mp3", fail=True)
+        self._play(service, "a.mp3")
+
+        store = service.serializer
+        self.assertEqual(store.count_plays("a.mp3"), 1)
+        history = store.get_play_history("a.mp3")
+        self.assertEqual(sorted(entry['failed'] for entry in history), [False, True])
+        self.assertTrue(all(entry['ended_at'] is not None for entry in history))
+
+    def test_failed_start_stays_excluded_after_reload(self):
+        service = self._open()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.add_message("a.mp3", 1, 1)
+        self._play(service, "a.mp3", fail=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.cleanup()
+        self.services.remove(service)
+
+        reloaded = self._open()
+        self.assertEqual(reloaded.serializer.count_plays("a.mp3"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,16 @@ Diálogos da interface do usuário para o aplicativo de rádio.
 
 from PyQt6.QtWidgets import (QDialog, QFormLayout, QSpinBox, 
                             QHBoxLayout, QPushButton, QLabel,
-                            QFileDialog, QMessageBox, QVBoxLayout, QListWidget, QListWidgetItem, QComboBox)
-from PyQt6.QtCore import Qt, QPoint
+                            QFileDialog, QMessageBox, QVBoxLayout, QListWidget, QListWidgetItem, QComboBox,
+                            QCheckBox, QTimeEdit, QProgressBar)
+from PyQt6.QtCore import Qt, QPoint, QTime
 from datetime import datetime, timedelta
+from models.daypart_rule import DaypartRule
+from models.import_result import ImportResult
+from services.audio_library import AUDIO_EXTENSIONS
+from services.message_importer import (MessageImporter, collect_sources, can_transcode,
+                                       CONFLICT_RENAME, CONFLICT_REPLACE, CONFLICT_SKIP)
+from ui.service_signal_bridge import ServiceSignalBridge
 
 class MicDeviceDialog(QDialog):
     """
@@ -158,6 +165,50 @@ class AddMessageDialog(QDialog):
         
         layout.addRow("Intervalo de repetição:", interval_layout)
         
+        # Modo de agendamento: intervalo após o término ou horários fixos do relógio
+        self.schedule_mode_combo = QComboBox()
+        self.schedule_mode_combo.addItem("Intervalo após o término", None)
+        self.schedule_mode_combo.addItem("Horário fixo: hora cheia (:00)", 60)
+        self.schedule_mode_combo.addItem("Horário fixo: :00 e :30", 30)
+        self.schedule_mode_combo.addItem("Horário fixo: :00, :15, :30, :45", 15)
+        self.schedule_mode_combo.setToolTip(
+            "Horário fixo toca alinhado ao relógio, independente da duração das mensagens"
+        )
+        self.schedule_mode_combo.currentIndexChanged.connect(self.update_schedule_mode)
+        layout.addRow("Agendamento:", self.schedule_mode_combo)
+        
+        # Dias da semana permitidos (dayparting)
+        self.days_combo = QComboBox()
+        self.days_combo.addItem("Todos os dias", DaypartRule.ALL_DAYS)
+        self.days_combo.addItem("Dias úteis (Seg–Sex)", DaypartRule.WEEKDAYS)
+        self.days_combo.addItem("Fim de semana (Sáb–Dom)", DaypartRule.WEEKEND)
+        self.days_combo.setToolTip("Dias da semana em que a mensagem pode tocar")
+        layout.addRow("Dias:", self.days_combo)
+        
+        # Faixa de horário permitida
+        hours_layout = QHBoxLayout()
+        
+        self.hours_check = QCheckBox("Somente das")
+        self.hours_check.setToolTip("Restringe a mensagem a uma faixa de horário")
+        hours_layout.addWidget(self.hours_check)
+        
+        self.start_time_edit = QTimeEdit(QTime(8, 0))
+        self.start_time_edit.setDisplayFormat("HH:mm")
+        hours_layout.addWidget(self.start_time_edit)
+        
+        hours_layout.addWidget(QLabel("às"))
+        
+        self.end_time_edit = QTimeEdit(QTime(12, 0))
+        self.end_time_edit.setDisplayFormat("HH:mm")
+        hours_layout.addWidget(self.end_time_edit)
+        
+        self.start_time_edit.setEnabled(False)
+        self.end_time_edit.setEnabled(False)
+        self.hours_check.toggled.connect(self.start_time_edit.setEnabled)
+        self.hours_check.toggled.connect(self.end_time_edit.setEnabled)
+        
+        layout.addRow("Horário:", hours_layout)
+        
         # Atualiza o display inicialmente
         self.update_interval_display()
         
@@ -196,6 +247,22 @@ class AddMessageDialog(QDialog):
         
         self.setLayout(layout)
     
+    def update_schedule_mode(self):
+        """Habilita o intervalo somente no modo intervalo."""
+        is_interval = self.get_slot_minutes() is None
+        self.interval_spin.setEnabled(is_interval)
+        self.interval_unit_combo.setEnabled(is_interval)
+        self.interval_display.setEnabled(is_interval)
+    
+    def get_slot_minutes(self):
+        """
+        Retorna o período dos horários fixos escolhido.
+        
+        Returns:
+            int: Minutos entre slots fixos ou None no modo intervalo
+        """
+        return self.schedule_mode_combo.currentData()
+    
     def update_interval_display(self):
         """Atualiza o display mostrando o intervalo real."""
         value = self.interval_spin.value()
@@ -226,6 +293,26 @@ class AddMessageDialog(QDialog):
         else:
             return float(interval_value)
         
+    def get_daypart_rules(self):
+        """
+        Retorna as regras de dias/horários escolhidas.
+        
+        Returns:
+            list: Lista de DaypartRule (vazia = sem restrição)
+        """
+        days = self.days_combo.currentData()
+        restrict_hours = self.hours_check.isChecked()
+        
+        if days == DaypartRule.ALL_DAYS and not restrict_hours:
+            return []
+        
+        if restrict_hours:
+            start = self.start_time_edit.time().toPyTime()
+            end = self.end_time_edit.time().toPyTime()
+            return [DaypartRule(days, start, end)]
+        
+        return [DaypartRule(days)]
+        
     def get_interval_unit(self):
         """
         Retorna a unidade de tempo selecionada.
@@ -244,91 +331,248 @@ class AddMessageDialog(QDialog):
 
 class MessageImportDialog(QDialog):
     """
-    Diálogo para importar novas mensagens para a pasta de mensagens.
+    Diálogo para importar mensagens para a pasta de mensagens.
+    Aceita vários arquivos e pastas inteiras; a importação roda em segundo
+    plano (MessageImporter), com progresso e cancelamento.
     """
     
-    def __init__(self, messages_path, parent=None):
+    STATUS_ICONS = {
+        ImportResult.IMPORTED: "✅",
+        ImportResult.DUPLICATE: "♻",
+        ImportResult.SKIPPED: "⏭",
+        ImportResult.FAILED: "❌",
+        ImportResult.CANCELLED: "⏹",
+    }
+    
+    def __init__(self, messages_path, parent=None, library=None, scanner=None):
         """
         Inicializa o diálogo de importação.
         
         Args:
             messages_path (Path): Caminho para a pasta de mensagens
             parent: Widget pai
+            library (AudioLibrary): Biblioteca da pasta (padrão: a compartilhada)
+            scanner (LibraryScanner): Analisador de metadados da biblioteca
         """
         super().__init__(parent)
-        self.setWindowTitle("Importar Mensagem")
+        self.setWindowTitle("Importar Mensagens")
         self.setModal(True)
+        self.setMinimumWidth(520)
         
         self.messages_path = messages_path
+        self.library = library
+        self.scanner = scanner
+        self.results = []
+        
+        self._items = {}  # caminho de origem -> item da lista
+        self._importer = None
+        self._bridge = None
+        self._close_when_done = False
         
         self.init_ui()
     
     def init_ui(self):
         """Inicializa a interface do diálogo."""
-        layout = QFormLayout()
+        layout = QVBoxLayout()
         
         # Mensagem informativa
-        info_label = QLabel("Selecione um arquivo de áudio para importar para a pasta de mensagens:")
+        info_label = QLabel("Selecione arquivos de áudio ou pastas para importar para a pasta de mensagens:")
         info_label.setWordWrap(True)
-        layout.addRow(info_label)
+        layout.addWidget(info_label)
+        
+        # Seleção
+        select_layout = QHBoxLayout()
+        
+        files_button = QPushButton("Adicionar arquivos...")
+        files_button.clicked.connect(self.browse_files)
+        
+        folder_button = QPushButton("Adicionar pasta...")
+        folder_button.clicked.connect(self.browse_folder)
+        
+        clear_button = QPushButton("Limpar")
+        clear_button.clicked.connect(self.clear_sources)
+        
+        select_layout.addWidget(files_button)
+        select_layout.addWidget(folder_button)
+        select_layout.addWidget(clear_button)
+        layout.addLayout(select_layout)
+        self._selection_buttons = [files_button, folder_button, clear_button]
+        
+        self.files_list = QListWidget()
+        layout.addWidget(self.files_list)
+        
+        # Opções
+        self.transcode_check = QCheckBox("Converter AAC/M4A/FLAC para WAV (reprodução sem decodificação)")
+        if not can_transcode():
+            self.transcode_check.setEnabled(False)
+            self.transcode_check.setToolTip("Disponível com o mixer de áudio inicializado")
+        layout.addWidget(self.transcode_check)
+        
+        conflict_layout = QHBoxLayout()
+        conflict_layout.addWidget(QLabel("Se já existir um arquivo com o mesmo nome:"))
+        self.conflict_combo = QComboBox()
+        self.conflict_combo.addItem("Renomear", CONFLICT_RENAME)
+        self.conflict_combo.addItem("Substituir", CONFLICT_REPLACE)
+        self.conflict_combo.addItem("Ignorar", CONFLICT_SKIP)
+        conflict_layout.addWidget(self.conflict_combo)
+        layout.addLayout(conflict_layout)
+        
+        # Progresso
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+        
+        self.status_label = QLabel("Nenhum arquivo selecionado")
+        self.status_label.setStyleSheet("color: gray; font-style: italic;")
+        layout.addWidget(self.status_label)
         
         # Botões
         button_layout = QHBoxLayout()
         
-        browse_button = QPushButton("Procurar...")
-        browse_button.clicked.connect(self.browse_files)
+        self.import_button = QPushButton("Importar")
+        self.import_button.setEnabled(False)
+        self.import_button.clicked.connect(self.start_import)
         
-        cancel_button = QPushButton("Cancelar")
-        cancel_button.clicked.connect(self.reject)
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.clicked.connect(self.reject)
         
-        button_layout.addWidget(browse_button)
-        button_layout.addWidget(cancel_button)
-        layout.addRow(button_layout)
+        button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
         
         self.setLayout(layout)
     
     def browse_files(self):
-        """Abre o diálogo de seleção de arquivo e importa o arquivo selecionado."""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Abre o diálogo de seleção de arquivos (um ou vários)."""
+        patterns = " ".join(f"*{extension}" for extension in AUDIO_EXTENSIONS)
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Selecionar Arquivo de Áudio",
+            "Selecionar Arquivos de Áudio",
             "",
-            "Arquivos de Áudio (*.mp3 *.wav *.aac *.ogg)"
+            f"Arquivos de Áudio ({patterns})"
         )
-        
-        if file_path:
-            try:
-                from pathlib import Path
-                src_path = Path(file_path)
-                dst_path = self.messages_path / src_path.name
-                
-                # Verifica se o arquivo já existe
-                if dst_path.exists():
-                    reply = QMessageBox.question(
-                        self,
-                        "Arquivo Existente",
-                        f"O arquivo {src_path.name} já existe. Substituir?",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                        QMessageBox.StandardButton.No
-                    )
-                    
-                    if reply == QMessageBox.StandardButton.No:
-                        return
-                
-                # Copia o arquivo
-                import shutil
-                shutil.copy2(src_path, dst_path)
-                
-                QMessageBox.information(
-                    self,
-                    "Importação Concluída",
-                    f"Arquivo {src_path.name} importado com sucesso!"
-                )
-                
-                self.accept()
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Erro",
-                    f"Erro ao importar arquivo: {str(e)}"
-                )
\ No newline at end of file
+        if file_paths:
+            self._add_sources(file_paths)
+    
+    def browse_folder(self):
+        """Abre o diálogo de seleção de pasta (importa os áudios da pasta e subpastas)."""
+        folder = QFileDialog.getExistingDirectory(self, "Selecionar Pasta")
+        if folder:
+            self._add_sources([folder])
+    
+    def clear_sources(self):
+        """Esvazia a lista de arquivos a importar."""
+        self.files_list.clear()
+        self._items.clear()
+        self._update_selection_status()
+    
+    def _add_sources(self, paths):
+        """Acrescenta à lista os arquivos de áudio encontrados na seleção."""
+        for source in collect_sources(paths):
+            if source in self._items:
+                continue
+            item = QListWidgetItem(source.name)
+            item.setToolTip(str(source))
+            self._items[source] = item
+            self.files_list.addItem(item)
+        self._update_selection_status()
+    
+    def _update_selection_status(self):
+        count = len(self._items)
+        self.import_button.setEnabled(count > 0)
+        self.progress_bar.setValue(0)
+        if count:
+            self.status_label.setText(f"{count} arquivo(s) para importar")
+        else:
+            self.status_label.setText("Nenhum arquivo de áudio selecionado")
+    
+    def start_import(self):
+        """Inicia a importação em segundo plano."""
+        sources = list(self._items)
+        if not sources or self._importer is not None:
+            return
+        
+        for widget in self._selection_buttons + [self.import_button, self.transcode_check,
+                                                 self.conflict_combo]:
+            widget.setEnabled(False)
+        self.progress_bar.setRange(0, len(sources))
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Importando...")
+        
+        # Os callbacks chegam nas threads do importador: a ponte entrega na thread da interface
+        self._bridge = ServiceSignalBridge(self)
+        self._importer = MessageImporter(
+            self.messages_path,
+            library=self.library,
+            scanner=self.scanner,
+            transcode=self.transcode_check.isChecked(),
+            on_conflict=self.conflict_combo.currentData()
+        )
+        self._importer.start(
+            sources,
+            progress_callback=lambda done, total, result: self._bridge.post(
+                self._on_progress, done, total, result),
+            finished_callback=lambda results: self._bridge.post(self._on_finished, results)
+        )
+    
+    def _on_progress(self, done, total, result):
+        """Atualiza a barra e o item do arquivo concluído."""
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"{done} de {total}: {result.source.name}")
+        
+        item = self._items.get(result.source)
+        if item is not None:
+            text = f"{self.STATUS_ICONS.get(result.status, '')} {result.source.name}"
+            if result.name and result.name != result.source.name:
+                text += f" → {result.name}"
+            if result.error:
+                text += f" ({result.error})"
+            item.setText(text)
+            self.files_list.scrollToItem(item)
+    
+    def _on_finished(self, results):
+        """Mostra o resumo da importação."""
+        self.results = results
+        self._bridge.close()
+        
+        imported = sum(1 for result in results if result.imported)
+        others = {}
+        for result in results:
+            if not result.imported:
+                others[result.status] = others.get(result.status, 0) + 1
+        
+        summary = f"{imported} arquivo(s) importado(s)"
+        labels = {
+            ImportResult.DUPLICATE: "duplicado(s)",
+            ImportResult.SKIPPED: "ignorado(s)",
+            ImportResult.FAILED: "com erro",
+            ImportResult.CANCELLED: "cancelado(s)",
+        }
+        for status, label in labels.items():
+            if others.get(status):
+                summary += f", {others[status]} {label}"
+        
+        self.status_label.setText(summary)
+        self.status_label.setStyleSheet("color: green; font-weight: bold;" if imported
+                                        else "color: orange; font-weight: bold;")
+        self.cancel_button.setText("Fechar")
+        self.cancel_button.setEnabled(True)
+        
+        if self._close_when_done:
+            self.done(QDialog.DialogCode.Accepted if imported else QDialog.DialogCode.Rejected)
+        elif imported and not others:
+            QMessageBox.information(self, "Importação Concluída", summary)
+            self.accept()
+    
+    def reject(self):
+        """Cancelar/Fechar: durante a importação, cancela e fecha quando os arquivos em andamento pararem."""
+        if self._importer is not None and self._importer.running:
+            self._importer.cancel()
+            self._close_when_done = True
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+            return
+        if any(result.imported for result in self.results):
+            self.accept()  # a biblioteca mudou: a janela principal atualiza a lista
+            return
+        super().reject()
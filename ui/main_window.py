@@ -10,15 +10,21 @@ import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                            QLabel, QPushButton, QListWidget,
-                            QTableWidget, QTableWidgetItem, QHeaderView,
-                            QMessageBox, QFileDialog, QMenu,QApplication)
+                            QLabel, QPushButton, QListWidget, QListWidgetItem,
+                            QTableView, QAbstractItemView, QHeaderView,
+                            QMessageBox, QFileDialog, QMenu, QApplication, QComboBox, QCheckBox)
 from PyQt6.QtCore import Qt, QTimer, QSize, QPoint
 from PyQt6.QtGui import QFont, QIcon, QAction, QColor
 
+from services.as_run_log import AsRunLog
+from services.audio_library import get_audio_library
+from services.library_scanner import LibraryScanner
 from services.player_service import PlayerService
 from services.queue_service import QueueService
+from services.rotation_engine import ROTATION_POLICIES
 from ui.dialogs import AddMessageDialog, MessageImportDialog
+from ui.queue_table_model import QueueTableModel
+from ui.service_signal_bridge import ServiceSignalBridge
 
 
 # Importação condicional para evitar erro se não existir
@@ -94,25 +100,41 @@ class RadioPlayerWindow(QMainWindow):
         
         # Inicializa serviços
         self.player_service = PlayerService(self.config_dir, self.messages_path)
-        self.queue_service = QueueService(self.queue_file_path)  # Passa o caminho para persistência
+        self.as_run_log = AsRunLog(self.queue_file_path.parent / "as_run")
+        self.queue_service = QueueService(self.queue_file_path, journal=True,
+                                          as_run_log=self.as_run_log)  # Passa o caminho para persistência
         
         # Configura a interface - DEVE SER EXECUTADO ANTES de load_messages()
         self.init_ui()
         
-        # Configurar o callback para atualizar a interface
-        self.queue_service.update_callback = self.update_queue_table
-        
-        # MODIFICADO: Timer de atualização mais rápido para tempo real
-        self.update_timer = QTimer()
-        self.update_timer.setInterval(250)  # 100ms = 10x por segundo para atualização suave
-        self.update_timer.timeout.connect(self.update_status)
-        self.update_timer.start()
-        
-        # Timer específico para atualização da tabela (ainda mais frequente)
-        self.table_timer = QTimer()
-        self.table_timer.setInterval(500)  # 200ms = 5x por segundo só para a tabela
-        self.table_timer.timeout.connect(self.update_queue_table_realtime)
-        self.table_timer.start()
+        # Ponte de sinais: os serviços avisam mudanças (de qualquer thread) e a
+        # interface é atualizada na thread do Qt, uma vez por rajada de avisos
+        self.signal_bridge = ServiceSignalBridge(self)
+        self.signal_bridge.queue_changed.connect(self.update_queue_table)
+        self.signal_bridge.player_changed.connect(self.update_status)
+        self.signal_bridge.watch_queue(self.queue_service)
+        self.signal_bridge.watch_player(self.player_service)
+        
+        # Avisos gravados prontos (preenchida pelo trabalhador da gravação,
+        # consumida na thread da interface via signal_bridge.post)
+        self._completed_recordings = []
+        
+        # Biblioteca da pasta AUDIO: índice em memória com alterações incrementais
+        self.library = get_audio_library(self.messages_path)
+        self._message_items = {}  # nome do arquivo -> item da lista de mensagens
+        self._library_loaded = False
+        self.library.add_listener(self._on_library_changed)
+        
+        # Metadados dos arquivos (duração, formato, nível), analisados em segundo plano
+        self.library_scanner = LibraryScanner(self.library, self.config_dir / "library_metadata.json")
+        self.library_scanner.add_listener(self._on_metadata_ready)
+        
+        # Único timer restante: contagem regressiva da fila (1 Hz)
+        self.countdown_timer = QTimer()
+        self.countdown_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.countdown_timer.setInterval(1000)
+        self.countdown_timer.timeout.connect(self.update_queue_table_realtime)
+        self.countdown_timer.start()
 
          # Inicializa o gerenciador da fila
         from services.message_queue_manager import MessageQueueManager
@@ -124,9 +146,12 @@ class RadioPlayerWindow(QMainWindow):
         
         # Carrega a lista de mensagens - DEVE SER EXECUTADO APÓS init_ui()
         self.load_messages()
+        self.library.start_watching()
+        self.library_scanner.start()
         
-        # Atualiza a tabela da fila para mostrar as mensagens carregadas
+        # Atualiza a tabela e o status com o estado inicial
         self.update_queue_table()
+        self.update_status()
 
     def safe_update_status(self):
         """
@@ -156,75 +181,15 @@ class RadioPlayerWindow(QMainWindow):
 
     def update_queue_table_realtime(self):
         """
-        Atualização em tempo real apenas da coluna de tempo - VERSÃO CORRIGIDA.
+        Atualização em tempo real: aplica a fotografia nova da fila, se houver,
+        ou só a contagem regressiva (o modelo notifica apenas as células alteradas).
         """
-        # Verificar se estamos fechando ou se a tabela está sendo modificada
-        if self._is_closing or not hasattr(self, 'queue_table'):
-            return
-            
-        if self.queue_table.rowCount() == 0:
+        if self._is_closing or not hasattr(self, 'queue_model'):
             return
         
-        # Usar blockSignals para evitar eventos durante atualização
-        self.queue_table.blockSignals(True)
-        
-        try:
-            items = self.queue_service.get_queue_items()
-            if not items or len(items) != self.queue_table.rowCount():
-                # Se a estrutura mudou, faz atualização completa
-                self.update_queue_table()
-                return
-            
-            current_time = datetime.now()
-            
-            # Atualiza apenas a coluna de tempo (coluna 3)
-            for i, message in enumerate(items):
-                if i >= self.queue_table.rowCount():
-                    break
-                    
-                delta = message.next_play_time - current_time
-                delta_seconds = delta.total_seconds()
-                
-                # Cria o item de status atualizado
-                if message.is_pending:
-                    status_text = "⏳ Aguardando vez"
-                    color = QColor(128, 128, 128)  # Cinza
-                elif delta_seconds <= 0:
-                    # Já passou da hora ou está na hora
-                    if abs(delta_seconds) < 5:  # Dentro de 5 segundos
-                        status_text = "🔴 TOCANDO AGORA!"
-                        color = QColor(255, 0, 0)  # Vermelho
-                    else:
-                        status_text = "🟢 PRONTA!"
-                        color = QColor(0, 180, 0)  # Verde
-                else:
-                    # Ainda não chegou a hora - CONTAGEM REGRESSIVA
-                    if delta_seconds < 60:
-                        # Menos de 1 minuto - só segundos
-                        time_str = f"⏰ {int(delta_seconds)}s"
-                        color = QColor(255, 140, 0)  # Laranja
-                    elif delta_seconds < 3600:
-                        # Menos de 1 hora - minutos e segundos
-                        minutes = int(delta_seconds // 60)
-                        seconds = int(delta_seconds % 60)
-                        time_str = f"⏰ {minutes}m {seconds}s"
-                        color = QColor(0, 100, 255)  # Azul
-                    else:
-                        # Mais de 1 hora - só horário
-                        time_str = f"🕐 {message.next_play_time.strftime('%H:%M:%S')}"
-                        color = QColor(100, 100, 100)  # Cinza escuro
-                    
-                    status_text = time_str
-                
-                # Atualiza apenas se o texto mudou (otimização)
-                current_item = self.queue_table.item(i, 3)
-                if current_item and current_item.text() != status_text:
-                    current_item.setText(status_text)
-                    current_item.setForeground(color)
-                    
-        finally:
-            # Sempre reativar sinais
-            self.queue_table.blockSignals(False)
+        # Fotografia imutável da fila: leitura sem lock e sem concorrência com o gerenciador
+        if not self.queue_model.set_snapshot(self.queue_service.snapshot):
+            self.queue_model.tick()
     
     def init_ui(self):
         """Inicializa a interface da janela principal."""
@@ -297,7 +262,8 @@ class RadioPlayerWindow(QMainWindow):
         
         # Lista de mensagens
         self.messages_list = QListWidget()
-        self.messages_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.messages_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.messages_list.setSortingEnabled(True)  # inserções incrementais já entram ordenadas
         self.messages_list.itemDoubleClicked.connect(self.play_selected_message)
         messages_panel.addWidget(self.messages_list)
         
@@ -318,6 +284,12 @@ class RadioPlayerWindow(QMainWindow):
         import_button.clicked.connect(self.import_message)
         messages_buttons.addWidget(import_button)
         
+        # Grava um aviso pelo microfone direto na pasta AUDIO
+        self.record_button = QPushButton("⏺ Gravar Aviso")
+        self.record_button.setToolTip("Grava um aviso pelo microfone como nova mensagem")
+        self.record_button.clicked.connect(self.toggle_recording)
+        messages_buttons.addWidget(self.record_button)
+        
         remove_file_button = QPushButton("Remover Arquivo")
         remove_file_button.clicked.connect(self.remove_message_file)
         messages_buttons.addWidget(remove_file_button)
@@ -348,12 +320,10 @@ class RadioPlayerWindow(QMainWindow):
         queue_panel.addWidget(QLabel("Fila de Reprodução:"))
         
         # CORRIGIDO: Configuração aprimorada da tabela
-        self.queue_table = QTableWidget()
-        self.queue_table.setColumnCount(4)
-
-        # Define os cabeçalhos das colunas
-        headers = ["Arquivo", "Prioridade", "Intervalo", "Próxima Execução"]
-        self.queue_table.setHorizontalHeaderLabels(headers)
+        # Model/view: o modelo notifica a tabela só das células que mudaram
+        self.queue_model = QueueTableModel(self)
+        self.queue_table = QTableView()
+        self.queue_table.setModel(self.queue_model)
 
         # NOVA ABORDAGEM: Configuração mais inteligente das colunas
         header = self.queue_table.horizontalHeader()
@@ -376,7 +346,8 @@ class RadioPlayerWindow(QMainWindow):
 
         # MELHORIAS: Configurações visuais e funcionais
         self.queue_table.setAlternatingRowColors(True)
-        self.queue_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.queue_table.verticalHeader().setVisible(False)
 
         # Altura adequada do cabeçalho
@@ -415,6 +386,17 @@ class RadioPlayerWindow(QMainWindow):
         clear_queue_button.clicked.connect(self.clear_queue)
         queue_buttons.addWidget(clear_queue_button)
         
+        # Política de rotação da fila
+        queue_buttons.addWidget(QLabel("Rotação:"))
+        self.rotation_combo = QComboBox()
+        for name, policy in ROTATION_POLICIES.items():
+            self.rotation_combo.addItem(policy.description, name)
+        self.rotation_combo.setCurrentIndex(
+            self.rotation_combo.findData(self.queue_service.rotation_policy))
+        self.rotation_combo.setToolTip("Como a próxima mensagem é escolhida após cada término")
+        self.rotation_combo.currentIndexChanged.connect(self.change_rotation_policy)
+        queue_buttons.addWidget(self.rotation_combo)
+        
         queue_panel.addLayout(queue_buttons)
         
         central_layout.addLayout(queue_panel)
@@ -449,11 +431,28 @@ class RadioPlayerWindow(QMainWindow):
 
         fade_layout.addStretch()
 
+        # VOX: a voz no microfone abaixa a rádio e as mensagens automaticamente
+        self.vox_checkbox = QCheckBox("🎙️ VOX")
+        self.vox_checkbox.setToolTip("Abaixa o áudio automaticamente enquanto alguém fala no microfone")
+        self.vox_checkbox.toggled.connect(self.toggle_vox)
+        fade_layout.addWidget(self.vox_checkbox)
+
         main_layout.addLayout(fade_layout)
         
         # Define o layout na janela principal
         central_widget.setLayout(main_layout)
 
+    def toggle_vox(self, checked):
+        """Liga ou desliga o VOX no player."""
+        enabled = self.player_service.set_vox_enabled(checked)
+        if enabled != checked:
+            self.vox_checkbox.blockSignals(True)
+            self.vox_checkbox.setChecked(enabled)
+            self.vox_checkbox.blockSignals(False)
+            QMessageBox.warning(self, "VOX", "Não foi possível abrir o microfone para o VOX")
+        else:
+            self.status_label.setText(f"VOX {'ativado' if enabled else 'desativado'}")
+
     def apply_fade_preset(self, preset_name):
         """Aplica preset de fade."""
         if hasattr(self, 'queue_manager') and hasattr(self.queue_manager, 'fade_manager'):
@@ -468,7 +467,7 @@ class RadioPlayerWindow(QMainWindow):
             Otimiza automaticamente o tamanho das colunas baseado no conteúdo.
             Chama este método após preencher a tabela.
             """
-            if self.queue_table.rowCount() == 0:
+            if self.queue_model.rowCount() == 0:
                 return
                 
             # Ajusta a coluna "Arquivo" para o conteúdo
@@ -577,9 +576,11 @@ class RadioPlayerWindow(QMainWindow):
         )
     
     def load_messages(self):
-        """Carrega a lista de mensagens da pasta AUDIO."""
-        self.messages_list.clear()
-        
+        """
+        Carrega a lista de mensagens da pasta AUDIO.
+        Na primeira vez preenche a lista com o índice da biblioteca; depois
+        apenas confere a pasta e aplica as diferenças encontradas.
+        """
         try:
             # Verifica se a pasta AUDIO existe
             if not self.messages_path.exists():
@@ -589,46 +590,13 @@ class RadioPlayerWindow(QMainWindow):
                 # Cria arquivo de exemplo/instruções
                 self.create_audio_folder_info()
             
-            # Extensões de áudio suportadas
-            audio_extensions = ['.mp3', '.wav', '.aac', '.ogg', '.flac', '.m4a']
-            found_files = []
-            
-            print(f"Procurando arquivos de áudio em: {self.messages_path}")
-            
-            # Busca por arquivos de áudio
-            for ext in audio_extensions:
-                # Minúscula
-                for file in self.messages_path.glob(f"*{ext}"):
-                    if file.is_file():
-                        found_files.append(file)
-                        self.messages_list.addItem(file.name)
-                
-                # Maiúscula
-                for file in self.messages_path.glob(f"*{ext.upper()}"):
-                    if file.is_file() and file not in found_files:
-                        found_files.append(file)
-                        self.messages_list.addItem(file.name)
-            
-            # Ordena por nome
-            self.messages_list.sortItems()
-            
-            # Atualiza o label de contagem
-            if found_files:
-                self.file_count_label.setText(f"📊 {len(found_files)} arquivo(s) encontrado(s)")
-                self.file_count_label.setStyleSheet("color: green; font-weight: bold;")
-                print(f"✅ {len(found_files)} arquivo(s) de áudio carregado(s)")
-                
-                # Lista os primeiros arquivos encontrados
-                print("Arquivos encontrados:")
-                for i, file in enumerate(found_files[:5], 1):
-                    print(f"  {i}. {file.name}")
-                if len(found_files) > 5:
-                    print(f"  ... e mais {len(found_files) - 5} arquivo(s)")
+            if not self._library_loaded:
+                self._library_loaded = True
+                self.messages_list.clear()
+                self._message_items.clear()
+                self._apply_library_changes(self.library.entries(), [], [])
             else:
-                self.file_count_label.setText("📂 Pasta vazia - Adicione arquivos de áudio")
-                self.file_count_label.setStyleSheet("color: orange; font-style: italic;")
-                print(f"⚠ Nenhum arquivo de áudio encontrado em: {self.messages_path}")
-                print("Extensões suportadas: .mp3, .wav, .aac, .ogg, .flac, .m4a")
+                self._apply_library_changes(*self.library.scan())
                 
         except Exception as e:
             error_msg = f"Erro ao carregar mensagens: {str(e)}"
@@ -637,6 +605,87 @@ class RadioPlayerWindow(QMainWindow):
             self.file_count_label.setStyleSheet("color: red; font-weight: bold;")
             QMessageBox.warning(self, "Erro", error_msg)
     
+    def _on_library_changed(self, added, removed, modified):
+        """Callback da biblioteca (pode vir de outra thread): aplica na thread da interface."""
+        self.signal_bridge.post(self._apply_library_changes, added, removed, modified)
+    
+    def _apply_library_changes(self, added, removed, modified):
+        """
+        Aplica à lista de mensagens as diferenças da biblioteca.
+        Idempotente: a mesma diferença pode chegar pela varredura direta e pelo callback.
+        
+        Args:
+            added (list): LibraryEntry adicionadas
+            removed (list): LibraryEntry removidas
+            modified (list): LibraryEntry modificadas
+        """
+        if self._is_closing:
+            return
+        
+        for entry in removed:
+            item = self._message_items.pop(entry.name, None)
+            if item is not None:
+                self.messages_list.takeItem(self.messages_list.row(item))
+        
+        for entry in added:
+            if entry.name not in self._message_items:
+                item = QListWidgetItem()
+                item.setData(Qt.ItemDataRole.UserRole, entry.name)
+                self._message_items[entry.name] = item
+                self._apply_metadata(entry.name)
+                self.messages_list.addItem(item)
+        
+        for entry in modified:
+            self._apply_metadata(entry.name)
+        
+        self._update_file_count()
+    
+    def _on_metadata_ready(self, name, metadata):
+        """Callback do analisador (thread do pool): atualiza o item na thread da interface."""
+        self.signal_bridge.post(self._apply_metadata, name)
+    
+    def _apply_metadata(self, name):
+        """
+        Mostra no item da lista os metadados atuais do arquivo
+        (ou o marcador de análise pendente).
+        
+        Args:
+            name (str): Nome do arquivo
+        """
+        item = self._message_items.get(name)
+        if item is None or self._is_closing:
+            return
+        
+        metadata = self.library_scanner.get(name)
+        if metadata is None:
+            item.setText(f"{name}   ⏳")
+            item.setToolTip("Analisando arquivo...")
+            item.setData(Qt.ItemDataRole.ForegroundRole, None)
+        elif metadata.valid:
+            peak = "?" if metadata.peak_db is None else f"{metadata.peak_db:.1f}"
+            item.setText(f"{name}   ({metadata.describe()})")
+            item.setToolTip(f"{metadata.channels or '?'} canal(is) · pico {peak} dBFS")
+            item.setData(Qt.ItemDataRole.ForegroundRole, None)
+        else:
+            item.setText(f"{name}   {metadata.describe()}")
+            item.setToolTip(f"Arquivo inválido: {metadata.error}")
+            item.setForeground(QColor(200, 0, 0))
+    
+    @staticmethod
+    def _message_filename(item):
+        """Nome do arquivo de um item da lista de mensagens (o texto inclui os metadados)."""
+        return item.data(Qt.ItemDataRole.UserRole)
+    
+    def _update_file_count(self):
+        """Atualiza o label de contagem de arquivos."""
+        count = len(self._message_items)
+        if count:
+            self.file_count_label.setText(f"📊 {count} arquivo(s) encontrado(s)")
+            self.file_count_label.setStyleSheet("color: green; font-weight: bold;")
+        else:
+            self.file_count_label.setText("📂 Pasta vazia - Adicione arquivos de áudio")
+            self.file_count_label.setStyleSheet("color: orange; font-style: italic;")
+    
     def create_audio_folder_info(self):
         """Cria um arquivo informativo na pasta AUDIO se ela estiver vazia."""
         try:
@@ -720,8 +769,11 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
     def update_status(self):
         """
         Atualiza o status do player.
-        OTIMIZADO: Separou a atualização da tabela para ser mais eficiente.
+        Chamado pelo sinal player_changed (apenas quando o estado muda).
         """
+        if self._is_closing:
+            return
+        
         # Atualiza estado do player
         state = self.player_service.get_state()
         self.status_label.setText(f"Status: {state}")
@@ -747,113 +799,19 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
 
     def update_queue_table(self):
         """
-        Atualização completa da tabela da fila - VERSÃO CORRIGIDA.
+        Atualiza a tabela da fila com a última fotografia publicada.
         """
         # Verificar se estamos fechando
-        if self._is_closing or not hasattr(self, 'queue_table'):
+        if self._is_closing or not hasattr(self, 'queue_model'):
             return
-            
-        items = self.queue_service.get_queue_items()
         
-        # Usar blockSignals durante atualização completa
-        self.queue_table.blockSignals(True)
+        self.queue_model.set_snapshot(self.queue_service.snapshot)
         
-        try:
-            if not items:
-                # Limpa a tabela se não houver itens
-                self.queue_table.setRowCount(0)
-                return
-            
-            # Define o número de linhas da tabela
-            self.queue_table.setRowCount(len(items))
-            
-            # Hora atual para cálculos
-            current_time = datetime.now()
-            
-            # Preenche a tabela com informações atualizadas
-            for i, message in enumerate(items):
-                # Coluna Arquivo - NOME COMPLETO
-                file_item = QTableWidgetItem(message.filename)
-                # Destaca mensagens ativas com negrito
-                if not message.is_pending:
-                    font = file_item.font()
-                    font.setBold(True)
-                    file_item.setFont(font)
-                    file_item.setForeground(QColor(0, 100, 0))  # Verde escuro
-                # Tooltip com nome completo
-                file_item.setToolTip(f"📁 {message.filename}")
-                self.queue_table.setItem(i, 0, file_item)
-                
-                # Coluna Prioridade
-                priority_item = QTableWidgetItem(f"P{message.priority}")
-                # Cor baseada na prioridade
-                if message.priority == 1:
-                    priority_item.setForeground(QColor(255, 0, 0))  # Vermelho para P1
-                elif message.priority == 2:
-                    priority_item.setForeground(QColor(255, 140, 0))  # Laranja para P2
-                else:
-                    priority_item.setForeground(QColor(0, 100, 255))  # Azul para P3+
-                self.queue_table.setItem(i, 1, priority_item)
-                
-                # Coluna Intervalo
-                if message.interval < 1.0:
-                    seconds = int(message.interval * 60)
-                    interval_text = f"{seconds} seg"
-                else:
-                    minutes = round(message.interval)
-                    interval_text = f"{minutes} min"
-                interval_item = QTableWidgetItem(interval_text)
-                self.queue_table.setItem(i, 2, interval_item)
-                
-                # Coluna Próxima Execução - COM CONTAGEM REGRESSIVA
-                delta = message.next_play_time - current_time
-                delta_seconds = delta.total_seconds()
-                
-                if message.is_pending:
-                    status_text = "⏳ Aguardando vez"
-                    color = QColor(128, 128, 128)  # Cinza
-                elif delta_seconds <= 0:
-                    # Já passou da hora ou está na hora
-                    if abs(delta_seconds) < 5:  # Dentro de 5 segundos
-                        status_text = "🔴 TOCANDO AGORA!"
-                        color = QColor(255, 0, 0)  # Vermelho
-                    else:
-                        status_text = "🟢 PRONTA!"
-                        color = QColor(0, 180, 0)  # Verde
-                else:
-                    # Ainda não chegou a hora - CONTAGEM REGRESSIVA
-                    if delta_seconds < 60:
-                        # Menos de 1 minuto - só segundos
-                        status_text = f"⏰ {int(delta_seconds)}s"
-                        color = QColor(255, 140, 0)  # Laranja
-                    elif delta_seconds < 3600:
-                        # Menos de 1 hora - minutos e segundos
-                        minutes = int(delta_seconds // 60)
-                        seconds = int(delta_seconds % 60)
-                        status_text = f"⏰ {minutes}m {seconds}s"
-                        color = QColor(0, 100, 255)  # Azul
-                    else:
-                        # Mais de 1 hora - só horário
-                        status_text = f"🕐 {message.next_play_time.strftime('%H:%M:%S')}"
-                        color = QColor(100, 100, 100)  # Cinza escuro
-                
-                status_item = QTableWidgetItem(status_text)
-                status_item.setForeground(color)
-                self.queue_table.setItem(i, 3, status_item)
-            
-            # Não chamar optimize_table_columns a cada atualização
-            # Chamar apenas quando necessário (primeira vez ou mudança significativa)
-            if not hasattr(self, '_table_optimized'):
-                self.optimize_table_columns()
-                self._table_optimized = True
-                
-        finally:
-            # Sempre reativar sinais
-            self.queue_table.blockSignals(False)
-            
-        # Usar update() em vez de repaint()
-        self.queue_table.viewport().update()
-
+        # Não chamar optimize_table_columns a cada atualização
+        # Chamar apenas quando necessário (primeira vez com mensagens na fila)
+        if not hasattr(self, '_table_optimized') and self.queue_model.rowCount():
+            self.optimize_table_columns()
+            self._table_optimized = True
 
     def toggle_playback(self):
         """Alterna entre play e pause."""
@@ -881,7 +839,7 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
     def play_selected_message(self, item):
         """Reproduz a mensagem selecionada diretamente."""
         try:
-            filename = item.text()
+            filename = self._message_filename(item)
             success = self.player_service.play_message(filename, None)
             
             if success:
@@ -892,41 +850,67 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
             QMessageBox.warning(self, "Erro", f"Erro ao reproduzir mensagem: {str(e)}")
     
     def add_to_queue(self):
-        """Adiciona a mensagem selecionada à fila."""
-        current_item = self.messages_list.currentItem()
-        if not current_item:
+        """Adiciona as mensagens selecionadas à fila (uma ou várias)."""
+        selected_items = self.messages_list.selectedItems()
+        if not selected_items:
             QMessageBox.warning(self, "Erro", "Selecione uma mensagem para adicionar à fila.")
             return
         
         try:
-            filename = current_item.text()
+            filenames = [self._message_filename(item) for item in selected_items]
             
-            # Verifica duplicatas
-            items = self.queue_service.get_queue_items()
-            for item in items:
-                if item.filename == filename:
-                    QMessageBox.warning(self, "Aviso", 
-                        f"A mensagem '{filename}' já está na fila.")
-                    return
+            # Arquivos que a análise marcou como inválidos falhariam no ar
+            invalid = [name for name in filenames if not self.library_scanner.is_valid(name)]
+            filenames = [name for name in filenames if self.library_scanner.is_valid(name)]
+            if invalid:
+                QMessageBox.warning(self, "Aviso",
+                    "Arquivo(s) inválido(s), não adicionado(s):\n" +
+                    "\n".join(f"{name} ({self.library_scanner.get(name).error})" for name in invalid))
+            
+            # Verifica duplicatas pelo índice da fila (O(1) por arquivo)
+            duplicates = [name for name in filenames if self.queue_service.has_message(name)]
+            filenames = [name for name in filenames if not self.queue_service.has_message(name)]
+            
+            if duplicates:
+                QMessageBox.warning(self, "Aviso", 
+                    "Já está(ão) na fila:\n" + "\n".join(duplicates))
+            if not filenames:
+                return
             
             dialog = AddMessageDialog(self)
             if dialog.exec():
                 priority = dialog.priority_spin.value()
                 interval_minutes = dialog.get_interval_in_minutes()
+                daypart_rules = dialog.get_daypart_rules()
+                slot_minutes = dialog.get_slot_minutes()
                 
-                # Adiciona a mensagem à fila
-                message = self.queue_service.add_message(filename, priority, interval_minutes)
+                # Adiciona as mensagens à fila em lote (salva e notifica uma vez)
+                added = self.queue_service.add_messages(
+                    (filename, priority, interval_minutes, daypart_rules, slot_minutes)
+                    for filename in filenames
+                )
                 
-                if message:
-                    # Mostra informação sobre o agendamento usando o intervalo definido
-                    interval_seconds = int(interval_minutes * 60)
+                if added:
+                    names = ", ".join(f"'{message.filename}'" for message in added)
+                    
+                    if slot_minutes:
+                        # Horário fixo: mostra o primeiro slot alinhado ao relógio
+                        schedule_text = (
+                            f"Primeira execução: {added[0].next_play_time.strftime('%H:%M:%S')}\n"
+                            f"Horários fixos a cada {slot_minutes} minutos"
+                        )
+                    else:
+                        # Mostra informação sobre o agendamento usando o intervalo definido
+                        interval_seconds = int(interval_minutes * 60)
+                        schedule_text = (
+                            f"Primeira execução: em {interval_seconds} segundos\n"
+                            f"Intervalo entre mensagens: {interval_seconds} segundos"
+                        )
                     
                     QMessageBox.information(
                         self,
                         "Mensagem Agendada",
-                        f"Mensagem '{filename}' adicionada à fila!\n\n"
-                        f"Primeira execução: em {interval_seconds} segundos\n"
-                        f"Intervalo entre mensagens: {interval_seconds} segundos"
+                        f"Mensagem(ns) {names} adicionada(s) à fila!\n\n{schedule_text}"
                     )
                     
                     self.update_queue_table()
@@ -938,16 +922,26 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
 
     
     def remove_from_queue(self):
-        """Remove a mensagem selecionada da fila."""
-        current_row = self.queue_table.currentRow()
-        if current_row >= 0:
+        """Remove as mensagens selecionadas da fila."""
+        rows = sorted({index.row() for index in self.queue_table.selectionModel().selectedRows()})
+        if not rows and self.queue_table.currentIndex().isValid():
+            rows = [self.queue_table.currentIndex().row()]
+        
+        if rows:
             try:
-                filename = self.queue_table.item(current_row, 0).text()
-                self.queue_service.remove_message(filename)
+                filenames = [self.queue_model.filename_at(row) for row in rows]
+                self.queue_service.remove_messages(filenames)
                 self.update_queue_table()
             except Exception as e:
                 QMessageBox.warning(self, "Erro", f"Erro ao remover da fila: {str(e)}")
     
+    def change_rotation_policy(self):
+        """Aplica a política de rotação escolhida no combo."""
+        name = self.rotation_combo.currentData()
+        if name and name != self.queue_service.rotation_policy:
+            self.queue_service.set_rotation_policy(name)
+            self.status_label.setText(f"Rotação: {self.rotation_combo.currentText()}")
+    
     def clear_queue(self):
         """Limpa toda a fila de mensagens."""
         reply = QMessageBox.question(
@@ -965,10 +959,51 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
             except Exception as e:
                 QMessageBox.warning(self, "Erro", f"Erro ao limpar fila: {str(e)}")
     
+    def toggle_recording(self):
+        """Inicia ou encerra a gravação de um aviso pelo microfone."""
+        try:
+            microphone = self.player_service.get_microphone_service()
+            if microphone.is_recording:
+                microphone.stop_recording()
+                self.record_button.setText("⏺ Gravar Aviso")
+                self.file_count_label.setText("⏳ Processando aviso gravado...")
+                return
+            
+            path = microphone.start_recording(self.messages_path,
+                                              on_complete=self._recording_finished)
+            if path is None:
+                QMessageBox.warning(self, "Gravação", "Não foi possível iniciar a gravação")
+                return
+            self.record_button.setText("⏹ Parar Gravação")
+            self.file_count_label.setText(f"⏺ Gravando: {path.name}")
+        except Exception as e:
+            QMessageBox.warning(self, "Erro", f"Erro na gravação: {str(e)}")
+    
+    def _recording_finished(self, path):
+        """Callback do trabalhador da gravação (outra thread)."""
+        self._completed_recordings.append(path)
+        self.signal_bridge.post(self._add_recorded_messages)
+    
+    def _add_recorded_messages(self):
+        """Adiciona à lista os avisos gravados, já prontos para entrar na fila."""
+        while self._completed_recordings:
+            path = self._completed_recordings.pop(0)
+            if path is None:
+                self.file_count_label.setText("⚠ Aviso sem voz detectada - descartado")
+                continue
+            
+            # Confere a pasta agora (sem esperar o aviso do observador)
+            self.load_messages()
+            item = self._message_items.get(path.name)
+            if item is not None:
+                self.messages_list.setCurrentItem(item)
+            self.file_count_label.setText(f"✅ Aviso gravado: {path.name}")
+    
     def import_message(self):
         """Abre o diálogo para importar novas mensagens."""
         try:
-            dialog = MessageImportDialog(self.messages_path, self)
+            dialog = MessageImportDialog(self.messages_path, self, library=self.library,
+                                         scanner=self.library_scanner)
             if dialog.exec():
                 self.load_messages()
         except Exception as e:
@@ -981,7 +1016,7 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
             QMessageBox.warning(self, "Erro", "Selecione uma mensagem para remover.")
             return
         
-        filename = current_item.text()
+        filename = self._message_filename(current_item)
         
         reply = QMessageBox.question(
             self,
@@ -1022,14 +1057,21 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
         try:
             print("🔄 Encerrando aplicação...")
             
-            # Para os timers PRIMEIRO
-            if hasattr(self, 'update_timer'):
-                print("⏰ Parando timer principal...")
-                self.update_timer.stop()
+            # Para o timer e desliga a ponte de sinais PRIMEIRO
+            if hasattr(self, 'countdown_timer'):
+                print("⏰ Parando timer da contagem regressiva...")
+                self.countdown_timer.stop()
                 
-            if hasattr(self, 'table_timer'):
-                print("📊 Parando timer da tabela...")
-                self.table_timer.stop()
+            if hasattr(self, 'signal_bridge'):
+                self.signal_bridge.close()
+            
+            if hasattr(self, 'library'):
+                self.library.remove_listener(self._on_library_changed)
+                self.library.stop_watching()
+            
+            if hasattr(self, 'library_scanner'):
+                self.library_scanner.remove_listener(self._on_metadata_ready)
+                self.library_scanner.stop()
             
             # Aguardar um momento para garantir que threads terminem
             QApplication.processEvents()
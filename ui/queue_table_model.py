@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modelo (model/view) da tabela da fila de reprodução.
+Trabalha sobre as fotografias imutáveis publicadas pelo QueueService: a cada
+nova fotografia compara as linhas pelo message_id e notifica a view apenas
+das linhas inseridas/removidas e das células cujo texto exibido mudou.
+A contagem regressiva é recalculada por tick() e também só emite dataChanged
+para as células que realmente mudaram.
+"""
+
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont
+
+
+# Cores criadas uma única vez (data() é chamado a cada pintura de célula)
+COLOR_ACTIVE = QColor(0, 100, 0)  # Verde escuro
+COLOR_P1 = QColor(255, 0, 0)  # Vermelho para P1
+COLOR_P2 = QColor(255, 140, 0)  # Laranja para P2
+COLOR_P3 = QColor(0, 100, 255)  # Azul para P3+
+COLOR_PENDING = QColor(128, 128, 128)  # Cinza
+COLOR_OUT_OF_DAYPART = QColor(160, 80, 0)  # Marrom
+COLOR_PLAYING = QColor(255, 0, 0)  # Vermelho
+COLOR_READY = QColor(0, 180, 0)  # Verde
+COLOR_SECONDS = QColor(255, 140, 0)  # Laranja
+COLOR_MINUTES = QColor(0, 100, 255)  # Azul
+COLOR_LATER = QColor(100, 100, 100)  # Cinza escuro
+
+
+def format_status(message, now):
+    """
+    Texto e cor da coluna "Próxima Execução" (contagem regressiva).
+
+    Args:
+        message (MessageView): Mensagem da fila
+        now (datetime): Hora atual
+
+    Returns:
+        tuple: (texto, QColor)
+    """
+    if message.is_pending:
+        return "⏳ Aguardando vez", COLOR_PENDING
+    if not message.is_eligible:
+        return "🚫 Fora do horário", COLOR_OUT_OF_DAYPART
+
+    delta_seconds = (message.next_play_time - now).total_seconds()
+    if delta_seconds <= 0:
+        # Já passou da hora ou está na hora
+        if abs(delta_seconds) < 5:  # Dentro de 5 segundos
+            return "🔴 TOCANDO AGORA!", COLOR_PLAYING
+        return "🟢 PRONTA!", COLOR_READY
+
+    # Ainda não chegou a hora - CONTAGEM REGRESSIVA
+    if delta_seconds < 60:
+        return f"⏰ {int(delta_seconds)}s", COLOR_SECONDS
+    if delta_seconds < 3600:
+        minutes = int(delta_seconds // 60)
+        seconds = int(delta_seconds % 60)
+        return f"⏰ {minutes}m {seconds}s", COLOR_MINUTES
+    return f"🕐 {message.next_play_time.strftime('%H:%M:%S')}", COLOR_LATER
+
+
+def format_interval(message):
+    """Texto da coluna "Intervalo"."""
+    if message.slot_minutes:
+        return f"⏱ {message.slot_minutes} min (fixo)"
+    if message.interval < 1.0:
+        return f"{int(message.interval * 60)} seg"
+    return f"{round(message.interval)} min"
+
+
+def _tooltip(message):
+    """Tooltip da coluna "Arquivo": nome completo e dias/horários permitidos."""
+    tooltip = f"📁 {message.filename}"
+    if message.daypart_rules:
+        tooltip += "\n🗓 " + "; ".join(rule.describe() for rule in message.daypart_rules)
+    return tooltip
+
+
+class QueueTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela sobre QueueSnapshot.
+
+    Cada linha guarda a MessageView e os textos já formatados das quatro
+    colunas; data() apenas devolve valores prontos.
+    """
+
+    HEADERS = ["Arquivo", "Prioridade", "Intervalo", "Próxima Execução"]
+    COLUMN_FILE, COLUMN_PRIORITY, COLUMN_INTERVAL, COLUMN_STATUS = range(4)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._messages = []  # MessageView por linha
+        self._texts = []  # [arquivo, prioridade, intervalo, status] por linha
+        self._status_colors = []  # QColor da coluna de status por linha
+        self._ids = []  # message_id por linha
+        self.version = -1  # versão da fotografia exibida
+
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    # ----- Interface do QAbstractTableModel -----
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        message = self._messages[row]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._texts[row][column]
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if column == self.COLUMN_FILE:
+                return None if message.is_pending else COLOR_ACTIVE
+            if column == self.COLUMN_PRIORITY:
+                if message.priority == 1:
+                    return COLOR_P1
+                return COLOR_P2 if message.priority == 2 else COLOR_P3
+            if column == self.COLUMN_STATUS:
+                return self._status_colors[row]
+            return None
+
+        if role == Qt.ItemDataRole.FontRole:
+            # Destaca mensagens ativas com negrito
+            if column == self.COLUMN_FILE and not message.is_pending:
+                return self._bold_font
+            return None
+
+        if role == Qt.ItemDataRole.ToolTipRole and column == self.COLUMN_FILE:
+            return _tooltip(message)
+
+        if role == Qt.ItemDataRole.UserRole:
+            return message.filename
+
+        return None
+
+    # ----- Atualização a partir das fotografias -----
+
+    def filename_at(self, row):
+        """
+        Nome do arquivo exibido em uma linha.
+
+        Args:
+            row (int): Linha da tabela
+
+        Returns:
+            str: Nome do arquivo ou None se a linha não existe
+        """
+        if 0 <= row < len(self._messages):
+            return self._messages[row].filename
+        return None
+
+    def _format_row(self, message, now):
+        status_text, status_color = format_status(message, now)
+        texts = [message.filename, f"P{message.priority}", format_interval(message), status_text]
+        return texts, status_color
+
+    def set_snapshot(self, snapshot, now=None):
+        """
+        Exibe uma nova fotografia da fila, notificando apenas o que mudou.
+
+        Args:
+            snapshot (QueueSnapshot): Fotografia publicada pelo QueueService
+            now (datetime, optional): Hora atual para a contagem regressiva
+
+        Returns:
+            bool: True se a fotografia era nova
+        """
+        if snapshot.version == self.version:
+            return False
+        self.version = snapshot.version
+        now = now or datetime.now()
+
+        new_messages = list(snapshot.items)
+        new_ids = [message.message_id for message in new_messages]
+
+        if new_ids != self._ids:
+            new_set = set(new_ids)
+            old_set = set(self._ids)
+            kept_old = [message_id for message_id in self._ids if message_id in new_set]
+            kept_new = [message_id for message_id in new_ids if message_id in old_set]
+            if kept_old != kept_new:
+                # Ordem relativa mudou: recarrega o modelo inteiro
+                self._reset(new_messages, now)
+                return True
+            self._remove_missing(new_set)
+            self._insert_new(new_messages, old_set, now)
+
+        # Mesmas linhas na mesma ordem: compara célula a célula
+        for row, message in enumerate(new_messages):
+            old_message = self._messages[row]
+            self._messages[row] = message
+            texts, status_color = self._format_row(message, now)
+            # Negrito, cor e tooltip da coluna Arquivo não dependem do texto
+            file_style_changed = (old_message.is_pending != message.is_pending
+                                  or old_message.daypart_rules != message.daypart_rules)
+            self._update_row(row, texts, status_color, file_style_changed)
+        return True
+
+    def tick(self, now=None):
+        """
+        Atualiza a contagem regressiva (apenas a coluna de status).
+
+        Args:
+            now (datetime, optional): Hora atual
+
+        Returns:
+            int: Número de células alteradas
+        """
+        now = now or datetime.now()
+        changed = 0
+        first = last = None
+        for row, message in enumerate(self._messages):
+            status_text, status_color = format_status(message, now)
+            if status_text != self._texts[row][self.COLUMN_STATUS]:
+                self._texts[row][self.COLUMN_STATUS] = status_text
+                self._status_colors[row] = status_color
+                changed += 1
+                if first is None:
+                    first = row
+                last = row
+            elif first is not None:
+                self._emit_status_changed(first, last)
+                first = None
+        if first is not None:
+            self._emit_status_changed(first, last)
+        return changed
+
+    def _emit_status_changed(self, first, last):
+        # Um único dataChanged por trecho contíguo de linhas alteradas
+        column = self.COLUMN_STATUS
+        self.dataChanged.emit(self.index(first, column), self.index(last, column),
+                              [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole])
+
+    def _update_row(self, row, texts, status_color, file_style_changed=False):
+        """Grava os textos da linha e emite dataChanged só para as colunas alteradas."""
+        old_texts = self._texts[row]
+        changed = [column for column in range(len(texts)) if texts[column] != old_texts[column]]
+        if file_style_changed and self.COLUMN_FILE not in changed:
+            changed.insert(0, self.COLUMN_FILE)
+        if self._status_colors[row] is not status_color and self.COLUMN_STATUS not in changed:
+            changed.append(self.COLUMN_STATUS)
+        self._texts[row] = texts
+        self._status_colors[row] = status_color
+        if changed:
+            self.dataChanged.emit(self.index(row, min(changed)), self.index(row, max(changed)))
+
+    def _remove_missing(self, new_set):
+        """Remove as linhas que saíram da fila, em trechos contíguos de baixo para cima."""
+        row = len(self._ids) - 1
+        while row >= 0:
+            if self._ids[row] in new_set:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._ids[row] not in new_set:
+                row -= 1
+            first = row + 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._messages[first:last + 1]
+            del self._texts[first:last + 1]
+            del self._status_colors[first:last + 1]
+            del self._ids[first:last + 1]
+            self.endRemoveRows()
+
+    def _insert_new(self, new_messages, old_set, now):
+        """Insere as linhas novas nas posições da fotografia, em trechos contíguos."""
+        row = 0
+        while row < len(new_messages):
+            if new_messages[row].message_id in old_set:
+                row += 1
+                continue
+            first = row
+            while row < len(new_messages) and new_messages[row].message_id not in old_set:
+                row += 1
+            block = new_messages[first:row]
+            formatted = [self._format_row(message, now) for message in block]
+            self.beginInsertRows(QModelIndex(), first, row - 1)
+            self._messages[first:first] = block
+            self._texts[first:first] = [texts for texts, _ in formatted]
+            self._status_colors[first:first] = [color for _, color in formatted]
+            self._ids[first:first] = [message.message_id for message in block]
+            self.endInsertRows()
+
+    def _reset(self, new_messages, now):
+        self.beginResetModel()
+        self._messages = new_messages
+        formatted = [self._format_row(message, now) for message in new_messages]
+        self._texts = [texts for texts, _ in formatted]
+        self._status_colors = [color for _, color in formatted]
+        self._ids = [message.message_id for message in new_messages]
+        self.endResetModel()
@@ -173,7 +173,7 @@ class RadioSourceDialog(QDialog):
         
         # Botão para carregar dispositivos
         self.refresh_button = QPushButton("Atualizar Lista de Dispositivos")
-        self.refresh_button.clicked.connect(self.load_devices)
+        self.refresh_button.clicked.connect(lambda: self.load_devices(refresh=True))
         self.refresh_button.setVisible(False)  # Inicialmente oculto
         layout.addWidget(self.refresh_button)
         
@@ -233,11 +233,16 @@ class RadioSourceDialog(QDialog):
                 self.source_list.setCurrentItem(item)
                 self.current_source_label.setText(item_text)
     
-    def load_devices(self):
-        """Carrega a lista de dispositivos de áudio disponíveis."""
+    def load_devices(self, refresh=False):
+        """
+        Carrega a lista de dispositivos de áudio disponíveis.
+        
+        Args:
+            refresh (bool): Reenumera os dispositivos em vez de usar a lista em cache
+        """
         self.device_combo.clear()
         
-        devices = self.source_manager.get_audio_devices()
+        devices = self.source_manager.get_audio_devices(refresh)
         
         if not devices:
             self.device_combo.addItem("Nenhum dispositivo encontrado")
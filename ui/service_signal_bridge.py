@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ponte entre os serviços (threads do gerenciador, do VLC, do áudio) e a
+interface Qt. Os serviços avisam mudanças por callbacks comuns, chamados em
+qualquer thread; a ponte converte esses avisos em sinais Qt entregues na
+thread da interface por conexão enfileirada (QueuedConnection).
+
+Avisos repetidos antes da entrega são agrupados: uma rajada de alterações
+da fila (ou de eventos do VLC) gera uma única atualização da tela.
+"""
+
+import threading
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class ServiceSignalBridge(QObject):
+    """
+    Converte callbacks dos serviços em sinais Qt na thread da interface.
+
+    Sinais:
+    - queue_changed: a fila mudou (nova fotografia publicada)
+    - player_changed: o estado da reprodução mudou (play/pause, modo,
+      microfone, estado do VLC)
+    """
+
+    queue_changed = pyqtSignal()
+    player_changed = pyqtSignal()
+
+    # Sinais internos: emitidos em qualquer thread, entregues na thread da interface
+    _wake = pyqtSignal()
+    _invoke = pyqtSignal(object, tuple)
+
+    QUEUE = "queue"
+    PLAYER = "player"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending = set()  # tipos de mudança aguardando entrega
+        self._queue_service = None
+        self._player_service = None
+        self._closed = False
+
+        self._wake.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+        self._invoke.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def watch_queue(self, queue_service):
+        """
+        Passa a receber as alterações da fila.
+
+        Args:
+            queue_service (QueueService): Serviço da fila
+        """
+        self._queue_service = queue_service
+        queue_service.add_change_listener(self.notify_queue_changed)
+
+    def watch_player(self, player_service):
+        """
+        Passa a receber as mudanças de estado do player.
+
+        Args:
+            player_service (PlayerService): Serviço de reprodução
+        """
+        self._player_service = player_service
+        player_service.add_state_listener(self.notify_player_changed)
+
+    def notify_queue_changed(self):
+        """Callback da fila (qualquer thread)."""
+        self._mark(self.QUEUE)
+
+    def notify_player_changed(self):
+        """Callback do player (qualquer thread)."""
+        self._mark(self.PLAYER)
+
+    def post(self, callback, *args):
+        """
+        Executa uma função na thread da interface (pode ser chamado de qualquer thread).
+
+        Args:
+            callback (callable): Função a executar
+            *args: Argumentos da função
+        """
+        if not self._closed:
+            self._invoke.emit(callback, args)
+
+    def _mark(self, kind):
+        with self._lock:
+            if self._closed:
+                return
+            # Já existe uma entrega agendada: ela levará esta mudança junto
+            wake = not self._pending
+            self._pending.add(kind)
+        if wake:
+            self._wake.emit()
+
+    def _deliver(self):
+        """Thread da interface: emite um sinal por tipo de mudança acumulada."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if self._closed:
+            return
+        if self.QUEUE in pending:
+            self.queue_changed.emit()
+        if self.PLAYER in pending:
+            self.player_changed.emit()
+
+    def _run(self, callback, args):
+        if self._closed:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠ Erro em tarefa da interface: {str(e)}")
+
+    def close(self):
+        """Desliga a ponte dos serviços (ao fechar a janela)."""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+        if self._queue_service is not None:
+            self._queue_service.remove_change_listener(self.notify_queue_changed)
+        if self._player_service is not None:
+            self._player_service.remove_state_listener(self.notify_player_changed)